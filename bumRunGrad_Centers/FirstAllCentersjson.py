@@ -1,52 +1,43 @@
-from bs4 import BeautifulSoup
+import argparse
 import json
-
-# Load HTML from file
-with open("bumrungrad_playwright.html", "r", encoding="utf-8") as file:
-    html = file.read()
-
-soup = BeautifulSoup(html, "html.parser")
-
-base_url = "https://www.bumrungrad.com"
-cards = soup.select(".col-sm-12.col-lg-6")
-
-centers_data = []
-
-for card in cards:
-    # Extract name
-    name_tag = card.select_one(".cardclinic-title strong")
-    name = name_tag.get_text(strip=True) if name_tag else "N/A"
-
-    # Extract image URL
-    image_div = card.select_one(".icon-center")
-    image_style = image_div['style'] if image_div else ""
-    image_url = (
-        base_url + image_style.split("url(")[-1].split(")")[0]
-        if "url(" in image_style else "N/A"
-    )
-
-    # Extract location (cleaned text)
-    location_div = card.select_one(".collapse > div")
-    location = location_div.get_text(separator=' ', strip=True) if location_div else "N/A"
-
-    # Extract detail page link
-    detail_link = card.select_one(".collapse a")
-    href = detail_link['href'] if detail_link else ""
-    detail_url = href if href.startswith("http") else base_url + href
-
-    # Clean up duplicates in URLs
-    detail_url = detail_url.replace("https://www.bumrungrad.comhttps://", "https://")
-
-    # Append to list
-    centers_data.append({
-        "name": name,
-        "image_url": image_url,
-        "location": location,
-        "detail_url": detail_url
-    })
-
-# Save to JSON file
-with open("centers.json", "w", encoding="utf-8") as f:
-    json.dump(centers_data, f, indent=2, ensure_ascii=False)
-
-print("✅ Clinic/center data saved to 'centers.json'")
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bumRunGrad_Data"))
+
+from listing import iter_centers, read_chunks
+from profiling import add_profile_argument, profiled
+
+# Parse the rendered listing into center entries, streaming card by card
+# (see listing.py):
+#
+#   python FirstAllCentersjson.py                                   # bumrungrad_playwright.html -> centers.json
+#   python firstAllCenters.py - | python FirstAllCentersjson.py - --jsonl > centers.jsonl
+#   python FirstAllCentersjson.py --profile                        # reports in profiles/
+#
+# With --jsonl each entry is written as a JSON line the moment its card
+# closes, so the next stage can start on it straight away.
+
+parser = argparse.ArgumentParser(description="Extract center entries from the rendered clinics-and-centers page")
+parser.add_argument("html_file", nargs="?", default="bumrungrad_playwright.html", help="listing HTML, or - for stdin")
+parser.add_argument("--jsonl", action="store_true", help="write one JSON entry per line to stdout as cards are parsed")
+parser.add_argument("--output", default="centers.json", help="JSON file to write without --jsonl")
+add_profile_argument(parser)
+args = parser.parse_args()
+
+# Load HTML from file or pipe, chunk by chunk
+html_file = sys.stdin.buffer if args.html_file == "-" else open(args.html_file, "rb")
+centers = iter_centers(read_chunks(html_file))
+
+with profiled(args.profile, "listing", mode=args.profile_mode):
+    if args.jsonl:
+        for center in centers:
+            print(json.dumps(center, ensure_ascii=False), flush=True)
+    else:
+        centers_data = list(centers)
+
+        # Save to JSON file
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(centers_data, f, indent=2, ensure_ascii=False)
+
+        print(f"✅ Clinic/center data saved to '{args.output}'")
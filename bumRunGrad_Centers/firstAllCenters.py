@@ -1,6 +1,16 @@
 import asyncio
+import sys
 from playwright.async_api import async_playwright
 
+# Render the listing and save its HTML; with "-" the HTML goes to stdout
+# instead, to pipe into FirstAllCentersjson.py (messages then go to stderr).
+#
+#   python firstAllCenters.py
+#   python firstAllCenters.py - | python FirstAllCentersjson.py - --jsonl
+
+TO_STDOUT = sys.argv[1:] == ["-"]
+log = sys.stderr if TO_STDOUT else sys.stdout
+
 async def main():
     url = "https://www.bumrungrad.com/en/clinics-and-centers"
 
@@ -11,16 +21,20 @@ async def main():
 
         # Go to the page
         response = await page.goto(url)
-        print("Status Code:", response.status)
+        print("Status Code:", response.status, file=log)
 
         # Wait for the search box input to ensure full render
         await page.wait_for_selector("input.input-search")
 
         # Save full HTML
         html_content = await page.content()
-        with open("bumrungrad_playwright.html", "w", encoding="utf-8") as file:
-            file.write(html_content)
-        print("HTML content saved to 'bumrungrad_playwright.html'")
+        if TO_STDOUT:
+            sys.stdout.write(html_content)
+            sys.stdout.flush()
+        else:
+            with open("bumrungrad_playwright.html", "w", encoding="utf-8") as file:
+                file.write(html_content)
+            print("HTML content saved to 'bumrungrad_playwright.html'")
 
         await browser.close()
 
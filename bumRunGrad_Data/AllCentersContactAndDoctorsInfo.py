@@ -1,32 +1,40 @@
+import argparse
 import json
 import requests
 from bs4 import BeautifulSoup
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
-import urllib3
 
-# Disable SSL warnings globally
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from crawl_session import DEFAULT_REQUESTS_PER_SECOND, DEFAULT_WORKERS, RateLimiter, create_session, fetch
+from listing import align_listings, extract_centers, listing_url
+from opening_hours import normalize_hotline_hours, normalize_service_hours
+from profiling import add_profile_argument, profiled
+from records import ActionButton, Center, ContactInfo, Doctor, Location, ServiceHours
+
+# Detail scraper for the centers in firstAllCenters.json (English listing).
+#
+#   python AllCentersContactAndDoctorsInfo.py                                 # English only
+#   python AllCentersContactAndDoctorsInfo.py --locale th --locale ar --locale zh
+#   python AllCentersContactAndDoctorsInfo.py --profile                       # reports in profiles/
+#
+# Pages are fetched by a thread pool sharing one session and one per-host
+# rate limit (crawl_session.py). Extra locales have their listing crawled,
+# aligned to the English centers (listing.py) and their detail pages
+# scraped in the same pool; each English center carries them under
+# 'translations'.
 
 class BumrungradScraper:
-    def __init__(self, json_file_path):
+    def __init__(self, json_file_path, session=None, rate_limiter=None, workers=DEFAULT_WORKERS):
         self.json_file_path = json_file_path
         self.centers_data = []
         self.scraped_data = []
-        self.session = requests.Session()
-        
-        # Set headers to mimic a real browser
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-        # Disable SSL verification to avoid certificate issues
-        self.session.verify = False
-        
-        # Suppress SSL warnings
-        import urllib3
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        # Localized listing entries that matched no English center, {locale: [entry]}
+        self.unaligned = {}
+        self.workers = workers
+        self.session = session or create_session(workers)
+        self.rate_limiter = rate_limiter or RateLimiter()
     
     def load_centers_data(self):
         """Load centers data from JSON file"""
@@ -53,13 +61,11 @@ class BumrungradScraper:
         return text
     
     def extract_contact_info(self, soup):
-        """Extract contact information from the contact section"""
-        contact_info = {}
-        
+        """Extract contact information from the contact section (None if the page has none)"""
         # Find the contact section
         contact_section = soup.find('div', class_='contact__group')
         if not contact_section:
-            return contact_info
+            return None
         
         # Extract phone numbers
         phone_numbers = []
@@ -75,17 +81,16 @@ class BumrungradScraper:
         hours_pattern = r'(\d{1,2}[:.]?\d{0,2})\s*[-–]\s*(\d{1,2}[:.]?\d{0,2})'
         hours_matches = re.findall(hours_pattern, contact_text)
         
-        contact_info = {
-            'phone_numbers': phone_numbers,
-            'contact_text': lines,
-            'hours': hours_matches
-        }
-        
-        return contact_info
+        return ContactInfo(
+            phone_numbers=phone_numbers,
+            contact_text=lines,
+            hours=hours_matches,
+            hotline_hours=normalize_hotline_hours(lines, phone_numbers)
+        )
     
     def extract_service_hours(self, soup):
-        """Extract service hours information"""
-        service_hours = {}
+        """Extract service hours information (None if the page has none)"""
+        service_hours = None
         
         # Find service hours section
         service_sections = soup.find_all('div', class_='contact__group')
@@ -101,17 +106,18 @@ class BumrungradScraper:
                     if any(time_word in line.lower() for time_word in ['am', 'pm', 'daily', 'hour', 'time']):
                         hours_info.append(line)
                 
-                service_hours = {
-                    'service_text': lines,
-                    'hours_info': hours_info
-                }
+                service_hours = ServiceHours(
+                    service_text=lines,
+                    hours_info=hours_info,
+                    weekly_hours=normalize_service_hours(lines)
+                )
                 break
         
         return service_hours
     
     def extract_location(self, soup):
-        """Extract location information"""
-        location_info = {}
+        """Extract location information (None if the page has none)"""
+        location_info = None
         
         # Find location section
         location_sections = soup.find_all('div', class_='contact__group')
@@ -127,10 +133,10 @@ class BumrungradScraper:
                     if any(keyword in line.lower() for keyword in ['building', 'floor', 'wing', 'level']):
                         building_info.append(line)
                 
-                location_info = {
-                    'location_text': lines,
-                    'building_info': building_info
-                }
+                location_info = Location(
+                    location_text=lines,
+                    building_info=building_info
+                )
                 break
         
         return location_info
@@ -144,13 +150,13 @@ class BumrungradScraper:
         
         for doctor_div in doctor_divs:
             try:
-                doctor_info = {}
+                image_url = image_alt = image_size = name = specialties = profile_url = None
                 
                 # Extract doctor image
                 img_tag = doctor_div.find('img', class_='doctor__image')
                 if img_tag:
-                    doctor_info['image_url'] = img_tag.get('src', '')
-                    doctor_info['image_alt'] = img_tag.get('alt', '')
+                    image_url = img_tag.get('src', '')
+                    image_alt = img_tag.get('alt', '')
                     
                     # Get image dimensions if available
                     style = img_tag.get('style', '')
@@ -158,15 +164,12 @@ class BumrungradScraper:
                         width_match = re.search(r'width:\s*(\d+)px', style)
                         height_match = re.search(r'height:\s*(\d+)px', style)
                         if width_match and height_match:
-                            doctor_info['image_dimensions'] = {
-                                'width': width_match.group(1),
-                                'height': height_match.group(1)
-                            }
+                            image_size = (width_match.group(1), height_match.group(1))
                 
                 # Extract doctor name
                 name_tag = doctor_div.find('p', class_='doctor__name')
                 if name_tag:
-                    doctor_info['name'] = self.clean_text(name_tag.get_text())
+                    name = self.clean_text(name_tag.get_text())
                 
                 # Extract specialties
                 specialties_tag = doctor_div.find('p', class_='doctor__specialies__text')
@@ -174,55 +177,40 @@ class BumrungradScraper:
                     specialties_text = specialties_tag.get_text()
                     # Split by <br> tags and clean up
                     specialties = [self.clean_text(spec) for spec in specialties_text.split('\n') if spec.strip()]
-                    doctor_info['specialties'] = specialties
                 
                 # Extract profile link
                 profile_link = doctor_div.find('a', class_='doctor__btnProfile')
                 if profile_link:
-                    doctor_info['profile_url'] = profile_link.get('href', '')
+                    profile_url = profile_link.get('href', '')
                 
-                # Extract action buttons
-                action_buttons = {}
+                # Extract action buttons (call, inquiry, appointment)
+                action_buttons = []
                 action_div = doctor_div.find('div', class_='doctor__action')
                 if action_div:
-                    # Call button
-                    call_btn = action_div.find('a', class_='doctor__action__btn--call')
-                    if call_btn:
-                        action_buttons['call'] = {
-                            'text': self.clean_text(call_btn.get_text()),
-                            'href': call_btn.get('href', '')
-                        }
-                    
-                    # Inquiry button
-                    inquiry_btn = action_div.find('a', class_='doctor__action__btn--inquiry')
-                    if inquiry_btn:
-                        action_buttons['inquiry'] = {
-                            'text': self.clean_text(inquiry_btn.get_text()),
-                            'href': inquiry_btn.get('href', '')
-                        }
-                    
-                    # Appointment button
-                    appointment_btn = action_div.find('a', class_='doctor__action__btn--appointment')
-                    if appointment_btn:
-                        action_buttons['appointment'] = {
-                            'text': self.clean_text(appointment_btn.get_text()),
-                            'href': appointment_btn.get('href', '')
-                        }
-                
-                doctor_info['action_buttons'] = action_buttons
+                    for kind in ('call', 'inquiry', 'appointment'):
+                        button = action_div.find('a', class_=f'doctor__action__btn--{kind}')
+                        if button:
+                            action_buttons.append(ActionButton(kind, self.clean_text(button.get_text()),
+                                                               button.get('href', '')))
                 
                 # Extract doctor ID from URLs if available
                 doctor_id = None
-                if 'inquiry' in action_buttons and 'href' in action_buttons['inquiry']:
-                    inquiry_url = action_buttons['inquiry']['href']
-                    id_match = re.search(r'doctorid=(\d+)', inquiry_url)
-                    if id_match:
-                        doctor_id = id_match.group(1)
-                
-                if doctor_id:
-                    doctor_info['doctor_id'] = doctor_id
+                for button in action_buttons:
+                    if button.kind == 'inquiry':
+                        id_match = re.search(r'doctorid=(\d+)', button.href)
+                        if id_match:
+                            doctor_id = id_match.group(1)
                 
-                doctors_list.append(doctor_info)
+                doctors_list.append(Doctor(
+                    name=name,
+                    specialties=specialties,
+                    image_url=image_url,
+                    image_alt=image_alt,
+                    image_size=image_size,
+                    profile_url=profile_url,
+                    action_buttons=tuple(action_buttons),
+                    doctor_id=doctor_id
+                ))
                 
             except Exception as e:
                 print(f"⚠️ Error extracting doctor info: {str(e)}")
@@ -236,11 +224,7 @@ class BumrungradScraper:
             url = center['detail_url']
             print(f"🔍 Scraping: {center['name']} - {url}")
             
-            # Add delay to be respectful to the server
-            time.sleep(1)
-            
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            response = self.fetch(url)
             
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -259,60 +243,92 @@ class BumrungradScraper:
                 print(f"⚠️ No doctors found for {center['name']}")
             
             # Create the result object
-            result = {
-                'name': center['name'],
-                'original_image_url': center['image_url'],
-                'original_location': center['location'],
-                'detail_url': center['detail_url'],
-                'scraped_data': {
-                    'contact_information': contact_info,
-                    'service_hours': service_hours,
-                    'location': location_info,
-                    'doctors': doctors_info
-                },
-                'scraping_status': 'success',
-                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'doctors_count': len(doctors_info)
-            }
+            result = Center(
+                name=center['name'],
+                original_image_url=center['image_url'],
+                original_location=center['location'],
+                detail_url=center['detail_url'],
+                contact=contact_info,
+                service_hours=service_hours,
+                location=location_info,
+                doctors=doctors_info,
+                scraping_status='success',
+                scraped_at=time.strftime('%Y-%m-%d %H:%M:%S')
+            )
             
             return result
             
         except requests.exceptions.RequestException as e:
             print(f"❌ Network error for {center['name']}: {str(e)}")
-            return {
-                'name': center['name'],
-                'detail_url': center['detail_url'],
-                'scraping_status': 'error',
-                'error_message': f"Network error: {str(e)}",
-                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'doctors_count': 0
-            }
+            return Center(
+                name=center['name'],
+                detail_url=center['detail_url'],
+                scraping_status='error',
+                error_message=f"Network error: {str(e)}",
+                scraped_at=time.strftime('%Y-%m-%d %H:%M:%S')
+            )
         except Exception as e:
             print(f"❌ Unexpected error for {center['name']}: {str(e)}")
-            return {
-                'name': center['name'],
-                'detail_url': center['detail_url'],
-                'scraping_status': 'error',
-                'error_message': f"Unexpected error: {str(e)}",
-                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'doctors_count': 0
-            }
+            return Center(
+                name=center['name'],
+                detail_url=center['detail_url'],
+                scraping_status='error',
+                error_message=f"Unexpected error: {str(e)}",
+                scraped_at=time.strftime('%Y-%m-%d %H:%M:%S')
+            )
+    
+    def fetch(self, url):
+        """GET a page through the shared session, paced by the shared rate limiter"""
+        return fetch(self.session, self.rate_limiter, url)
+    
+    def fetch_listing(self, locale):
+        """Listing entries of one locale's clinics-and-centers page"""
+        try:
+            centers = extract_centers(self.fetch(listing_url(locale)).content)
+            print(f"✅ Loaded {len(centers)} centers from the /{locale}/ listing")
+            return centers
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Network error for the /{locale}/ listing: {str(e)}")
+            return []
     
-    def scrape_all_centers(self):
-        """Scrape all centers data"""
-        print(f"🚀 Starting to scrape {len(self.centers_data)} centers...")
+    def scrape_centers(self, pool, centers, label=''):
+        """Submit detail jobs for the listing entries to the pool; returns their futures"""
+        def scrape(numbered):
+            i, center = numbered
+            result = self.scrape_center_details(center)
+            status = '✅ Successfully scraped' if result.scraping_status == 'success' else '❌ Failed to scrape'
+            print(f"{status} {center['name']}{label} ({i}/{len(centers)})")
+            return result
         
-        for i, center in enumerate(self.centers_data, 1):
-            print(f"\n📋 Progress: {i}/{len(self.centers_data)}")
+        return [pool.submit(scrape, numbered) for numbered in enumerate(centers, 1)]
+    
+    def scrape_all_centers(self, locales=()):
+        """Scrape all centers data, plus their translations in the given extra locales"""
+        locales = [locale for locale in locales if locale != 'en']
+        print(f"🚀 Starting to scrape {len(self.centers_data)} centers"
+              f"{' in ' + ', '.join(['en', *locales]) if locales else ''} with {self.workers} workers...")
+        
+        with ThreadPoolExecutor(self.workers) as pool:
+            listings = dict(zip(locales, pool.map(self.fetch_listing, locales)))
             
-            result = self.scrape_center_details(center)
-            self.scraped_data.append(result)
+            # All locales' detail pages go through the one pool, so the crawl
+            # is bound by the shared rate limit rather than by locale count
+            english = self.scrape_centers(pool, self.centers_data)
+            localized = {}
+            for locale, centers in listings.items():
+                aligned, self.unaligned[locale] = align_listings(self.centers_data, centers)
+                print(f"🔗 /{locale}/: {len(aligned)} centers aligned, {len(self.unaligned[locale])} unmatched")
+                indexes = sorted(aligned)
+                futures = self.scrape_centers(pool, [aligned[index] for index in indexes], f" [{locale}]")
+                localized[locale] = dict(zip(indexes, futures))
             
-            # Show progress
-            if result['scraping_status'] == 'success':
-                print(f"✅ Successfully scraped {center['name']}")
-            else:
-                print(f"❌ Failed to scrape {center['name']}")
+            self.scraped_data = [future.result() for future in english]
+            for locale, futures in localized.items():
+                for index, future in futures.items():
+                    center = self.scraped_data[index]
+                    if center.translations is None:
+                        center.translations = {}
+                    center.translations[locale] = future.result()
         
         print(f"\n🎉 Scraping completed! Processed {len(self.scraped_data)} centers")
     
@@ -320,9 +336,9 @@ class BumrungradScraper:
         """Save scraped results to JSON file"""
         try:
             # Create summary statistics
-            successful_scrapes = sum(1 for item in self.scraped_data if item['scraping_status'] == 'success')
+            successful_scrapes = sum(1 for item in self.scraped_data if item.scraping_status == 'success')
             failed_scrapes = len(self.scraped_data) - successful_scrapes
-            total_doctors = sum(item.get('doctors_count', 0) for item in self.scraped_data)
+            total_doctors = sum(item.doctors_count for item in self.scraped_data)
             
             final_data = {
                 'scraping_summary': {
@@ -332,9 +348,20 @@ class BumrungradScraper:
                     'total_doctors_found': total_doctors,
                     'scraping_date': time.strftime('%Y-%m-%d %H:%M:%S')
                 },
-                'centers_data': self.scraped_data
+                'centers_data': [item.to_dict() for item in self.scraped_data]
             }
             
+            # Per-locale alignment, with the listing entries no English center matched
+            if self.unaligned:
+                final_data['scraping_summary']['locales'] = {
+                    locale: {
+                        'translated_centers': sum(1 for item in self.scraped_data
+                                                  if locale in (item.translations or {})),
+                        'unaligned_detail_urls': [center['detail_url'] for center in unaligned]
+                    }
+                    for locale, unaligned in self.unaligned.items()
+                }
+            
             with open(output_file, 'w', encoding='utf-8') as file:
                 json.dump(final_data, file, ensure_ascii=False, indent=2)
             
@@ -345,39 +372,49 @@ class BumrungradScraper:
         except Exception as e:
             print(f"❌ Error saving results: {str(e)}")
     
-    def run(self, output_file='bumrungrad_centers_detailed.json'):
-        """Main method to run the scraper"""
+    def run(self, output_file='bumrungrad_centers_detailed.json', locales=(), profile_dir=None,
+            profile_mode='sampling'):
+        """Main method to run the scraper; profiled into profile_dir if given"""
         if not self.load_centers_data():
             return
         
-        self.scrape_all_centers()
-        self.save_results(output_file)
+        with profiled(profile_dir, 'scraper', mode=profile_mode):
+            self.scrape_all_centers(locales)
+            self.save_results(output_file)
 
 # Example usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape contact info and doctors of every Bumrungrad center")
+    parser.add_argument("--locale", action="append", default=[],
+                        help="also scrape this locale's pages as translations (th, ar, zh, ...); repeatable")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent requests")
+    parser.add_argument("--rate", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="requests per second to the site, across all workers")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
     # Initialize the scraper
-    scraper = BumrungradScraper('firstAllCenters.json')
+    scraper = BumrungradScraper('firstAllCenters.json', rate_limiter=RateLimiter(args.rate), workers=args.workers)
     
     # Run the scraper
-    scraper.run('bumrungrad_centers_complete_data.json')
+    scraper.run('bumrungrad_centers_complete_data.json', args.locale, args.profile, args.profile_mode)
     
     # Optional: Print some results
     print("\n📋 Sample of scraped data:")
     if scraper.scraped_data:
         sample = scraper.scraped_data[0]
-        print(f"Center: {sample['name']}")
-        print(f"Status: {sample['scraping_status']}")
-        if sample['scraping_status'] == 'success':
-            contact = sample['scraped_data']['contact_information']
-            if contact.get('phone_numbers'):
-                print(f"Phone numbers: {contact['phone_numbers']}")
+        print(f"Center: {sample.name}")
+        print(f"Status: {sample.scraping_status}")
+        if sample.scraping_status == 'success':
+            if sample.contact and sample.contact.phone_numbers:
+                print(f"Phone numbers: {list(sample.contact.phone_numbers)}")
             
-            doctors = sample['scraped_data']['doctors']
+            doctors = sample.doctors
             if doctors:
                 print(f"Doctors found: {len(doctors)}")
-                print(f"First doctor: {doctors[0].get('name', 'Unknown')}")
-                if doctors[0].get('specialties'):
-                    print(f"Specialties: {doctors[0]['specialties']}")
+                print(f"First doctor: {doctors[0].name or 'Unknown'}")
+                if doctors[0].specialties:
+                    print(f"Specialties: {list(doctors[0].specialties)}")
             else:
                 print("No doctors found in this center")
                 
\ No newline at end of file
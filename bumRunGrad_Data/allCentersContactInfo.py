@@ -6,6 +6,8 @@ import re
 from urllib.parse import urljoin
 import urllib3
 
+from opening_hours import normalize_hotline_hours, normalize_service_hours
+
 # Disable SSL warnings globally
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -78,7 +80,8 @@ class BumrungradScraper:
         contact_info = {
             'phone_numbers': phone_numbers,
             'contact_text': lines,
-            'hours': hours_matches
+            'hours': hours_matches,
+            'hotline_hours': normalize_hotline_hours(lines, phone_numbers)
         }
         
         return contact_info
@@ -103,7 +106,8 @@ class BumrungradScraper:
                 
                 service_hours = {
                     'service_text': lines,
-                    'hours_info': hours_info
+                    'hours_info': hours_info,
+                    'weekly_hours': normalize_service_hours(lines)
                 }
                 break
         
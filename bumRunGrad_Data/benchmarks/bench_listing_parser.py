@@ -0,0 +1,116 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from listing import BASE_URL, iter_centers, read_chunks
+
+# Listing parser benchmark: the streaming HTMLParser extractor of listing.py
+# vs the BeautifulSoup tree + CSS selectors it replaced, on the saved
+# rendered listing and on a synthetic listing `--scale` times as long.
+#
+#   python bumRunGrad_Data/benchmarks/bench_listing_parser.py
+#   python bumRunGrad_Data/benchmarks/bench_listing_parser.py --scale 20
+#
+# The streaming parser reads the page from a file in chunks, as it would
+# from a pipe. Both must produce the same entries, also when the page
+# arrives a few bytes at a time.
+
+LISTING_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            "bumRunGrad_Centers", "firstAllCentersbumrungrad_playwright.html")
+CARD_START = '<div class="col-sm-12 col-lg-6">'
+
+
+def soup_extract_centers(html, base_url=BASE_URL):
+    """The BeautifulSoup extractor FirstAllCentersjson.py used before listing.py"""
+    soup = BeautifulSoup(html, "html.parser")
+    centers_data = []
+    for card in soup.select(".col-sm-12.col-lg-6"):
+        name_tag = card.select_one(".cardclinic-title strong")
+        name = name_tag.get_text(strip=True) if name_tag else "N/A"
+        image_div = card.select_one(".icon-center")
+        image_style = image_div.get('style', '') if image_div else ""
+        image_url = base_url + image_style.split("url(")[-1].split(")")[0] if "url(" in image_style else "N/A"
+        location_div = card.select_one(".collapse > div")
+        location = location_div.get_text(separator=' ', strip=True) if location_div else "N/A"
+        detail_link = card.select_one(".collapse a")
+        href = detail_link.get('href', '') if detail_link else ""
+        detail_url = href if href.startswith("http") else base_url + href
+        detail_url = detail_url.replace(base_url + "https://", "https://")
+        centers_data.append({"name": name, "image_url": image_url, "location": location, "detail_url": detail_url})
+    return centers_data
+
+
+def scaled_listing(html, scale):
+    """The listing with all its cards but the last repeated `scale` more times"""
+    start = html.index(CARD_START)
+    last = html.rindex(CARD_START)
+    return html[:start] + html[start:last] * scale + html[start:]
+
+
+def chunks(text, size):
+    data = text.encode()
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def measure(call):
+    """(result, seconds, peak traced bytes)"""
+    gc.collect()
+    start = time.perf_counter()
+    result = call()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def stream_file(path):
+    with open(path, "rb") as file:
+        yield from iter_centers(read_chunks(file))
+
+
+def first_card_seconds(path):
+    start = time.perf_counter()
+    next(stream_file(path))
+    return time.perf_counter() - start
+
+
+def run(scale):
+    with open(LISTING_FILE, "r", encoding="utf-8") as file:
+        page = file.read()
+
+    same = True
+    for label, html in (("saved listing", page), (f"listing x{scale}", scaled_listing(page, scale))):
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".html", delete=False) as file:
+            file.write(html)
+        soup, soup_seconds, soup_peak = measure(lambda: soup_extract_centers(html))
+        # Counting without keeping the entries shows the parser's own footprint
+        count, stream_seconds, stream_peak = measure(lambda: sum(1 for _ in stream_file(file.name)))
+        streamed = list(stream_file(file.name))
+        tiny = list(iter_centers(chunks(html, 7)))
+        same = same and streamed == soup and tiny == soup and count == len(soup)
+
+        print(f"📄 {label}: {len(html) / 1024 / 1024:.1f} MiB, {len(soup)} cards")
+        print(f"  BeautifulSoup: {soup_seconds * 1000:.0f} ms, peak {soup_peak / 1024 / 1024:.1f} MiB")
+        print(f"  streaming:     {stream_seconds * 1000:.0f} ms, peak {stream_peak / 1024 / 1024:.2f} MiB, "
+              f"first card after {first_card_seconds(file.name) * 1000:.1f} ms")
+        print(f"  {'✅ same entries (also fed 7 bytes at a time)' if same else '❌ entries differ'}")
+        os.remove(file.name)
+    return same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming vs BeautifulSoup listing extraction")
+    parser.add_argument("--scale", type=int, default=20, help="card repeats in the synthetic listing")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.scale) else 1)
@@ -0,0 +1,124 @@
+import argparse
+import copy
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import load_centers
+
+# Memory benchmark: scraped centers as nested dicts vs the slotted records
+# of records.py, on a synthetic crawl built from the real scraped pages.
+#
+#   python bumRunGrad_Data/benchmarks/bench_record_memory.py                  # 100k doctors
+#   python bumRunGrad_Data/benchmarks/bench_record_memory.py --doctors 20000 --repeat 0.3
+#
+# Both representations are built from the same JSON text, so every string
+# starts out as a fresh object as it would coming out of the HTML parser.
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "bumrungrad_centers_complete_data.json")
+
+
+def synthetic_dataset(doctors=100_000, doctors_per_center=50, repeat=0.2, seed=0, data_file=DATA_FILE):
+    """A scraped-file dict with `doctors` doctor entries across generated centers.
+
+    Centers and doctors are copies of real ones with new names, ids and
+    URLs; `repeat` of the entries list a doctor already listed under another
+    center, as in the real data (356 entries for 298 doctors).
+    """
+    with open(data_file, "r", encoding="utf-8") as file:
+        source = json.load(file)
+    centers = [center for center in source["centers_data"] if center.get("scraped_data")]
+    templates = [doctor for center in centers for doctor in center["scraped_data"]["doctors"]]
+    rng = random.Random(seed)
+
+    listed = []
+    generated = []
+    for number in range(doctors):
+        if listed and rng.random() < repeat:
+            doctor = rng.choice(listed)
+        else:
+            doctor = copy.deepcopy(rng.choice(templates))
+            doctor_id = str(500000 + len(listed))
+            doctor["name"] = f"{doctor.get('name', 'Dr.')} {doctor_id}"
+            doctor["profile_url"] = f"/en/doctors/synthetic-{doctor_id}"
+            doctor["image_url"] = f"/photos/{doctor_id}.jpg"
+            for kind, button in doctor.get("action_buttons", {}).items():
+                if kind != "call":
+                    button["href"] = f"{button['href'].split('?')[0]}?doctorid={doctor_id}"
+            doctor["doctor_id"] = doctor_id
+            listed.append(doctor)
+
+        if number % doctors_per_center == 0:
+            center = copy.deepcopy(rng.choice(centers))
+            center["name"] = f"{center['name']} {len(generated) + 1}"
+            center["detail_url"] = f"{center['detail_url']}-{len(generated) + 1}"
+            center["scraped_data"]["doctors"] = []
+            generated.append(center)
+        center["scraped_data"]["doctors"].append(doctor)
+
+    for center in generated:
+        center["doctors_count"] = len(center["scraped_data"]["doctors"])
+    return {"scraping_summary": {"total_centers": len(generated), "total_doctors_found": doctors},
+            "centers_data": generated}
+
+
+def measure(build):
+    """(result, bytes still allocated after the build, peak bytes during it)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def mib(size):
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+def run(doctors, doctors_per_center, repeat):
+    data = synthetic_dataset(doctors, doctors_per_center, repeat)
+    text = json.dumps(data, ensure_ascii=False)
+    print(f"📦 {len(data['centers_data'])} centers, {doctors} doctor entries, {mib(len(text.encode()))} of JSON")
+    del data
+
+    dicts, dict_bytes, dict_peak = measure(lambda: json.loads(text))
+    records, record_bytes, record_peak = measure(lambda: load_centers(json.loads(text)))
+
+    # Timed outside tracemalloc, which slows allocation-heavy code down several times
+    _, from_dict_seconds = timed(lambda: load_centers(dicts))
+    written, to_dict_seconds = timed(lambda: [center.to_dict() for center in records])
+    same = written == dicts["centers_data"]
+
+    print(f"  dicts:   {mib(dict_bytes)} retained (peak {mib(dict_peak)})")
+    print(f"  records: {mib(record_bytes)} retained (peak {mib(record_peak)} while converting)")
+    print(f"  records use {record_bytes / dict_bytes:.0%} of the dict memory "
+          f"({(dict_bytes - record_bytes) / doctors:.0f} bytes less per doctor entry)")
+    print(f"  from_dict: {from_dict_seconds:.2f}s, to_dict: {to_dict_seconds:.2f}s "
+          f"({(from_dict_seconds + to_dict_seconds) / doctors * 1e6:.1f} µs per doctor entry for both)")
+    print(f"  {'✅ to_dict writes the same JSON as the dicts' if same else '❌ to_dict differs from the dicts'}")
+    return same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory of scraped data as dicts vs slotted records")
+    parser.add_argument("--doctors", type=int, default=100_000, help="doctor entries in the synthetic crawl")
+    parser.add_argument("--per-center", type=int, default=50, help="doctor entries per center")
+    parser.add_argument("--repeat", type=float, default=0.2,
+                        help="share of entries listing a doctor already listed elsewhere")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.doctors, args.per_center, args.repeat) else 1)
@@ -0,0 +1,67 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+
+# HTTP plumbing shared by every request of a crawl: one pooled requests
+# session (keep-alive connections reused across threads and locales) and a
+# per-host rate limiter that paces all threads together, instead of each
+# request sleeping a fixed second on its own.
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/91.0.4472.124 Safari/537.36')
+
+DEFAULT_WORKERS = 4
+# Requests per second per host, across all threads: the pace of the old
+# sequential crawl (one request, then a one-second sleep). More workers
+# overlap the waits but don't raise the load on the site; --rate does.
+DEFAULT_REQUESTS_PER_SECOND = 1.0
+REQUEST_TIMEOUT = 10
+
+# The site's certificate chain fails verification in some environments
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """requests session with a connection pool big enough for pool_size threads"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    session.verify = False
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class RateLimiter:
+    """Spaces requests to each host at least 1 / requests_per_second apart.
+
+    Thread-safe: each caller reserves the next free slot for its host under
+    the lock and then sleeps until it, so concurrent threads are paced as a
+    group and never burst together.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+        self.interval = 1.0 / requests_per_second
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def fetch(session, rate_limiter, url, timeout=REQUEST_TIMEOUT):
+    """GET a page after waiting for its host's rate limit; raises on HTTP errors"""
+    rate_limiter.wait(url)
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
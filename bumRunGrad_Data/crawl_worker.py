@@ -0,0 +1,178 @@
+import argparse
+from contextlib import contextmanager
+import os
+import socket
+import threading
+import time
+
+import requests
+
+from AllCentersContactAndDoctorsInfo import BumrungradScraper
+from crawl_session import DEFAULT_REQUESTS_PER_SECOND
+from listing import align_listings
+from records import Center
+from work_queue import DEFAULT_LEASE_SECONDS, LEASED, PENDING, WORK_QUEUE_FILE, QueueRateLimiter, open_queue
+
+# The detail crawl as a work queue (work_queue.py), so any number of worker
+# processes, on this machine or others, can share it:
+#
+#   python crawl_worker.py enqueue --locale th --locale ar     # tasks from firstAllCenters.json
+#   python crawl_worker.py work --threads 4                    # run as many of these as you like
+#   python crawl_worker.py merge                               # -> bumrungrad_centers_complete_data.json
+#   python crawl_worker.py status
+#
+# --queue is a SQLite file shared by local workers (default crawl_queue.sqlite3)
+# or the URL of work_queue_server.py for workers on other machines. Workers
+# pace their requests through the queue, so --rate holds across all of them.
+# merge writes the same file as AllCentersContactAndDoctorsInfo.py.
+
+POLL_SECONDS = 5
+# Longest wait between retries while the queue server is unreachable
+MAX_RETRY_SECONDS = 60
+
+
+def enqueue(queue, listing_file, locales=()):
+    """Queue the English listing's detail pages, plus the aligned pages of other locales"""
+    scraper = BumrungradScraper(listing_file)
+    if not scraper.load_centers_data():
+        return
+    tasks = [{'key': f"en {center['detail_url']}", 'payload': {'locale': 'en', 'index': index, 'center': center}}
+             for index, center in enumerate(scraper.centers_data)]
+    for locale in locales:
+        if locale == 'en':
+            continue
+        aligned, unaligned = align_listings(scraper.centers_data, scraper.fetch_listing(locale))
+        print(f"🔗 /{locale}/: {len(aligned)} centers aligned, {len(unaligned)} unmatched")
+        for center in unaligned:
+            print(f"  ⚠️ not queued: {center['name']} - {center['detail_url']}")
+        tasks.extend({'key': f"{locale} {center['detail_url']}",
+                      'payload': {'locale': locale, 'index': index, 'center': center}}
+                     for index, center in sorted(aligned.items()))
+    print(f"📥 Queued {queue.put(tasks)} new tasks ({len(tasks)} listed)")
+
+
+@contextmanager
+def keep_leased(queue, task, worker, lease_seconds):
+    """Heartbeat the task's lease from a background thread while the block runs"""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(lease_seconds / 3):
+            try:
+                if not queue.heartbeat(task['id'], worker, lease_seconds):
+                    print(f"⚠️ {worker} lost the lease on {task['key']}")
+                    return
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️ Heartbeat failed for {task['key']}: {str(e)}")
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def retrying(call, description):
+    """Call a queue method until it gets through, backing off while the queue server is unreachable"""
+    delay = POLL_SECONDS
+    while True:
+        try:
+            return call()
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ {description} failed, retrying in {delay}s: {str(e)}")
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_SECONDS)
+
+
+def work(queue, scraper, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Scrape leased tasks until the queue has nothing pending or leased left"""
+    done = 0
+    while True:
+        task = retrying(lambda: queue.lease(worker, lease_seconds), "Lease")
+        if task is None:
+            stats = retrying(queue.stats, "Stats")
+            if not stats.get(PENDING) and not stats.get(LEASED):
+                print(f"🏁 {worker} finished after {done} tasks")
+                return done
+            # Tasks waiting for a retry, or leased by workers that may yet die
+            time.sleep(POLL_SECONDS)
+            continue
+
+        with keep_leased(queue, task, worker, lease_seconds):
+            result = scraper.scrape_center_details(task['payload']['center'])
+        # Retried until they get through; if the lease expires meanwhile the
+        # queue ignores them and the task's next worker reports instead
+        if result.scraping_status == 'success':
+            retrying(lambda: queue.ack(task['id'], worker, result.to_dict()), f"Ack of {task['key']}")
+            done += 1
+        else:
+            # The error record is kept in case this was the last attempt
+            retrying(lambda: queue.fail(task['id'], worker, result.error_message, result.to_dict()),
+                     f"Failure report of {task['key']}")
+
+
+def merge(queue, output_file):
+    """Write the queue's results in the scraper's output format"""
+    centers = {}
+    translations = []
+    unfinished = 0
+    locales = set()
+    for task in queue.results():
+        payload = task['payload']
+        if task['result'] is None:
+            unfinished += 1
+        elif payload['locale'] == 'en':
+            centers[payload['index']] = Center.from_dict(task['result'])
+        else:
+            locales.add(payload['locale'])
+            translations.append((payload['index'], payload['locale'], Center.from_dict(task['result'])))
+
+    for index, locale, translation in translations:
+        center = centers.get(index)
+        if center is not None:
+            if center.translations is None:
+                center.translations = {}
+            center.translations[locale] = translation
+
+    if unfinished:
+        print(f"⚠️ {unfinished} tasks have no result yet and are left out")
+    scraper = BumrungradScraper(None)
+    scraper.scraped_data = [centers[index] for index in sorted(centers)]
+    # Unmatched listing entries were reported (and skipped) at enqueue time
+    scraper.unaligned = {locale: [] for locale in sorted(locales)}
+    scraper.save_results(output_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Bumrungrad detail crawl through a shared work queue")
+    parser.add_argument("command", choices=["enqueue", "work", "merge", "status", "requeue"])
+    parser.add_argument("--queue", default=WORK_QUEUE_FILE, help="SQLite queue file or work queue server URL")
+    parser.add_argument("--token", default=os.environ.get("WORK_QUEUE_TOKEN", ""), help="work queue server token")
+    parser.add_argument("--listing", default="firstAllCenters.json", help="enqueue: English listing entries")
+    parser.add_argument("--locale", action="append", default=[], help="enqueue: also queue this locale; repeatable")
+    parser.add_argument("--threads", type=int, default=1, help="work: concurrent tasks in this process")
+    parser.add_argument("--rate", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="work: requests per second per site, across all workers")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="work: lease length in seconds")
+    parser.add_argument("--output", default="bumrungrad_centers_complete_data.json", help="merge: output file")
+    args = parser.parse_args()
+
+    queue = open_queue(args.queue, args.token)
+    if args.command == "enqueue":
+        enqueue(queue, args.listing, args.locale)
+    elif args.command == "work":
+        scraper = BumrungradScraper(None, rate_limiter=QueueRateLimiter(queue, args.rate), workers=args.threads)
+        workers = [threading.Thread(target=work, args=(queue, scraper, f"{socket.gethostname()}-{os.getpid()}-{i}",
+                                                       args.lease))
+                   for i in range(args.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    elif args.command == "merge":
+        merge(queue, args.output)
+    elif args.command == "requeue":
+        print(f"🔁 Requeued {queue.requeue_failed()} failed tasks")
+    print(f"📊 Queue: {queue.stats()}")
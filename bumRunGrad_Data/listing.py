@@ -0,0 +1,209 @@
+import codecs
+from html.parser import HTMLParser
+import re
+from urllib.parse import urlsplit
+
+# The clinics-and-centers listing page, in any of the site's locales: parse
+# its cards into the entries the detail scraper reads (firstAllCenters.json
+# format) and align localized entries to the English ones.
+#
+# The parser streams: it is fed the page in chunks and emits each card's
+# entry as soon as the card's closing tag arrives, holding only the card
+# being read. There is no document tree, so memory stays flat however long
+# the listing is. iter_centers() also works on a page piped from the
+# renderer while it is still being written.
+#
+# A center keeps its card icon across locales, so the attachment GUID in
+# the image URL is the primary key; the detail URL slug (the path after the
+# locale prefix) is the fallback for cards without an icon.
+
+BASE_URL = "https://www.bumrungrad.com"
+# Locale prefixes the site serves the listing under
+LOCALES = ('en', 'th', 'ar', 'zh', 'jp', 'vn', 'id', 'mm', 'kh', 'bn', 'de', 'bg')
+
+ATTACHMENT_PATTERN = re.compile(r'/getattachment/([0-9a-fA-F-]{36})/')
+
+
+def listing_url(locale='en'):
+    return f"{BASE_URL}/{locale}/clinics-and-centers"
+
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def classes(attrs):
+    return set((dict(attrs).get('class') or '').split())
+
+
+class ListingParser(HTMLParser):
+    """Event-driven parser of listing cards (div.col-sm-12.col-lg-6).
+
+    Calls on_center(entry) when each card closes. Cards are tracked by div
+    depth, since divs are always closed explicitly. Within a card it reads
+    the first strong inside a.cardclinic-title (name), the first
+    div.icon-center's style (image), the text of the first div directly in
+    div.collapse (location) and the first link in div.collapse (detail page).
+    """
+
+    def __init__(self, on_center, base_url=BASE_URL):
+        super().__init__()
+        self.on_center = on_center
+        self.base_url = base_url
+        self.card = None
+        # Text since the last tag; a text node can arrive split over several feeds
+        self.text = []
+
+    def start_card(self):
+        self.card = {'name': None, 'image_style': None, 'location': None, 'href': None}
+        # Open divs in the card, and the depths of .collapse and of its location div
+        self.div_depth = 0
+        self.collapse_depth = None
+        self.location_depth = None
+        self.in_title = False
+        self.name_parts = None
+        self.location_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        if tag == 'div':
+            names = classes(attrs)
+            if self.card is None:
+                if {'col-sm-12', 'col-lg-6'} <= names:
+                    self.start_card()
+                else:
+                    return
+            self.div_depth += 1
+            if 'icon-center' in names and self.card['image_style'] is None:
+                self.card['image_style'] = dict(attrs).get('style') or ''
+            if 'collapse' in names and self.collapse_depth is None:
+                self.collapse_depth = self.div_depth
+            elif (self.collapse_depth is not None and self.div_depth == self.collapse_depth + 1
+                  and self.card['location'] is None and self.location_parts is None):
+                self.location_depth = self.div_depth
+                self.location_parts = []
+        elif self.card is None:
+            return
+        elif tag == 'a':
+            if 'cardclinic-title' in classes(attrs):
+                self.in_title = True
+            if self.collapse_depth is not None and self.card['href'] is None:
+                self.card['href'] = dict(attrs).get('href') or ''
+        elif tag == 'strong' and self.in_title and self.card['name'] is None and self.name_parts is None:
+            self.name_parts = []
+
+    def handle_endtag(self, tag):
+        self.flush_text()
+        if self.card is None:
+            return
+        if tag == 'div':
+            if self.div_depth == self.location_depth:
+                self.card['location'] = ' '.join(self.location_parts)
+                self.location_depth = self.location_parts = None
+            if self.div_depth == self.collapse_depth:
+                self.collapse_depth = None
+            self.div_depth -= 1
+            if self.div_depth == 0:
+                self.end_card()
+        elif tag == 'a':
+            self.in_title = False
+        elif tag == 'strong' and self.name_parts is not None:
+            self.card['name'] = ''.join(self.name_parts)
+            self.name_parts = None
+
+    def handle_data(self, data):
+        if self.card is not None:
+            self.text.append(data)
+
+    def handle_comment(self, data):
+        self.flush_text()
+
+    def flush_text(self):
+        # Same as BeautifulSoup's get_text(strip=True): each text node stripped, empty ones dropped
+        text = ''.join(self.text).strip()
+        self.text.clear()
+        if not text or self.card is None:
+            return
+        if self.name_parts is not None:
+            self.name_parts.append(text)
+        if self.location_parts is not None:
+            self.location_parts.append(text)
+
+    def end_card(self):
+        card, self.card = self.card, None
+        base_url = self.base_url
+        image_style = card['image_style'] or ""
+        image_url = (
+            base_url + image_style.split("url(")[-1].split(")")[0]
+            if "url(" in image_style else "N/A"
+        )
+        href = card['href'] or ""
+        detail_url = href if href.startswith("http") else base_url + href
+        detail_url = detail_url.replace(base_url + "https://", "https://")
+        self.on_center({
+            "name": card['name'] if card['name'] is not None else "N/A",
+            "image_url": image_url,
+            "location": card['location'] if card['location'] is not None else "N/A",
+            "detail_url": detail_url
+        })
+
+
+def iter_centers(chunks, base_url=BASE_URL):
+    """Yield listing entries as their cards close, from an iterable of str or UTF-8 bytes chunks"""
+    ready = []
+    parser = ListingParser(ready.append, base_url)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        yield from ready
+        ready.clear()
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    parser.flush_text()
+    yield from ready
+
+
+def read_chunks(file, size=READ_CHUNK_SIZE):
+    """Chunks of a file object as they become readable, e.g. a pipe from the renderer"""
+    read = getattr(file, 'read1', file.read)
+    while chunk := read(size):
+        yield chunk
+
+
+def extract_centers(html, base_url=BASE_URL):
+    """Listing entries ({name, image_url, location, detail_url}) from a whole listing page"""
+    return list(iter_centers([html], base_url))
+
+
+def attachment_key(center):
+    match = ATTACHMENT_PATTERN.search(center.get('image_url') or '')
+    return match.group(1).lower() if match else None
+
+
+def slug_key(center):
+    """Detail URL path without its locale prefix, e.g. 'centers/allergy-center-...'"""
+    parts = urlsplit(center.get('detail_url') or '').path.strip('/').split('/', 1)
+    return parts[1].lower() if len(parts) == 2 else None
+
+
+def align_listings(english, localized):
+    """Match localized listing entries to English ones.
+
+    Returns ({English entry index: localized entry}, [localized entries that
+    matched nothing]). Each English entry gets at most one translation.
+    """
+    by_key = {}
+    for index, center in enumerate(english):
+        for key in (attachment_key(center), slug_key(center)):
+            if key:
+                by_key.setdefault(key, index)
+
+    aligned = {}
+    unmatched = []
+    for center in localized:
+        index = next((by_key[key] for key in (attachment_key(center), slug_key(center))
+                      if key in by_key and by_key[key] not in aligned), None)
+        if index is None:
+            unmatched.append(center)
+        else:
+            aligned[index] = center
+    return aligned, unmatched
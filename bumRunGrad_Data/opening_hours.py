@@ -0,0 +1,225 @@
+import json
+import re
+import sys
+
+# Normalization of the scraped opening hours. The center pages give hours as
+# free text ("Daily 8:00 am to 8:00 pm", "Monday through Friday" followed by
+# "8.00-20.00 (BKK Time)", "20.00-8.00" for an overnight contact center);
+# these helpers turn them into weekly intervals that are stored next to the
+# raw text, so consumers don't have to parse it again:
+#
+#   service_hours['weekly_hours'] = {
+#       'timezone': 'Asia/Bangkok',
+#       'intervals': [{'days': ['mon', ..., 'fri'], 'open': '08:00', 'close': '20:00'}, ...]
+#   }
+#   contact_information['hotline_hours'] = [
+#       {'phones': ['+662 011 3593'], 'timezone': 'Asia/Bangkok', 'intervals': [...]}, ...
+#   ]
+#
+# 'close' is '24:00' for a whole day and earlier than 'open' when the range
+# runs past midnight. All times are Bangkok time (UTC+7, no daylight saving);
+# "(BKK Time)" on the page only confirms it.
+#
+#   python opening_hours.py bumrungrad_centers_complete_data.json   # add the fields to a scraped file
+
+TIMEZONE = 'Asia/Bangkok'
+
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+DAY_PATTERN = re.compile(
+    r'\b(monday|mon|tuesday|tues|tue|wednesday|wed|thursday|thurs|thu|friday|fri|saturday|sat|sunday|sun)\b',
+    re.IGNORECASE
+)
+DAY_RANGE_SEPARATOR = re.compile(r'^\s*(?:through|thru|to|-|–)\s*$', re.IGNORECASE)
+EVERY_DAY_PATTERN = re.compile(r'\b(?:daily|every\s*day|7 days a week)\b', re.IGNORECASE)
+ALL_DAY_PATTERN = re.compile(r'\b24[\s-]*(?:hours?|hrs?)\b', re.IGNORECASE)
+
+# "8:00 am", "8.30", "20.00", "8am"; not digits inside phone numbers
+TIME = r'(?<![\d.:+])(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?m?\.?(?![\d])'
+TIME_RANGE_PATTERN = re.compile(
+    rf'(between\s+)?{TIME}\s*(-|–|\bto\b|\band\b)\s*{TIME}', re.IGNORECASE
+)
+
+# Contact lines that start another unit's numbers ("Bumrungrad Robotic Surgery Center")
+SECTION_WORDS = ('center', 'centre', 'department', 'clinic', 'unit')
+
+# Service-hours lines that point elsewhere ("Outside these hours, contact the 24-hour ER")
+REDIRECT_WORDS = ('contact', 'outside')
+
+
+def _minutes(hour, minute, meridiem):
+    hour = int(hour)
+    minute = int(minute or 0)
+    if meridiem:
+        meridiem = meridiem.lower()
+        # "16.00pm" already is a 24-hour time
+        if hour < 12 and meridiem == 'p':
+            hour += 12
+        elif hour == 12 and meridiem == 'a':
+            hour = 0
+    if hour > 24 or minute > 59 or (hour == 24 and minute):
+        return None
+    return hour * 60 + minute
+
+
+def _clock(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_days(text):
+    """Days named in text ("Monday through Friday", "Saturday & Sunday", "Daily"), or None"""
+    if EVERY_DAY_PATTERN.search(text):
+        return list(DAYS)
+    matches = list(DAY_PATTERN.finditer(text))
+    if not matches:
+        return None
+    days = []
+    for i, match in enumerate(matches):
+        day = DAYS.index(match.group(1)[:3].lower())
+        previous = matches[i - 1] if i else None
+        if previous and DAY_RANGE_SEPARATOR.match(text[previous.end():match.start()]):
+            # "Sunday through Friday" wraps around the week
+            start = DAYS.index(previous.group(1)[:3].lower())
+            span = [DAYS[(start + step) % 7] for step in range((day - start) % 7 + 1)]
+        else:
+            span = [DAYS[day]]
+        days.extend(d for d in span if d not in days)
+    return [day for day in DAYS if day in days]
+
+
+def parse_time_range(line):
+    """(open, close, text before the range) in minutes after midnight, or None"""
+    if ALL_DAY_PATTERN.search(line):
+        return 0, 24 * 60, line[:ALL_DAY_PATTERN.search(line).start()]
+    for match in TIME_RANGE_PATTERN.finditer(line):
+        between, hour1, minute1, meridiem1, separator, hour2, minute2, meridiem2 = match.groups()
+        if separator.lower() == 'and' and not between:
+            continue
+        # Bare numbers ("3-5") are not times
+        if not (minute1 or meridiem1) or not (minute2 or meridiem2):
+            continue
+        opens = _minutes(hour1, minute1, meridiem1)
+        closes = _minutes(hour2, minute2, meridiem2)
+        if opens is None or closes is None or opens == closes:
+            continue
+        return opens, closes, line[:match.start()]
+    return None
+
+
+def _add_interval(intervals, days, opens, closes):
+    interval = {'days': days, 'open': _clock(opens), 'close': _clock(closes)}
+    for existing in intervals:
+        if existing['open'] == interval['open'] and existing['close'] == interval['close']:
+            existing['days'] = [day for day in DAYS if day in existing['days'] or day in days]
+            return
+    intervals.append(interval)
+
+
+class _HoursReader:
+    """Reads lines in order, applying a day label line to the range line after it"""
+
+    def __init__(self):
+        self.label_days = None
+
+    def read(self, line):
+        """(days, open, close) for a line with a time range; remembers day labels"""
+        time_range = parse_time_range(line)
+        if time_range is None:
+            days = parse_days(line)
+            if days:
+                self.label_days = days
+            return None
+        opens, closes, prefix = time_range
+        days = parse_days(prefix) or self.label_days or list(DAYS)
+        self.label_days = None
+        return days, opens, closes
+
+
+def normalize_service_hours(lines):
+    """Weekly intervals from the lines of a center's "Service Hours" section"""
+    reader = _HoursReader()
+    intervals = []
+    for line in lines:
+        line = line.replace('\xa0', ' ')
+        if any(word in line.lower() for word in REDIRECT_WORDS):
+            continue
+        parsed = reader.read(line)
+        if parsed:
+            _add_interval(intervals, *parsed)
+    return {'timezone': TIMEZONE, 'intervals': intervals}
+
+
+def normalize_hotline_hours(lines, phone_numbers):
+    """Hours of the phone numbers in a center's contact section.
+
+    A time range usually comes before the numbers it applies to
+    ("8.00-20.00 (BKK Time)", "Hot line tel.", "+662 011 3593"); in
+    parentheses or after "between" it applies to the numbers just before it.
+    Numbers without any stated hours are left out.
+    """
+    reader = _HoursReader()
+    groups = []
+    current = None
+    pending = []
+    previous_was_range = False
+    for line in lines:
+        line = line.replace('\xa0', ' ')
+        phones = [phone for phone in phone_numbers if phone and phone.replace('\xa0', ' ') in line]
+        parsed = reader.read(line)
+        if parsed:
+            applies_back = line.lstrip().startswith('(') or 'between' in line.lower()
+            if applies_back:
+                pending.extend(phone for phone in phones if phone not in pending)
+                if pending:
+                    group = {'phones': pending, 'timezone': TIMEZONE, 'intervals': []}
+                    _add_interval(group['intervals'], *parsed)
+                    groups.append(group)
+                pending = []
+                current = None
+            else:
+                # Consecutive range lines ("Monday through Friday: ...", "Saturday: ...") share their numbers
+                if current is None or not previous_was_range:
+                    current = {'phones': [], 'timezone': TIMEZONE, 'intervals': []}
+                    groups.append(current)
+                _add_interval(current['intervals'], *parsed)
+                current['phones'].extend(phone for phone in phones if phone not in current['phones'])
+            previous_was_range = True
+            continue
+        previous_was_range = False
+        lowered = line.lower()
+        if not phones and 'contact' not in lowered and any(word in lowered for word in SECTION_WORDS):
+            current = None
+            pending = []
+            continue
+        target = current['phones'] if current else pending
+        target.extend(phone for phone in phones if phone not in target)
+    return [group for group in groups if group['phones'] and group['intervals']]
+
+
+def normalize_center(center):
+    """Add 'weekly_hours' and 'hotline_hours' next to a scraped center's raw hours text"""
+    scraped = center.get('scraped_data') or {}
+    service_hours = scraped.get('service_hours')
+    if service_hours:
+        service_hours['weekly_hours'] = normalize_service_hours(service_hours.get('service_text', []))
+    contact = scraped.get('contact_information')
+    if contact:
+        contact['hotline_hours'] = normalize_hotline_hours(contact.get('contact_text', []),
+                                                           contact.get('phone_numbers', []))
+    return center
+
+
+if __name__ == "__main__":
+    data_file = sys.argv[1] if len(sys.argv) > 1 else 'bumrungrad_centers_complete_data.json'
+    with open(data_file, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    centers = data.get('centers_data', [])
+    for center in centers:
+        normalize_center(center)
+    with open(data_file, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+    with_hours = sum(1 for center in centers
+                     if ((center.get('scraped_data') or {}).get('service_hours') or {})
+                     .get('weekly_hours', {}).get('intervals'))
+    print(f"✅ Normalized opening hours of {len(centers)} centers in {data_file} ({with_hours} with weekly hours)")
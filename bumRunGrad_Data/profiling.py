@@ -0,0 +1,175 @@
+from collections import Counter
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# Opt-in profiling of a scraper run or a chat turn (--profile on the
+# scrapers, the profiling toggle of the app's developer panel). While
+# active it records:
+#
+#   <name>-<time>.collapsed  stacks of every thread, sampled every few ms, one
+#                            "thread;outer;...;inner count" line per stack; feed
+#                            it to flamegraph.pl or speedscope
+#   <name>-<time>.txt        top functions by samples (or by deterministic
+#                            cProfile time with mode="cprofile"), and the top
+#                            allocation sites and peak of tracemalloc
+#   <name>-<time>.prof       with mode="cprofile": pstats data for snakeviz etc.
+#
+# Sampling sees all threads (the crawl's pool workers included) and measures
+# wall-clock time, so waits on the network and the rate limiter show up.
+# cProfile counts every call of the calling thread only. tracemalloc slows
+# allocation-heavy code, so compare times within one profile only.
+#
+# profiled(None) is a no-op context: when profiling is off nothing is
+# started, traced or sampled.
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_INTERVAL_SECONDS = 0.005
+DEFAULT_TOP = 25
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Background thread counting the stacks of all other threads every interval"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def collapsed(self):
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, top=DEFAULT_TOP):
+        """Report lines of the functions seen in the most samples, with self and total counts"""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            # Threads are the first entry, not functions
+            for label in set(stack[1:]):
+                total[label] += count
+        samples = sum(self.stacks.values()) or 1
+        lines = [f"{'total':>7} {'self':>7}  function  ({samples} thread samples)"]
+        for label, count in total.most_common(top):
+            lines.append(f"{count / samples:>7.1%} {own[label] / samples:>7.1%}  {label}")
+        return lines
+
+
+class Profiler:
+    """Profile what runs between start() and stop() (or inside `with`) and write the reports"""
+
+    def __init__(self, name, output_dir=DEFAULT_PROFILE_DIR, mode="sampling", top=DEFAULT_TOP,
+                 interval=DEFAULT_INTERVAL_SECONDS, memory=True):
+        self.name = name
+        self.output_dir = output_dir
+        self.mode = mode
+        self.top = top
+        self.memory = memory
+        self.sampler = StackSampler(interval) if mode == "sampling" else None
+        self.cprofile = cProfile.Profile() if mode == "cprofile" else None
+        self.report_path = None
+
+    def start(self):
+        if self.memory:
+            tracemalloc.start()
+            self.memory_start = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        if self.sampler:
+            self.sampler.start()
+        else:
+            self.cprofile.enable()
+        return self
+
+    def stop(self):
+        """Stop profiling and write the reports; returns the path of the text report"""
+        if self.sampler:
+            self.sampler.stop()
+        else:
+            self.cprofile.disable()
+        seconds = time.perf_counter() - self.started
+
+        lines = [f"{self.name}: {seconds:.3f}s wall clock, {self.mode} profile", ""]
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        if self.sampler:
+            with open(base + ".collapsed", "w", encoding="utf-8") as file:
+                file.write(self.sampler.collapsed())
+            lines.extend(self.sampler.top_functions(self.top))
+        else:
+            self.cprofile.dump_stats(base + ".prof")
+            report = io.StringIO()
+            pstats.Stats(self.cprofile, stream=report).sort_stats("cumulative").print_stats(self.top)
+            lines.append(report.getvalue().strip())
+
+        if self.memory:
+            lines.extend(["", f"Memory: {current / 1024 / 1024:.1f} MiB still allocated, "
+                              f"{peak / 1024 / 1024:.1f} MiB peak (tracemalloc)",
+                          f"Top {self.top} allocation sites by growth:"])
+            for stat in snapshot.compare_to(self.memory_start, "lineno")[:self.top]:
+                lines.append(f"  {stat}")
+
+        self.report_path = base + ".txt"
+        with open(self.report_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        print(f"🔬 Profile of {self.name} saved to {base}.*", file=sys.stderr)
+        return self.report_path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def profiled(output_dir, name, **options):
+    """Profiler writing to output_dir, or a no-op context when output_dir is None"""
+    if output_dir is None:
+        return contextlib.nullcontext()
+    return Profiler(name, output_dir, **options)
+
+
+def add_profile_argument(parser):
+    """--profile [DIR] and --profile-mode on an argparse parser"""
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, default=None, metavar="DIR",
+                        help=f"profile the run and save the reports to DIR (default {DEFAULT_PROFILE_DIR}/)")
+    parser.add_argument("--profile-mode", choices=["sampling", "cprofile"], default="sampling",
+                        help="sample all threads' stacks, or trace every call of the main thread")
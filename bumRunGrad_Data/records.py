@@ -0,0 +1,241 @@
+import sys
+from dataclasses import dataclass
+
+# Compact record types for scraped centers and doctors. The extractors build
+# these instead of nested dicts: slotted instances have no per-object
+# __dict__, lists of strings are stored as tuples, and strings that repeat
+# across a crawl (specialties, button labels, phone numbers, doctors listed
+# under several centers) are interned so that every copy is one object.
+#
+# to_dict() / from_dict() convert to and from the JSON format the scrapers
+# have always written (bumrungrad_centers_complete_data.json), key order
+# included; fields that were absent stay absent.
+
+
+def intern(value):
+    return None if value is None else sys.intern(value)
+
+
+def intern_all(values):
+    """Tuple of interned strings, or None for a missing list"""
+    return None if values is None else tuple(map(sys.intern, values))
+
+
+def _put(data, key, value):
+    if value is not None:
+        data[key] = value
+
+
+def _list(values):
+    return None if values is None else list(values)
+
+
+@dataclass(slots=True)
+class ActionButton:
+    kind: str  # 'call', 'inquiry' or 'appointment'
+    text: str
+    href: str
+
+
+@dataclass(slots=True)
+class Doctor:
+    name: str = None
+    specialties: tuple = None
+    image_url: str = None
+    image_alt: str = None
+    # (width, height) as scraped, e.g. ('189', '189')
+    image_size: tuple = None
+    profile_url: str = None
+    action_buttons: tuple = ()
+    doctor_id: str = None
+
+    def __post_init__(self):
+        self.name = intern(self.name)
+        self.specialties = intern_all(self.specialties)
+        self.image_url = intern(self.image_url)
+        self.image_alt = intern(self.image_alt)
+        self.image_size = intern_all(self.image_size)
+        self.profile_url = intern(self.profile_url)
+        self.doctor_id = intern(self.doctor_id)
+
+    def to_dict(self):
+        doctor = {}
+        _put(doctor, 'image_url', self.image_url)
+        _put(doctor, 'image_alt', self.image_alt)
+        if self.image_size is not None:
+            doctor['image_dimensions'] = {'width': self.image_size[0], 'height': self.image_size[1]}
+        _put(doctor, 'name', self.name)
+        _put(doctor, 'specialties', _list(self.specialties))
+        _put(doctor, 'profile_url', self.profile_url)
+        doctor['action_buttons'] = {button.kind: {'text': button.text, 'href': button.href}
+                                    for button in self.action_buttons}
+        _put(doctor, 'doctor_id', self.doctor_id)
+        return doctor
+
+    @classmethod
+    def from_dict(cls, data):
+        dimensions = data.get('image_dimensions')
+        return cls(
+            name=data.get('name'),
+            specialties=data.get('specialties'),
+            image_url=data.get('image_url'),
+            image_alt=data.get('image_alt'),
+            image_size=(dimensions['width'], dimensions['height']) if dimensions else None,
+            profile_url=data.get('profile_url'),
+            action_buttons=tuple(ActionButton(intern(kind), intern(button.get('text')), intern(button.get('href')))
+                                 for kind, button in (data.get('action_buttons') or {}).items()),
+            doctor_id=data.get('doctor_id'),
+        )
+
+
+@dataclass(slots=True)
+class ContactInfo:
+    phone_numbers: tuple = ()
+    contact_text: tuple = ()
+    # (start, end) pairs matched by the scraper's hours regex
+    hours: tuple = ()
+    # Normalized hours per phone number (see opening_hours.py), kept as JSON data
+    hotline_hours: list = None
+
+    def __post_init__(self):
+        self.phone_numbers = intern_all(self.phone_numbers)
+        self.contact_text = intern_all(self.contact_text)
+        self.hours = tuple(map(intern_all, self.hours))
+
+    def to_dict(self):
+        contact = {
+            'phone_numbers': list(self.phone_numbers),
+            'contact_text': list(self.contact_text),
+            'hours': [list(pair) for pair in self.hours],
+        }
+        _put(contact, 'hotline_hours', self.hotline_hours)
+        return contact
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('phone_numbers', ()), data.get('contact_text', ()), data.get('hours', ()),
+                   data.get('hotline_hours'))
+
+
+@dataclass(slots=True)
+class ServiceHours:
+    service_text: tuple = ()
+    hours_info: tuple = ()
+    # Normalized weekly intervals (see opening_hours.py), kept as JSON data
+    weekly_hours: dict = None
+
+    def __post_init__(self):
+        self.service_text = intern_all(self.service_text)
+        self.hours_info = intern_all(self.hours_info)
+
+    def to_dict(self):
+        service_hours = {'service_text': list(self.service_text), 'hours_info': list(self.hours_info)}
+        _put(service_hours, 'weekly_hours', self.weekly_hours)
+        return service_hours
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('service_text', ()), data.get('hours_info', ()), data.get('weekly_hours'))
+
+
+@dataclass(slots=True)
+class Location:
+    location_text: tuple = ()
+    building_info: tuple = ()
+
+    def __post_init__(self):
+        self.location_text = intern_all(self.location_text)
+        self.building_info = intern_all(self.building_info)
+
+    def to_dict(self):
+        return {'location_text': list(self.location_text), 'building_info': list(self.building_info)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('location_text', ()), data.get('building_info', ()))
+
+
+def _section(record):
+    # A section missing from the page is written as {}
+    return record.to_dict() if record is not None else {}
+
+
+@dataclass(slots=True)
+class Center:
+    name: str
+    detail_url: str
+    scraping_status: str
+    scraped_at: str
+    original_image_url: str = None
+    original_location: str = None
+    # Sections are None when the page had none; doctors is None when the page wasn't scraped
+    contact: ContactInfo = None
+    service_hours: ServiceHours = None
+    location: Location = None
+    doctors: tuple = None
+    error_message: str = None
+    # Localized versions of this center from a multi-locale crawl, {locale: Center}
+    translations: dict = None
+
+    def __post_init__(self):
+        self.name = intern(self.name)
+        self.scraping_status = intern(self.scraping_status)
+        self.original_location = intern(self.original_location)
+        if self.doctors is not None:
+            self.doctors = tuple(self.doctors)
+
+    @property
+    def doctors_count(self):
+        return len(self.doctors or ())
+
+    def to_dict(self):
+        center = {'name': self.name}
+        _put(center, 'original_image_url', self.original_image_url)
+        _put(center, 'original_location', self.original_location)
+        center['detail_url'] = self.detail_url
+        if self.doctors is not None:
+            center['scraped_data'] = {
+                'contact_information': _section(self.contact),
+                'service_hours': _section(self.service_hours),
+                'location': _section(self.location),
+                'doctors': [doctor.to_dict() for doctor in self.doctors],
+            }
+        center['scraping_status'] = self.scraping_status
+        _put(center, 'error_message', self.error_message)
+        center['scraped_at'] = self.scraped_at
+        center['doctors_count'] = self.doctors_count
+        if self.translations:
+            center['translations'] = {locale: translation.to_dict()
+                                      for locale, translation in self.translations.items()}
+        return center
+
+    @classmethod
+    def from_dict(cls, data):
+        scraped = data.get('scraped_data')
+        center = cls(
+            name=data['name'],
+            detail_url=data['detail_url'],
+            scraping_status=data['scraping_status'],
+            scraped_at=data['scraped_at'],
+            original_image_url=data.get('original_image_url'),
+            original_location=data.get('original_location'),
+            error_message=data.get('error_message'),
+        )
+        if scraped is not None:
+            contact = scraped.get('contact_information')
+            service_hours = scraped.get('service_hours')
+            location = scraped.get('location')
+            center.contact = ContactInfo.from_dict(contact) if contact else None
+            center.service_hours = ServiceHours.from_dict(service_hours) if service_hours else None
+            center.location = Location.from_dict(location) if location else None
+            center.doctors = tuple(Doctor.from_dict(doctor) for doctor in scraped.get('doctors') or ())
+        translations = data.get('translations')
+        if translations:
+            center.translations = {locale: cls.from_dict(translation)
+                                   for locale, translation in translations.items()}
+        return center
+
+
+def load_centers(data):
+    """Center records from a scraped file's parsed JSON ({'centers_data': [...]})"""
+    return [Center.from_dict(center) for center in data.get('centers_data', [])]
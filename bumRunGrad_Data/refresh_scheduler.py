@@ -0,0 +1,265 @@
+import argparse
+from contextlib import contextmanager
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+import requests
+
+from AllCentersContactAndDoctorsInfo import BumrungradScraper
+from crawl_session import RateLimiter
+from listing import BASE_URL, extract_centers, listing_url
+from records import load_centers
+
+# Long-running refresh of the scraped dataset. Instead of recrawling every
+# page on demand, it tracks how often each page actually changes and
+# revisits pages in proportion to that:
+#
+#   python refresh_scheduler.py --budget 120           # daemon, at most 120 requests per hour
+#   python refresh_scheduler.py --once                 # a single round, then exit
+#
+# Each page (the listing, every center page, every doctor profile) has an
+# estimated interval between changes. The interval halves when a check
+# finds a change and doubles when it finds none, within
+# [MIN_INTERVAL_SECONDS, MAX_INTERVAL_SECONDS]. A page is due once that
+# interval has passed since its last check. Due pages go into a priority
+# queue by their probability of having changed since, 1 - exp(-elapsed /
+# interval), and the most likely changes are checked first until the
+# hourly budget is spent.
+#
+# Center pages are checked with scrape_center_details. A changed center
+# replaces its record in the dataset file. New centers on the listing and
+# new doctors on a center page start being tracked.
+
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "refresh_state.sqlite3")
+DATA_FILE = "bumrungrad_centers_complete_data.json"
+
+DEFAULT_HOURLY_BUDGET = 120
+DEFAULT_INTERVAL_SECONDS = 24 * 3600
+MIN_INTERVAL_SECONDS = 3600
+MAX_INTERVAL_SECONDS = 60 * 24 * 3600
+BACKOFF = 2
+TICK_SECONDS = 60
+# The refresh trickles along, far below the full crawl's rate
+REQUESTS_PER_SECOND = 0.5
+
+LISTING, CENTER, DOCTOR = 'listing', 'center', 'doctor'
+
+
+def fingerprint(data):
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def center_fingerprint(center):
+    """Fingerprint of a Center's scraped content, ignoring when it was scraped"""
+    data = center.to_dict()
+    for key in ('scraped_at', 'translations'):
+        data.pop(key, None)
+    return fingerprint(data)
+
+
+def page_fingerprint(html):
+    """Fingerprint of a page's visible text (scripts, styles and whitespace ignored)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript']):
+        tag.decompose()
+    return fingerprint(re.sub(r'\s+', ' ', soup.get_text(' ')).strip())
+
+
+def listing_entry(center):
+    """The listing entry scrape_center_details takes, from a Center record"""
+    return {'name': center.name, 'image_url': center.original_image_url,
+            'location': center.original_location, 'detail_url': center.detail_url}
+
+
+def change_probability(page, now):
+    """Chance the page changed since its last check, if changes arrive at random at 1 / interval"""
+    if page['last_checked'] is None:
+        return 1.0
+    return 1 - math.exp(-(now - page['last_checked']) / page['interval'])
+
+
+class RefreshScheduler:
+    def __init__(self, data_file=DATA_FILE, state_file=STATE_FILE, hourly_budget=DEFAULT_HOURLY_BUDGET,
+                 scraper=None):
+        self.data_file = data_file
+        self.state_file = state_file
+        self.hourly_budget = hourly_budget
+        self.scraper = scraper or BumrungradScraper(None, rate_limiter=RateLimiter(REQUESTS_PER_SECOND), workers=1)
+
+        with open(data_file, 'r', encoding='utf-8') as file:
+            self.centers = load_centers(json.load(file))
+        # Set when a center record was replaced or added since the last save
+        self.dirty = False
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    entry TEXT,
+                    fingerprint TEXT,
+                    interval REAL NOT NULL,
+                    last_checked REAL,
+                    checks INTEGER NOT NULL DEFAULT 0,
+                    changes INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+        self.seed()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.state_file, timeout=5)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def track(self, conn, url, kind, entry=None, fingerprint=None, last_checked=None,
+              interval=DEFAULT_INTERVAL_SECONDS):
+        """Start tracking a page; pages already tracked are left as they are"""
+        conn.execute(
+            "INSERT OR IGNORE INTO pages (url, kind, entry, fingerprint, interval, last_checked) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, kind, json.dumps(entry, ensure_ascii=False) if entry else None, fingerprint, interval, last_checked)
+        )
+
+    def track_doctors(self, conn, center):
+        for doctor in center.doctors or ():
+            if doctor.profile_url:
+                self.track(conn, urljoin(BASE_URL, doctor.profile_url), DOCTOR)
+
+    def seed(self):
+        """Track the listing and every page of the dataset, starting from what was last scraped"""
+        with self._connect() as conn:
+            self.track(conn, listing_url('en'), LISTING)
+            for center in self.centers:
+                if center.scraping_status != 'success':
+                    self.track(conn, center.detail_url, CENTER, listing_entry(center))
+                    continue
+                scraped_at = datetime.strptime(center.scraped_at, '%Y-%m-%d %H:%M:%S').timestamp()
+                self.track(conn, center.detail_url, CENTER, listing_entry(center),
+                           center_fingerprint(center), scraped_at)
+                self.track_doctors(conn, center)
+
+    def pages(self):
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM pages")]
+
+    def requests_last_hour(self, now):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM pages WHERE last_checked > ?", (now - 3600,)).fetchone()[0]
+
+    def select(self, now):
+        """Due pages to check now, most likely to have changed first, within the hourly budget"""
+        budget = self.hourly_budget - self.requests_last_hour(now)
+        if budget <= 0:
+            return []
+        queue = [(-change_probability(page, now), page['url'], page) for page in self.pages()
+                 if page['last_checked'] is None or now - page['last_checked'] >= page['interval']]
+        heapq.heapify(queue)
+        return [heapq.heappop(queue)[2] for _ in range(min(budget, len(queue)))]
+
+    def check_listing(self, page, conn):
+        """Fingerprint of the listing; tracks centers that are new on it"""
+        centers = extract_centers(self.scraper.fetch(page['url']).content)
+        for entry in centers:
+            self.track(conn, entry['detail_url'], CENTER, entry, interval=MIN_INTERVAL_SECONDS)
+        return fingerprint(centers)
+
+    def check_center(self, page, conn):
+        """Fingerprint of the center page; replaces the dataset record when it changed"""
+        center = self.scraper.scrape_center_details(json.loads(page['entry']))
+        if center.scraping_status != 'success':
+            raise requests.exceptions.RequestException(center.error_message)
+        new_fingerprint = center_fingerprint(center)
+        if new_fingerprint != page['fingerprint']:
+            for i, old in enumerate(self.centers):
+                if old.detail_url == center.detail_url:
+                    center.translations = old.translations
+                    self.centers[i] = center
+                    break
+            else:
+                self.centers.append(center)
+            self.dirty = True
+            self.track_doctors(conn, center)
+        return new_fingerprint
+
+    def check_doctor(self, page, conn):
+        return page_fingerprint(self.scraper.fetch(page['url']).content)
+
+    def check(self, page, now):
+        """Fetch a page and update its change interval. Returns True if it changed."""
+        checker = {LISTING: self.check_listing, CENTER: self.check_center, DOCTOR: self.check_doctor}[page['kind']]
+        with self._connect() as conn:
+            try:
+                new_fingerprint = checker(page, conn)
+            except requests.exceptions.RequestException as e:
+                # Counts against the budget; retried once the interval passes again
+                print(f"❌ {page['url']}: {str(e)}")
+                conn.execute("UPDATE pages SET last_checked = ? WHERE url = ?", (now, page['url']))
+                return False
+
+            # The first fingerprint of a page is a baseline, not a change
+            changed = page['fingerprint'] is not None and new_fingerprint != page['fingerprint']
+            if page['fingerprint'] is None:
+                interval = page['interval']
+            elif changed:
+                interval = max(MIN_INTERVAL_SECONDS, page['interval'] / BACKOFF)
+            else:
+                interval = min(MAX_INTERVAL_SECONDS, page['interval'] * BACKOFF)
+            conn.execute(
+                "UPDATE pages SET fingerprint = ?, interval = ?, last_checked = ?, checks = checks + 1, "
+                "changes = changes + ? WHERE url = ?",
+                (new_fingerprint, interval, now, int(changed), page['url'])
+            )
+        return changed
+
+    def save(self):
+        self.scraper.scraped_data = self.centers
+        self.scraper.save_results(self.data_file)
+        self.dirty = False
+
+    def tick(self, now=None):
+        """Check the pages selected for now; saves the dataset if a center changed or was added"""
+        now = time.time() if now is None else now
+        pages = self.select(now)
+        changed = [page for page in pages if self.check(page, now)]
+        if changed:
+            print(f"🔄 Changed: {', '.join(page['url'] for page in changed)}")
+        if self.dirty:
+            self.save()
+        print(f"⏱️ Checked {len(pages)} pages, {len(changed)} changed "
+              f"({self.requests_last_hour(now)}/{self.hourly_budget} requests this hour)")
+        return pages, changed
+
+    def run(self, tick_seconds=TICK_SECONDS):
+        print(f"🚀 Refreshing {len(self.pages())} pages with {self.hourly_budget} requests per hour")
+        while True:
+            self.tick()
+            time.sleep(tick_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the scraped dataset fresh within an hourly request budget")
+    parser.add_argument("--data", default=DATA_FILE, help="scraped dataset to refresh")
+    parser.add_argument("--state", default=STATE_FILE, help="SQLite file with per-page change history")
+    parser.add_argument("--budget", type=int, default=DEFAULT_HOURLY_BUDGET, help="requests per hour")
+    parser.add_argument("--once", action="store_true", help="run a single round and exit")
+    args = parser.parse_args()
+
+    scheduler = RefreshScheduler(args.data, args.state, args.budget)
+    if args.once:
+        scheduler.tick()
+    else:
+        scheduler.run()
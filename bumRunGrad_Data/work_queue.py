@@ -0,0 +1,274 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import quote, urlsplit
+
+import requests
+
+# Work queue for crawls spread over several worker processes or machines
+# (see crawl_worker.py). A task is one page to scrape, with a JSON payload.
+# Workers lease tasks for a limited time, extend the lease with heartbeats
+# while they work, and then ack the result or report a failure. A failed
+# task is requeued with backoff until it runs out of attempts. A task whose
+# worker died is leased again once its lease expires. The queue also keeps
+# the per-host request slots, so one rate limit holds across all workers.
+#
+# Backends: SQLiteWorkQueue for workers on one machine (a shared file), and
+# HTTPWorkQueue for workers anywhere, talking to work_queue_server.py in
+# front of a SQLiteWorkQueue. open_queue() picks one from a path or URL.
+
+WORK_QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawl_queue.sqlite3")
+
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 3
+# Doubled after each failed attempt
+DEFAULT_RETRY_DELAY_SECONDS = 30
+
+# Task states
+PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+
+class WorkQueue(ABC):
+    """Interface of a crawl work queue.
+
+    Tasks are dicts {'id', 'key', 'payload', 'attempts'}. Leases are held by
+    a worker id; heartbeat / ack / fail return False when the worker no
+    longer holds the lease (it expired and the task went to another worker).
+    """
+
+    @abstractmethod
+    def put(self, tasks):
+        """Add tasks [{'key', 'payload'}] in order; keys already queued are skipped. Returns the count added."""
+
+    @abstractmethod
+    def lease(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Lease the next available task, or None if none is available now"""
+
+    @abstractmethod
+    def heartbeat(self, task_id, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend the worker's lease on the task by lease_seconds from now"""
+
+    @abstractmethod
+    def ack(self, task_id, worker, result):
+        """Mark the task done with its JSON result"""
+
+    @abstractmethod
+    def fail(self, task_id, worker, error, result=None):
+        """Requeue the task with backoff, or mark it failed after its last attempt"""
+
+    @abstractmethod
+    def requeue_failed(self):
+        """Give failed tasks a fresh set of attempts. Returns the count requeued."""
+
+    @abstractmethod
+    def results(self):
+        """[{'key', 'payload', 'state', 'result', 'error'}] for every task, in the order they were put"""
+
+    @abstractmethod
+    def stats(self):
+        """{state: task count}"""
+
+    @abstractmethod
+    def reserve_slot(self, host, interval):
+        """Reserve the next request slot for host, at least interval seconds after the last one.
+        Returns the seconds to wait until the slot."""
+
+
+class QueueRateLimiter:
+    """Rate limiter (crawl_session.RateLimiter interface) whose slots live in the work queue,
+    so the limit is shared by every worker using that queue"""
+
+    def __init__(self, queue, requests_per_second):
+        self.queue = queue
+        self.interval = 1.0 / requests_per_second
+
+    def wait(self, url):
+        delay = self.queue.reserve_slot(urlsplit(url).netloc, self.interval)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    def __init__(self, db_path=WORK_QUEUE_FILE, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 retry_delay=DEFAULT_RETRY_DELAY_SECONDS):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT UNIQUE NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, available_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    host TEXT PRIMARY KEY,
+                    next_slot REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # Same pattern as the chatbot's SQLite stores: a short-lived
+        # connection per call, WAL so that workers don't block each other's
+        # reads. The statements of one call run in one transaction (the
+        # `with conn` block), so lease()'s two UPDATEs commit together.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def put(self, tasks):
+        now = time.time()
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (key, payload, state, available_at) VALUES (?, ?, ?, ?)",
+                [(task['key'], json.dumps(task['payload'], ensure_ascii=False), PENDING, now) for task in tasks]
+            )
+            return conn.total_changes - before
+
+    def lease(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        with self._connect() as conn:
+            # Expired leases on their last attempt fail instead of running again
+            conn.execute(
+                "UPDATE tasks SET state = ?, lease_owner = NULL, error = coalesce(error, 'lease expired') "
+                "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, LEASED, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "UPDATE tasks SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE id = (SELECT id FROM tasks "
+                "            WHERE (state = ? AND available_at <= ?) OR (state = ? AND lease_expires < ?) "
+                "            ORDER BY id LIMIT 1) "
+                "RETURNING id, key, payload, attempts",
+                (LEASED, worker, now + lease_seconds, PENDING, now, LEASED, now)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'id': row[0], 'key': row[1], 'payload': json.loads(row[2]), 'attempts': row[3]}
+
+    def _update_leased(self, sql, params, task_id, worker):
+        with self._connect() as conn:
+            cursor = conn.execute(f"{sql} WHERE id = ? AND state = ? AND lease_owner = ?",
+                                  (*params, task_id, LEASED, worker))
+            return cursor.rowcount == 1
+
+    def heartbeat(self, task_id, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._update_leased("UPDATE tasks SET lease_expires = ?", (time.time() + lease_seconds,),
+                                   task_id, worker)
+
+    def ack(self, task_id, worker, result):
+        return self._update_leased(
+            "UPDATE tasks SET state = ?, lease_owner = NULL, result = ?, error = NULL",
+            (DONE, json.dumps(result, ensure_ascii=False)), task_id, worker
+        )
+
+    def fail(self, task_id, worker, error, result=None):
+        return self._update_leased(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "available_at = ? + ? * (1 << (attempts - 1)), lease_owner = NULL, result = ?, error = ?",
+            (self.max_attempts, FAILED, PENDING, time.time(), self.retry_delay,
+             None if result is None else json.dumps(result, ensure_ascii=False), str(error)),
+            task_id, worker
+        )
+
+    def requeue_failed(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE tasks SET state = ?, attempts = 0, available_at = ? WHERE state = ?",
+                (PENDING, time.time(), FAILED)
+            ).rowcount
+
+    def results(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT key, payload, state, result, error FROM tasks ORDER BY id").fetchall()
+        return [{'key': key, 'payload': json.loads(payload), 'state': state,
+                 'result': json.loads(result) if result is not None else None, 'error': error}
+                for key, payload, state, result, error in rows]
+
+    def stats(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+    def reserve_slot(self, host, interval):
+        now = time.time()
+        with self._connect() as conn:
+            next_slot = conn.execute(
+                "INSERT INTO rate_limits VALUES (?, ?) "
+                "ON CONFLICT (host) DO UPDATE SET next_slot = max(next_slot, ?) + ? "
+                "RETURNING next_slot",
+                (host, now + interval, now, interval)
+            ).fetchone()[0]
+        return next_slot - interval - now
+
+
+class HTTPWorkQueue(WorkQueue):
+    """Client for a queue served by work_queue_server.py"""
+
+    def __init__(self, base_url, token="", timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers.update({"Authorization": f"Bearer {token}"})
+
+    def _call(self, method, path, body=None):
+        response = self.session.request(method, self.base_url + path, json=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def put(self, tasks):
+        return self._call("POST", "/v1/tasks", {"tasks": tasks})["added"]
+
+    def lease(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._call("POST", "/v1/lease", {"worker": worker, "lease_seconds": lease_seconds})["task"]
+
+    def heartbeat(self, task_id, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._call("POST", f"/v1/tasks/{task_id}/heartbeat",
+                          {"worker": worker, "lease_seconds": lease_seconds})["held"]
+
+    def ack(self, task_id, worker, result):
+        return self._call("POST", f"/v1/tasks/{task_id}/ack", {"worker": worker, "result": result})["held"]
+
+    def fail(self, task_id, worker, error, result=None):
+        return self._call("POST", f"/v1/tasks/{task_id}/fail",
+                          {"worker": worker, "error": str(error), "result": result})["held"]
+
+    def requeue_failed(self):
+        return self._call("POST", "/v1/requeue")["requeued"]
+
+    def results(self):
+        return self._call("GET", "/v1/results")["results"]
+
+    def stats(self):
+        return self._call("GET", "/v1/stats")["stats"]
+
+    def reserve_slot(self, host, interval):
+        return self._call("POST", f"/v1/rate/{quote(host, safe='')}", {"interval": interval})["delay"]
+
+
+def open_queue(location=WORK_QUEUE_FILE, token=""):
+    """HTTPWorkQueue for an http(s) URL, otherwise SQLiteWorkQueue for a file path"""
+    if location.startswith(("http://", "https://")):
+        return HTTPWorkQueue(location, token)
+    return SQLiteWorkQueue(location)
@@ -0,0 +1,134 @@
+import argparse
+import hmac
+import os
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from work_queue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, WORK_QUEUE_FILE, SQLiteWorkQueue
+
+# HTTP API over a SQLiteWorkQueue, so crawl workers on other machines or
+# containers can share one queue and one per-host rate limit (the
+# HTTPWorkQueue client in work_queue.py speaks it).
+#
+#   python work_queue_server.py --port 8100 --db crawl_queue.sqlite3
+#   python crawl_worker.py work --queue http://queue-host:8100
+#
+#   POST /v1/tasks                 {"tasks": [{"key", "payload"}]} -> {"added"}
+#   POST /v1/lease                 {"worker", "lease_seconds"?} -> {"task": task or null}
+#   POST /v1/tasks/{id}/heartbeat  {"worker", "lease_seconds"?} -> {"held"}
+#   POST /v1/tasks/{id}/ack        {"worker", "result"} -> {"held"}
+#   POST /v1/tasks/{id}/fail       {"worker", "error", "result"?} -> {"held"}
+#   POST /v1/requeue               -> {"requeued"}
+#   POST /v1/rate/{host}           {"interval"} -> {"delay"}
+#   GET  /v1/results, /v1/stats, /health
+#
+# With WORK_QUEUE_TOKEN set, requests must send "Authorization: Bearer <token>".
+# Queue calls block on SQLite, so they run in Starlette's thread pool.
+
+DEFAULT_PORT = 8100
+
+
+def authorized(request):
+    token = os.environ.get("WORK_QUEUE_TOKEN", "")
+    if not token:
+        return True
+    return hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {token}")
+
+
+def endpoint(handler):
+    """Wrap handler(queue, body, request) with auth and JSON body parsing"""
+    async def call(request):
+        if not authorized(request):
+            return JSONResponse({"error": "unauthorized"}, status_code=401)
+        body = {}
+        if request.method == "POST" and await request.body():
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            if not isinstance(body, dict):
+                return JSONResponse({"error": "body must be a JSON object"}, status_code=400)
+        try:
+            return JSONResponse(await run_in_threadpool(handler, request.app.state.queue, body, request))
+        except KeyError as e:
+            return JSONResponse({"error": f"{e.args[0]} is required"}, status_code=400)
+    return call
+
+
+def task_id(request):
+    return request.path_params["task_id"]
+
+
+def put(queue, body, request):
+    return {"added": queue.put(body["tasks"])}
+
+
+def lease(queue, body, request):
+    return {"task": queue.lease(body["worker"], body.get("lease_seconds", DEFAULT_LEASE_SECONDS))}
+
+
+def heartbeat(queue, body, request):
+    return {"held": queue.heartbeat(task_id(request), body["worker"],
+                                    body.get("lease_seconds", DEFAULT_LEASE_SECONDS))}
+
+
+def ack(queue, body, request):
+    return {"held": queue.ack(task_id(request), body["worker"], body["result"])}
+
+
+def fail(queue, body, request):
+    return {"held": queue.fail(task_id(request), body["worker"], body["error"], body.get("result"))}
+
+
+def requeue(queue, body, request):
+    return {"requeued": queue.requeue_failed()}
+
+
+def reserve_slot(queue, body, request):
+    return {"delay": queue.reserve_slot(request.path_params["host"], float(body["interval"]))}
+
+
+def results(queue, body, request):
+    return {"results": queue.results()}
+
+
+def stats(queue, body, request):
+    return {"stats": queue.stats()}
+
+
+async def health(request):
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+
+def create_app(queue):
+    app = Starlette(routes=[
+        Route("/v1/tasks", endpoint(put), methods=["POST"]),
+        Route("/v1/lease", endpoint(lease), methods=["POST"]),
+        Route("/v1/tasks/{task_id:int}/heartbeat", endpoint(heartbeat), methods=["POST"]),
+        Route("/v1/tasks/{task_id:int}/ack", endpoint(ack), methods=["POST"]),
+        Route("/v1/tasks/{task_id:int}/fail", endpoint(fail), methods=["POST"]),
+        Route("/v1/requeue", endpoint(requeue), methods=["POST"]),
+        Route("/v1/rate/{host}", endpoint(reserve_slot), methods=["POST"]),
+        Route("/v1/results", endpoint(results), methods=["GET"]),
+        Route("/v1/stats", endpoint(stats), methods=["GET"]),
+        Route("/health", health, methods=["GET"]),
+    ])
+    app.state.queue = queue
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a crawl work queue over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=WORK_QUEUE_FILE, help="SQLite queue file")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    args = parser.parse_args()
+
+    print(f"✅ Work queue {args.db} on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(SQLiteWorkQueue(args.db, max_attempts=args.max_attempts)),
+                host=args.host, port=args.port)
@@ -1,11 +1,24 @@
 import streamlit as st
+from contextlib import contextmanager
+import logging
 import os
-from openai import OpenAI
-from bs4 import BeautifulSoup
-import html2text
-import re
-from langdetect import detect
-import langdetect.lang_detect_exception
+import sys
+import threading
+import time
+import uuid
+from languages import LANGUAGES
+from language_detection import detect_language
+from chat_service import DEFAULT_SETTINGS, ChatService
+from chat_client import DEFAULT_BACKEND_TIMEOUT, BackendClient, LocalClient
+from llm import error_response
+from session_store import SESSION_STORE_FILE, SessionStore
+from chat_history import DEFAULT_MAX_MESSAGES, DEFAULT_PAGE_SIZE, ChatHistory
+from telemetry import TELEMETRY_FILE, DEFAULT_MAX_BYTES, Spans, TelemetryLog
+from sample_questions import SAMPLE_QUESTIONS
+
+# Profiling is shared with the data scrapers (bumRunGrad_Data/profiling.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bumRunGrad_Data"))
+from profiling import Profiler
 
 # Page configuration
 st.set_page_config(
@@ -15,363 +28,204 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Enhanced language mapping with native names and ISO codes (Thai added)
-LANGUAGES = {
-    "English": {"code": "en", "name": "English", "native": "English"},
-    "Spanish": {"code": "es", "name": "Español", "native": "Español"},
-    "French": {"code": "fr", "name": "Français", "native": "Français"},
-    "German": {"code": "de", "name": "Deutsch", "native": "Deutsch"},
-    "Italian": {"code": "it", "name": "Italiano", "native": "Italiano"},
-    "Portuguese": {"code": "pt", "name": "Português", "native": "Português"},
-    "Russian": {"code": "ru", "name": "Русский", "native": "Русский"},
-    "Chinese": {"code": "zh", "name": "中文", "native": "中文"},
-    "Japanese": {"code": "ja", "name": "日本語", "native": "日本語"},
-    "Korean": {"code": "ko", "name": "한국어", "native": "한국어"},
-    "Arabic": {"code": "ar", "name": "العربية", "native": "العربية"},
-    "Hindi": {"code": "hi", "name": "हिंदी", "native": "हिंदी"},
-    "Urdu": {"code": "ur", "name": "اردو", "native": "اردو"},
-    "Turkish": {"code": "tr", "name": "Türkçe", "native": "Türkçe"},
-    "Thai": {"code": "th", "name": "ไทย", "native": "ไทย"}
-}
+# Stream answers token by token into the chat bubble instead of waiting for
+# the whole completion behind a spinner
+STREAM_RESPONSES = bool(st.secrets.get("STREAM_RESPONSES", True))
+
+# The chatbot backend (chat_server.py). Without CHAT_BACKEND_URL the app runs
+# the same chat service in-process, configured from these secrets (retrieval,
+# response cache, conversation memory, LLM pool and router tiers; see
+# DEFAULT_SETTINGS in chat_service.py)
+CHAT_BACKEND_URL = st.secrets.get("CHAT_BACKEND_URL", "")
+CHAT_BACKEND_TOKEN = st.secrets.get("CHAT_BACKEND_TOKEN", "")
+CHAT_BACKEND_TIMEOUT = float(st.secrets.get("CHAT_BACKEND_TIMEOUT", DEFAULT_BACKEND_TIMEOUT))
+
+# Displayed history: at most this many messages stay in session memory (older
+# ones go to the session store) and reruns render one page of them
+HISTORY_MAX_MESSAGES = int(st.secrets.get("HISTORY_MAX_MESSAGES", DEFAULT_MAX_MESSAGES))
+HISTORY_PAGE_SIZE = int(st.secrets.get("HISTORY_PAGE_SIZE", DEFAULT_PAGE_SIZE))
+SESSION_STORE_PATH = st.secrets.get("SESSION_STORE_PATH", SESSION_STORE_FILE)
 
-# Enhanced language detection mapping (Thai added)
-LANG_DETECT_MAP = {
-    "en": "English",
-    "es": "Spanish", 
-    "fr": "French",
-    "de": "German",
-    "it": "Italian",
-    "pt": "Portuguese",
-    "ru": "Russian",
-    "zh": "Chinese",
-    "zh-cn": "Chinese",
-    "zh-tw": "Chinese",
-    "ja": "Japanese",
-    "ko": "Korean",
-    "ar": "Arabic",
-    "hi": "Hindi",
-    "ur": "Urdu",
-    "tr": "Turkish",
-    "th": "Thai"
-}
+# Per-turn latency telemetry: one JSON line per turn in a size-rotated log;
+# DEV_MODE adds a sidebar panel with rolling percentiles per span
+TELEMETRY_PATH = st.secrets.get("TELEMETRY_PATH", TELEMETRY_FILE)
+TELEMETRY_MAX_BYTES = int(st.secrets.get("TELEMETRY_MAX_BYTES", DEFAULT_MAX_BYTES))
+DEV_MODE = bool(st.secrets.get("DEV_MODE", False))
+# Where the developer panel's profiling toggle saves its reports
+PROFILE_DIR = st.secrets.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), ".cache", "profiles"))
 
-# Initialize OpenAI client
+# Connect to the chat backend once per process; all sessions share it
 @st.cache_resource
-def init_openai_client():
-    api_key = st.secrets.get("AIML_API_KEY", "")
-    if not api_key:
+def init_chat_client():
+    if CHAT_BACKEND_URL:
+        return BackendClient(CHAT_BACKEND_URL, CHAT_BACKEND_TOKEN, CHAT_BACKEND_TIMEOUT)
+    
+    if not st.secrets.get("AIML_API_KEY", ""):
         st.error("⚠️ AIML API Key not found. Please add it to your Streamlit secrets.")
         st.stop()
-    
-    return OpenAI(
-        base_url="https://api.aimlapi.com/v1",
-        api_key=api_key
-    )
-
-# Enhanced language detection function with Thai and Roman script support
-def detect_language(text):
-    try:
-        # Clean text for better detection
-        clean_text = re.sub(r'[^\w\s\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF\u0900-\u097F\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff\uac00-\ud7af\u0400-\u04FF\u0E00-\u0E7F]', ' ', text)
-        
-        # Convert to lowercase for pattern matching
-        text_lower = text.lower()
-        
-        # First check for native scripts
-        if re.search(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]', text):
-            # Arabic/Urdu script detection
-            urdu_patterns = [
-                r'یہ', r'کیا', r'ہے', r'کے', r'میں', r'کو', r'سے', r'کہ', r'اور', 
-                r'یار', r'ہا', r'کا', r'کی', r'نہیں', r'ہوں', r'ہیں', r'تھا', r'تھی',
-                r'کریں', r'کرتے', r'کرنا', r'ہوا', r'ہوئی', r'گیا', r'گئی', r'دیا',
-                r'لیا', r'آپ', r'میرا', r'تیرا', r'اس', r'اب', r'پہلے', r'بعد'
-            ]
-            
-            arabic_patterns = [
-                r'هذا', r'هذه', r'ذلك', r'التي', r'الذي', r'في', r'من', r'إلى',
-                r'على', r'عن', r'مع', r'كان', r'كانت', r'يكون', r'تكون', r'لكن',
-                r'أو', r'أم', r'ما', r'لا', r'نعم', r'كيف', r'متى', r'أين', r'لماذا'
-            ]
-            
-            urdu_score = sum(1 for pattern in urdu_patterns if re.search(pattern, text))
-            arabic_score = sum(1 for pattern in arabic_patterns if re.search(pattern, text))
-            
-            if urdu_score > arabic_score:
-                return "Urdu"
-            elif arabic_score > 0:
-                return "Arabic"
-            else:
-                if any(word in text for word in ['یار', 'کیا', 'ہے', 'اور']):
-                    return "Urdu"
-                return "Arabic"
-        
-        # Check for Thai script (NEW)
-        if re.search(r'[\u0E00-\u0E7F]', text):
-            return "Thai"
-        
-        # Check for other native scripts
-        if re.search(r'[\u0900-\u097F]', text):
-            return "Hindi"
-        if re.search(r'[\u4e00-\u9fff]', text):
-            return "Chinese"
-        if re.search(r'[\u3040-\u309f\u30a0-\u30ff]', text):
-            return "Japanese"
-        if re.search(r'[\uac00-\ud7af]', text):
-            return "Korean"
-        if re.search(r'[\u0400-\u04FF]', text):
-            return "Russian"
-        
-        # NEW: Check for Roman Thai (Thai written in Latin script)
-        roman_thai_patterns = [
-            # Common Thai words in Roman script
-            r'\b(chai|mai|krub|krab|ka|kha|khun|nai|thi|ni|nan|kap|gap)\b',
-            r'\b(arai|yang|ngai|thao|rai|dai|pen|mak|noi|yak|sabai|sanuk)\b',
-            r'\b(gin|khao|nam|phom|chan|rao|khao|pai|ma|yu|nang|yen)\b',
-            r'\b(rong|phaya|ban|baht|satang|saphan|thanon|mueang|krung|thep)\b',
-            r'\b(doctor|mor|hospital|clinic|surgery|rhinoplasty|dang|jak)\b',
-            r'\b(sawatdi|khob|khun|krub|krab|chai|mai|pen|yang|rai|dai)\b',
-            r'\b(aroi|sabai|sanuk|suai|ngam|yak|noi|mak|maak|chob|phom)\b',
-            r'\b(laew|yang|thao|rai|mueang|kap|gap|nai|thi|ni|nan|arai)\b'
-        ]
-        
-        # Count Roman Thai pattern matches
-        roman_thai_score = sum(1 for pattern in roman_thai_patterns if re.search(pattern, text_lower))
-        
-        # NEW: Check for Roman Urdu (Urdu written in Latin script)
-        roman_urdu_patterns = [
-            # Common Urdu words in Roman script
-            r'\b(kya|hai|hain|ka|ki|ke|ko|se|me|main|mein|aur|ya|yaar|yar)\b',
-            r'\b(ap|aap|tum|wo|woh|ye|yeh|is|us|iska|uska|mera|tera|humara)\b',
-            r'\b(kaise|kahan|kab|kyun|kyunke|lekin|magar|phir|abhi|ab)\b',
-            r'\b(kar|karna|karte|karta|karti|kiya|kiye|tha|thi|the)\b',
-            r'\b(hona|hota|hoti|hote|hua|hui|huye|gaya|gayi|gaye)\b',
-            r'\b(dena|deta|deti|dete|diya|diye|lena|leta|leti|lete|liya|liye)\b',
-            r'\b(jana|jata|jati|jate|ghar|paisa|paise|kitna|kitne|kitni)\b',
-            r'\b(accha|acha|bura|bhi|nahi|nahin|haan|han|ji|sahab|sahib)\b',
-            r'\b(bhala|bhali|bhale|wala|wali|wale|pani|khana|kaam|kam)\b',
-            r'\b(dost|doston|beta|beti|bhai|behan|ma|maa|papa|ammi|abbu)\b',
-            r'\b(lagta|lagti|lagte|hota|hoti|hote|karta|karti|karte)\b',
-            r'\b(surgery|doctor|hospital|clinic|treatment|medicine|dawai)\b'
-        ]
-        
-        # Count Roman Urdu pattern matches
-        roman_urdu_score = sum(1 for pattern in roman_urdu_patterns if re.search(pattern, text_lower))
-        
-        # NEW: Check for Roman Hindi (Hindi written in Latin script)
-        roman_hindi_patterns = [
-            r'\b(kya|hai|hain|ka|ki|ke|ko|se|me|main|mein|aur|ya)\b',
-            r'\b(ap|aap|tum|wo|woh|ye|yeh|is|us|iska|uska|mera|tera|hamara)\b',
-            r'\b(kaise|kahan|kab|kyun|kyunki|lekin|phir|abhi|ab|tab)\b',
-            r'\b(kar|karna|karte|karta|karti|kiya|kiye|tha|thi|the)\b',
-            r'\b(hona|hota|hoti|hote|hua|hui|huye|gaya|gayi|gaye)\b',
-            r'\b(dena|deta|deti|dete|diya|diye|lena|leta|leti|lete|liya|liye)\b',
-            r'\b(jana|jata|jati|jate|ghar|paisa|paise|kitna|kitne|kitni)\b',
-            r'\b(accha|acha|bura|bhi|nahi|nahin|haan|han|ji|sahab|sahib)\b',
-            r'\b(bhala|bhali|bhale|wala|wali|wale|pani|khana|kaam|kam)\b',
-            r'\b(dost|doston|beta|beti|bhai|behan|ma|maa|papa|mata|pita)\b'
-        ]
-        
-        # Count Roman Hindi pattern matches
-        roman_hindi_score = sum(1 for pattern in roman_hindi_patterns if re.search(pattern, text_lower))
-        
-        # NEW: Check for Roman Arabic (Arabic written in Latin script)
-        roman_arabic_patterns = [
-            r'\b(ma|maa|hal|haal|fee|fi|min|ila|ala|an|anna|la|laa)\b',
-            r'\b(wa|waa|aw|am|kam|kayf|mata|ayna|limatha|limaza)\b',
-            r'\b(hatha|haza|tilka|allati|allathi|kana|kanat|yakun|takun)\b',
-            r'\b(lakin|aw|ma|naam|kayf|shukran|ahlan|marhaba|allah)\b'
-        ]
-        
-        # Count Roman Arabic pattern matches
-        roman_arabic_score = sum(1 for pattern in roman_arabic_patterns if re.search(pattern, text_lower))
-        
-        # Determine language based on Roman script patterns
-        if roman_thai_score > 0 or roman_urdu_score > 0 or roman_hindi_score > 0 or roman_arabic_score > 0:
-            max_score = max(roman_thai_score, roman_urdu_score, roman_hindi_score, roman_arabic_score)
-            if roman_thai_score == max_score:
-                return "Thai"
-            elif roman_urdu_score == max_score:
-                return "Urdu"
-            elif roman_hindi_score == max_score:
-                return "Hindi"
-            elif roman_arabic_score == max_score:
-                return "Arabic"
-        
-        # Check for specific medical + local language combinations
-        medical_terms = ['rhinoplasty', 'rhino', 'plasty', 'surgery', 'nose', 'job', 'operation', 'clinic', 'doctor']
-        has_medical_terms = any(term in text_lower for term in medical_terms)
-        
-        if has_medical_terms:
-            # If medical terms are mixed with local language words, prioritize the local language
-            if any(word in text_lower for word in ['chai', 'mai', 'krub', 'krab', 'khun', 'arai', 'yang', 'ngai']):
-                return "Thai"
-            elif any(word in text_lower for word in ['kya', 'hai', 'hain', 'yaar', 'yar', 'lagta', 'hota', 'kaise']):
-                # Check for Urdu-specific indicators
-                if any(word in text_lower for word in ['yaar', 'yar', 'lagta', 'hota']):
-                    return "Urdu"
-                # Otherwise likely Hindi
-                return "Hindi"
-        
-        # Try langdetect for other languages
-        try:
-            detected_lang = detect(clean_text)
-            if detected_lang in LANG_DETECT_MAP:
-                return LANG_DETECT_MAP[detected_lang]
-        except:
-            pass
-        
-        # Default to English if no patterns match
-        return "English"
-        
-    except Exception as e:
-        # Enhanced fallback detection
-        text_lower = text.lower()
-        
-        # Check for Roman Thai in fallback
-        if any(word in text_lower for word in ['chai', 'mai', 'krub', 'krab', 'khun', 'arai', 'yang', 'ngai', 'sabai', 'sanuk']):
-            return "Thai"
-        
-        # Check for Roman Urdu/Hindi in fallback
-        if any(word in text_lower for word in ['kya', 'hai', 'yaar', 'yar', 'kar', 'karna', 'hona', 'lagta', 'hota']):
-            # Simple heuristic: if 'yaar' or 'yar' is present, likely Urdu
-            if any(word in text_lower for word in ['yaar', 'yar', 'lagta', 'hota']):
-                return "Urdu"
-            # Otherwise, could be Hindi
-            return "Hindi"
-        
-        # Check for native scripts in fallback
-        if re.search(r'[\u0E00-\u0E7F]', text):
-            return "Thai"
-        elif re.search(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]', text):
-            return "Arabic"
-        elif re.search(r'[\u0900-\u097F]', text):
-            return "Hindi"
-        elif re.search(r'[\u4e00-\u9fff]', text):
-            return "Chinese"
-        elif re.search(r'[\u3040-\u309f\u30a0-\u30ff]', text):
-            return "Japanese"
-        elif re.search(r'[\uac00-\ud7af]', text):
-            return "Korean"
-        elif re.search(r'[\u0400-\u04FF]', text):
-            return "Russian"
-        else:
-            return "English"
-
-# Load and parse HTML content
-@st.cache_data
-def load_html_content():
+    # Routing decisions and per-tier latencies are logged to the console
+    router_logger = logging.getLogger("routing")
+    if not router_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        router_logger.addHandler(handler)
+        router_logger.setLevel(logging.INFO)
     try:
-        with open(os.path.join(os.path.dirname(__file__), "meko_clinic_rhinoplasty.html"), "r", encoding="utf-8") as file:
-            html_content = file.read()
-        
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Convert to text
-        h = html2text.HTML2Text()
-        h.ignore_links = True
-        h.ignore_images = True
-        text_content = h.handle(str(soup))
-        
-        # Clean up the text
-        text_content = re.sub(r'\n\s*\n', '\n\n', text_content)
-        text_content = re.sub(r'\s+', ' ', text_content)
-        
-        return text_content.strip()
-        
+        settings = {key: st.secrets.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+        return LocalClient(ChatService(settings))
     except FileNotFoundError:
         st.error("❌ HTML file 'meko_clinic_rhinoplasty.html' not found in the current directory.")
         st.stop()
     except Exception as e:
-        st.error(f"❌ Error loading HTML file: {str(e)}")
+        st.error(f"❌ Error loading clinic knowledge: {str(e)}")
         st.stop()
 
-# Enhanced response generation with better language enforcement (Thai added)
-def generate_response(user_message, detected_language, clinic_content):
-    try:
-        client = init_openai_client()
-        
-        # Get language info
-        lang_info = LANGUAGES.get(detected_language, LANGUAGES["English"])
-        lang_code = lang_info["code"]
-        lang_name = lang_info["name"]
-        native_name = lang_info["native"]
-        
-        # Create enhanced system prompt with stronger language enforcement
-        system_prompt = f"""You are a helpful medical assistant for Meko Clinic specializing in rhinoplasty procedures.
+# One telemetry log per process, shared by all sessions
+@st.cache_resource
+def load_telemetry():
+    return TelemetryLog(TELEMETRY_PATH, max_bytes=TELEMETRY_MAX_BYTES)
+
+# Store for the messages spilled out of session memory, shared by all sessions
+@st.cache_resource
+def load_session_store():
+    return SessionStore(SESSION_STORE_PATH)
 
-CRITICAL LANGUAGE REQUIREMENT:
-- The user has written in {detected_language} language (even if they used English/Latin letters)
-- You MUST respond ONLY in {detected_language} language
-- You MUST use the native script/writing system of {detected_language}: {native_name}
-- DO NOT use English or any other language in your response
-- DO NOT translate or explain in English
-- If user wrote in Roman script (like "kya hai" or "chai mai"), respond in native script
+# A user message with its detected-language caption rendered once, not on
+# every rerun
+def user_message(content, detected_language):
+    native_name = LANGUAGES.get(detected_language, {}).get("native", detected_language)
+    return {
+        "role": "user",
+        "content": content,
+        "detected_language": detected_language,
+        "caption": f"🔍 Detected: {detected_language} ({native_name})"
+    }
 
-SPECIFIC SCRIPT REQUIREMENTS:
-- If {detected_language} is Thai: Write ONLY in Thai script (เขียนเป็นภาษาไทยเท่านั้น)
-- If {detected_language} is Urdu: Write ONLY in Urdu script (اردو میں لکھیں)
-- If {detected_language} is Arabic: Write ONLY in Arabic script (اكتب بالعربية فقط)
-- If {detected_language} is Hindi: Write ONLY in Hindi script (हिंदी में लिखें)
-- If {detected_language} is Chinese: Write ONLY in Chinese characters (用中文写)
-- If {detected_language} is Japanese: Write ONLY in Japanese script (日本語で書く)
-- If {detected_language} is Korean: Write ONLY in Korean script (한국어로 쓰기)
-- If {detected_language} is Russian: Write ONLY in Cyrillic script (пишите на русском)
-- If {detected_language} is any other language: Use its native script exclusively
+# Keep the provider-reported token usage of the last request and the session
+# totals; cached tokens are the prompt prefix the provider didn't bill in full
+def record_usage(usage):
+    st.session_state.last_usage = usage
+    totals = st.session_state.usage_totals
+    for key, value in usage.items():
+        totals[key] = totals.get(key, 0) + value
+    totals["requests"] = totals.get("requests", 0) + 1
 
-IMPORTANT EXAMPLES:
-- User input: "rhinoplasty arai krub" → Detected: Thai → Response: "ไรโนพลาสตี้เป็นการผ่าตัดเสริมจมูก..."
-- User input: "rhinoplasty kya hai" → Detected: Urdu → Response: "رائنوپلاسٹی ایک جراحی کا طریقہ ہے..."
-- User input: "nose job kitna paisa lagta hai" → Detected: Urdu → Response: "ناک کی جراحی کی لاگت..."
-- User input: "surgery thao rai krub" → Detected: Thai → Response: "การผ่าตัดมีราคา..."
+# Answer a message through the backend: facts and cached answers arrive in
+# one piece, LLM answers are streamed into the chat bubble as they arrive.
+# The turn's spans (the backend's plus rendering and the total) are logged.
+def respond(prompt, detected_language, spans=None):
+    spans = spans or Spans()
+    events = init_chat_client().chat(prompt, st.session_state.session_id, detected_language, STREAM_RESPONSES)
+    meta = {}
+    done = {}
+    
+    def tokens():
+        for event in events:
+            if event["event"] == "token":
+                # Time until the consumer asks for the next piece is spent rendering
+                rendering = time.perf_counter()
+                yield event["text"]
+                spans.add("render", time.perf_counter() - rendering)
+            elif event["event"] == "done":
+                done.update(event)
+    
+    with st.chat_message("assistant"):
+        try:
+            meta = next(events)
+            if meta["source"] != "llm":
+                response = "".join(tokens())
+                with spans.span("render"):
+                    st.markdown(response)
+                    if meta["source"] == "cache":
+                        st.caption("⚡ Cached answer")
+            else:
+                # Keep the retrieval hits, prompt size and route for the sidebar
+                st.session_state.last_retrieval = meta["retrieval"]
+                st.session_state.last_prompt_tokens = meta["prompt_tokens"]
+                st.session_state.last_route = meta["route"]
+                if STREAM_RESPONSES:
+                    response = st.write_stream(tokens())
+                    st.session_state.last_ttft = done.get("ttft")
+                else:
+                    with st.spinner("Thinking..."):
+                        response = "".join(tokens())
+                        with spans.span("render"):
+                            st.markdown(response)
+                if done.get("usage"):
+                    record_usage(done["usage"])
+        except Exception as e:
+            response = error_response(detected_language, e)
+            st.markdown(response)
+    
+    # Add assistant response to chat history
+    st.session_state.messages.append({"role": "assistant", "content": response})
+    
+    spans.update(done.get("spans"))
+    # From before language detection to the rendered answer
+    spans.add("total", spans.elapsed())
+    route = meta.get("route") or {}
+    load_telemetry().record({
+        "session": st.session_state.session_id,
+        "language": detected_language,
+        "source": meta.get("source", "error"),
+        "cache_hit": meta.get("source") == "cache",
+        "tier": route.get("tier"),
+        "model": route.get("model"),
+        "failed": done.get("failed", not done),
+        "usage": done.get("usage"),
+        "spans": spans.as_dict(),
+    })
 
-Use the following clinic information to answer questions:
-{clinic_content}
+# tracemalloc and the stack sampler are process-wide: one profiled turn at a
+# time, and it sees every session's threads, not only the one profiling
+@st.cache_resource
+def profiling_lock():
+    return threading.Lock()
 
-Guidelines:
-- Be professional and informative in {detected_language}
-- Focus on rhinoplasty services offered by Meko Clinic
-- If asked about something not in the clinic information, politely redirect to available services in {detected_language}
-- Provide helpful and accurate information about rhinoplasty procedures in {detected_language}
-- Always recommend consulting with the clinic directly for personalized advice in {detected_language}
-- Maintain cultural sensitivity and appropriate medical terminology for {detected_language}
-- Your entire response must be in {detected_language} language using {native_name} script
-- Use respectful forms of address appropriate for {detected_language} culture"""
-        
-        response = client.chat.completions.create(
-            model="x-ai/grok-3-mini-beta",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        
-        return response.choices[0].message.content
-        
-    except Exception as e:
-        # Return error message in detected language
-        if detected_language == "Thai":
-            return f"❌ เกิดข้อผิดพลาดในการสร้างการตอบกลับ: {str(e)}"
-        elif detected_language == "Urdu":
-            return f"❌ جواب بنانے میں خرابی: {str(e)}"
-        elif detected_language == "Arabic":
-            return f"❌ خطأ في إنشاء الاستجابة: {str(e)}"
-        elif detected_language == "Hindi":
-            return f"❌ प्रतिक्रिया उत्पन्न करने में त्रुटि: {str(e)}"
-        else:
-            return f"❌ Error generating response: {str(e)}"
+# Profile the chat turn (stack samples, top functions, allocations) when the
+# developer panel's toggle is on; otherwise nothing is started
+@contextmanager
+def profiled_turn():
+    if not st.session_state.profile_turns:
+        yield
+        return
+    lock = profiling_lock()
+    if not lock.acquire(blocking=False):
+        st.toast("🔬 Another session is being profiled; this turn isn't")
+        yield
+        return
+    try:
+        profiler = Profiler("chat-turn", PROFILE_DIR)
+        with profiler:
+            yield
+        st.session_state.last_profile = profiler.report_path
+    finally:
+        lock.release()
 
 # Initialize session state
+if "session_id" not in st.session_state:
+    # The backend keeps the conversation memory of this id
+    st.session_state.session_id = uuid.uuid4().hex
 if "messages" not in st.session_state:
-    st.session_state.messages = []
-if "clinic_content" not in st.session_state:
-    st.session_state.clinic_content = load_html_content()
+    st.session_state.messages = ChatHistory(
+        st.session_state.session_id, load_session_store(), HISTORY_MAX_MESSAGES, HISTORY_PAGE_SIZE
+    )
+if "last_retrieval" not in st.session_state:
+    st.session_state.last_retrieval = None
+if "last_ttft" not in st.session_state:
+    st.session_state.last_ttft = None
+if "last_prompt_tokens" not in st.session_state:
+    st.session_state.last_prompt_tokens = None
+if "last_route" not in st.session_state:
+    st.session_state.last_route = None
+if "last_usage" not in st.session_state:
+    st.session_state.last_usage = None
+if "usage_totals" not in st.session_state:
+    st.session_state.usage_totals = {}
+if "profile_turns" not in st.session_state:
+    st.session_state.profile_turns = False
+if "last_profile" not in st.session_state:
+    st.session_state.last_profile = None
 
 # Sidebar
 with st.sidebar:
@@ -393,12 +247,8 @@ with st.sidebar:
     st.info("✅ Now supports Roman scripts!\n- 'kya hai' → Detected as Urdu\n- 'chai mai krub' → Detected as Thai\n- 'rhinoplasty arai' → Thai\n- Native scripts also supported")
     
     # Show recent detection
-    if st.session_state.messages:
-        last_user_msg = None
-        for msg in reversed(st.session_state.messages):
-            if msg["role"] == "user" and "detected_language" in msg:
-                last_user_msg = msg
-                break
+    if len(st.session_state.messages):
+        last_user_msg = st.session_state.messages.last_with("detected_language")
         
         if last_user_msg:
             detected_lang = last_user_msg["detected_language"]
@@ -415,11 +265,79 @@ with st.sidebar:
         if api_key:
             st.session_state.api_key = api_key
     
+    # Time to first token of the last streamed answer
+    if st.session_state.last_ttft is not None:
+        st.caption(f"⏱️ Last time to first token: {st.session_state.last_ttft:.2f}s")
+    
+    # Estimated size of the last LLM prompt and how much of it is history
+    if st.session_state.last_prompt_tokens:
+        tokens = st.session_state.last_prompt_tokens
+        st.caption(
+            f"🧮 Last prompt ≈ {tokens['prompt_tokens']} tokens "
+            f"(system {tokens['system_tokens']}, history {tokens['history_tokens']}/{tokens['budget']}, "
+            f"question {tokens['user_tokens']}) · {tokens['recent_turns']} recent turns, "
+            f"{tokens['summarized_turns']} summarized"
+        )
+    
+    # Model tier chosen for the last LLM answer
+    if st.session_state.last_route:
+        route = st.session_state.last_route
+        st.caption(f"🧭 Last route: {route['tier']} → {route['model']} (max {route['max_tokens']} tokens, {route['reason']})")
+    
+    # Token usage reported by the API
+    if st.session_state.last_usage:
+        usage = st.session_state.last_usage
+        totals = st.session_state.usage_totals
+        st.caption(
+            f"🧾 Last request: {usage['prompt_tokens']} prompt ({usage['cached_tokens']} cached) + "
+            f"{usage['completion_tokens']} completion tokens · session: {totals['prompt_tokens']} prompt "
+            f"({totals['cached_tokens']} cached) + {totals['completion_tokens']} completion in {totals['requests']} requests"
+        )
+    
+    # Retrieval debug panel: which chunks went into the last prompt
+    if st.session_state.last_retrieval:
+        with st.expander("🔎 Retrieval debug"):
+            st.caption(f"Query: {st.session_state.last_retrieval['query']}")
+            if st.session_state.last_retrieval.get("knowledge", "source") != "source":
+                st.caption(f"🌐 Pre-translated {st.session_state.last_retrieval['knowledge']} knowledge base")
+            for hit in st.session_state.last_retrieval["hits"]:
+                st.markdown(f"**#{hit['id']}** score {hit['score']} · {hit['tokens']} tokens · {hit['heading']}")
+                st.text(hit["text"][:300])
+            if st.session_state.last_retrieval.get("directory"):
+                st.markdown("**Bumrungrad directory**")
+                st.text(st.session_state.last_retrieval["directory"])
+    
+    # Developer panel: rolling latency percentiles of the recent turns
+    if DEV_MODE:
+        with st.expander("📊 Turn latency (dev)"):
+            summary = load_telemetry().summary()
+            if summary["turns"]:
+                st.caption(
+                    f"Last {summary['turns']} turns · cache hit rate {summary['cache_hit_rate']:.0%} · "
+                    f"mean tokens {summary['mean_prompt_tokens']:.0f} prompt + "
+                    f"{summary['mean_completion_tokens']:.0f} completion"
+                )
+                st.table(summary["spans"])
+            else:
+                st.caption("No turns recorded yet")
+        
+        # Profiling toggle: reports of each turn go to PROFILE_DIR
+        with st.expander("🔬 Profiling (dev)"):
+            st.checkbox("Profile chat turns", key="profile_turns",
+                        help="Sample stacks and trace allocations during each turn. Profiling is "
+                             "process-wide: it slows down and records every session served by "
+                             "this process while a turn runs, and only one turn is profiled at a time")
+            if st.session_state.last_profile and os.path.exists(st.session_state.last_profile):
+                st.caption(f"Last turn: {st.session_state.last_profile}")
+                with open(st.session_state.last_profile, "r", encoding="utf-8") as file:
+                    st.code(file.read())
+    
     st.markdown("---")
     
     # Clear chat button
     if st.button("🗑️ Clear Chat"):
-        st.session_state.messages = []
+        st.session_state.messages.clear()
+        init_chat_client().clear(st.session_state.session_id)
         st.rerun()
     
     # Info section
@@ -446,49 +364,46 @@ with st.sidebar:
 st.title("💬 Meko Clinic Rhinoplasty Assistant")
 st.markdown("**🌐 Multi-language Support with Enhanced Roman Script Detection + Thai**")
 
-# Display chat messages
-for message in st.session_state.messages:
+# Display the latest page of chat messages; earlier pages on request
+if st.session_state.messages.has_earlier():
+    if st.button("⬆️ Load earlier messages"):
+        st.session_state.messages.load_earlier()
+        st.rerun()
+for message in st.session_state.messages.visible():
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
-        # Show detected language for user messages
-        if message["role"] == "user" and "detected_language" in message:
-            detected_lang = message["detected_language"]
-            native_name = LANGUAGES.get(detected_lang, {}).get("native", detected_lang)
-            st.caption(f"🔍 Detected: {detected_lang} ({native_name})")
+        # Detected language of user messages
+        if message.get("caption"):
+            st.caption(message["caption"])
 
 # Chat input with enhanced placeholder
 if prompt := st.chat_input("Ask me about rhinoplasty procedures... | รายงานรายละเอียด rhinoplasty | rhinoplasty arai krub | rhinoplasty kya hai | प्रश्न पूछें | اسأل | 质问题"):
     # Detect language from user input
+    spans = Spans()
     if selected_language != "Auto-detect":
         detected_language = selected_language
     else:
-        detected_language = detect_language(prompt)
+        with spans.span("detect"):
+            detected_language = detect_language(prompt)
     
     # Add user message to chat history with detected language
-    st.session_state.messages.append({
-        "role": "user", 
-        "content": prompt,
-        "detected_language": detected_language
-    })
+    message = user_message(prompt, detected_language)
+    st.session_state.messages.append(message)
     
     # Display user message
     with st.chat_message("user"):
         st.markdown(prompt)
-        native_name = LANGUAGES.get(detected_language, {}).get("native", detected_language)
-        st.caption(f"🔍 Detected: {detected_language} ({native_name})")
+        st.caption(message["caption"])
     
     # Generate and display assistant response
-    with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            response = generate_response(
-                prompt, 
-                detected_language, 
-                st.session_state.clinic_content
-            )
-            st.markdown(response)
-    
-    # Add assistant response to chat history
-    st.session_state.messages.append({"role": "assistant", "content": response})
+    with profiled_turn():
+        respond(prompt, detected_language, spans)
+
+# Answer a sample question: the button stored it in the history and reran
+elif st.session_state.messages.last() and st.session_state.messages.last()["role"] == "user":
+    pending = st.session_state.messages.last()
+    with profiled_turn():
+        respond(pending["content"], pending.get("detected_language", "English"))
 
 # Footer
 st.markdown("---")
@@ -507,77 +422,11 @@ if len(st.session_state.messages) == 0:
     st.markdown("### 💡 Sample Questions / นลคำถาม / نمونہ سوالات / नमूना प्रश्न / أسئلة عينة / 샘플 질문")
     
     # Create tabs for different languages (Thai added)
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["English", "ไทย (Thai)", "Roman Thai", "اردو (Urdu)", "Roman Urdu", "हिंदी (Hindi)"])
-    
-    with tab1:
-        questions = [
-            "What rhinoplasty procedures do you offer?",
-            "What is the recovery time for rhinoplasty?",
-            "How much does rhinoplasty cost?",
-            "What should I expect during consultation?"
-        ]
-        for i, question in enumerate(questions):
-            if st.button(question, key=f"en_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question, "detected_language": "English"})
-                st.rerun()
-    
-    with tab2:
-        questions = [
-            "คุณมีการผ่าตัดไรโนพลาสตี้แบบใดบ้าง?",
-            "ระยะเวลาฟื้นฟูสำหรับไรโนพลาสตี้เป็นเวลาเท่าไร?",
-            "ไรโนพลาสตี้มีค่าใช้จ่ายเท่าไร?",
-            "ฉันควรคาดหวังอะไรระหว่างการปรึกษา?"
-        ]
-        for i, question in enumerate(questions):
-            if st.button(question, key=f"th_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question, "detected_language": "Thai"})
-                st.rerun()
-
-    with tab3:
-        questions = [
-            "rhinoplasty arai krub",
-            "surgery thao rai krub",
-            "rhinoplasty sabai mai",
-            "consultation pai nai"
-        ]
-        for i, question in enumerate(questions):
-            if st.button(question, key=f"roman_th_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question, "detected_language": "Thai"})
-                st.rerun()
-
-    with tab4:
-        questions = [
-            "آپ کے کلینک میں رائنو پلاسٹی کے کون سے طریقے ہیں؟",
-            "رائنو پلاسٹی کے بعد صحتیابی کا وقت کیا ہے؟",
-            "رائنو پلاسٹی کی قیمت کتنی ہے؟",
-            "مشاورت کے دوران مجھے کیا توقع رکھنی چاہیے؟"
-        ]
-        for i, question in enumerate(questions):
-            if st.button(question, key=f"ur_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question, "detected_language": "Urdu"})
-                st.rerun()
-
-    with tab5:
-        questions = [
-            "rhinoplasty kya hai?",
-            "recovery time kitna hota hai?",
-            "cost kitni hoti hai?",
-            "consultation me kya hota hai?"
-        ]
-        for i, question in enumerate(questions):
-            if st.button(question, key=f"roman_ur_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question, "detected_language": "Urdu"})
-                st.rerun()
-
-    with tab6:
-        questions = [
-            "आप कौन-कौन सी राइनोप्लास्टी प्रक्रियाएँ करते हैं?",
-            "राइनोप्लास्टी के लिए रिकवरी टाइम क्या होता है?",
-            "राइनोप्लास्टी की कीमत कितनी है?",
-            "परामर्श के दौरान क्या उम्मीद की जा सकती है?"
-        ]
-        for i, question in enumerate(questions):
-            if st.button(question, key=f"hi_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question, "detected_language": "Hindi"})
-                st.rerun()
+    tabs = st.tabs([sample["tab"] for sample in SAMPLE_QUESTIONS])
     
+    for tab, sample in zip(tabs, SAMPLE_QUESTIONS):
+        with tab:
+            for i, question in enumerate(sample["questions"]):
+                if st.button(question, key=f"{sample['key']}_{i}"):
+                    st.session_state.messages.append(user_message(question, sample["language"]))
+                    st.rerun()
@@ -0,0 +1,195 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from languages import LANGUAGES
+
+# Accuracy and latency benchmark for detect_language over a labeled corpus.
+#
+#   python chatbot/benchmarks/bench_language_detection.py            # current vs baseline
+#   python chatbot/benchmarks/bench_language_detection.py --check    # fail if current is slower or less accurate
+#
+# "current" is chatbot/language_detection.py, "baseline" the regex cascade it
+# replaced (baseline_detector.py).
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "language_corpus.jsonl")
+
+DETECTORS = {
+    "current": "language_detection",
+    "baseline": "baseline_detector",
+}
+
+# A message that no script or keyword rule decides, so it reaches langdetect
+FIRST_CALL_TEXT = "Wie lange dauert die Erholung?"
+
+
+def load_corpus(path=CORPUS_FILE):
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def load_detector(name):
+    return importlib.import_module(DETECTORS[name]).detect_language
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure_first_call(name):
+    """Time import + first call in a fresh interpreter (langdetect profile load)"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--first-call", name],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def run_first_call(name):
+    start = time.perf_counter()
+    detect_language = load_detector(name)
+    detect_language(FIRST_CALL_TEXT)
+    print(time.perf_counter() - start)
+
+
+def clear_caches(detect_language):
+    """Empty the detector module's langdetect result cache, if it has one"""
+    langdetect = getattr(sys.modules[detect_language.__module__], "_langdetect", None)
+    if hasattr(langdetect, "cache_clear"):
+        langdetect.cache_clear()
+
+
+def evaluate(detect_language, corpus, repeat):
+    """Predictions for the corpus and per-call latencies in microseconds"""
+    # Seed langdetect so both detectors are judged on the same draws
+    from langdetect import DetectorFactory
+    DetectorFactory.seed = 0
+
+    predictions = [detect_language(sample["text"]) for sample in corpus]
+    latencies = []
+    for _ in range(repeat):
+        # Every pass starts cold, or the predictions pass above would have
+        # cached each text's langdetect result and the fallback is never timed
+        clear_caches(detect_language)
+        for sample in corpus:
+            start = time.perf_counter()
+            detect_language(sample["text"])
+            latencies.append((time.perf_counter() - start) * 1e6)
+    return predictions, sorted(latencies)
+
+
+def accuracy_report(corpus, predictions):
+    labels = [sample["language"] for sample in corpus]
+    languages = [language for language in LANGUAGES if language in labels or language in predictions]
+    confusion = {actual: {} for actual in languages}
+    for actual, predicted in zip(labels, predictions):
+        confusion.setdefault(actual, {})
+        confusion[actual][predicted] = confusion[actual].get(predicted, 0) + 1
+
+    per_language = {}
+    for language in languages:
+        true_positives = confusion.get(language, {}).get(language, 0)
+        predicted_count = sum(1 for predicted in predictions if predicted == language)
+        actual_count = sum(1 for actual in labels if actual == language)
+        per_language[language] = {
+            "precision": true_positives / predicted_count if predicted_count else 0.0,
+            "recall": true_positives / actual_count if actual_count else 0.0,
+            "support": actual_count,
+        }
+
+    by_variant = {}
+    for sample, predicted in zip(corpus, predictions):
+        correct, total = by_variant.get(sample["variant"], (0, 0))
+        by_variant[sample["variant"]] = (correct + (predicted == sample["language"]), total + 1)
+
+    correct = sum(1 for actual, predicted in zip(labels, predictions) if actual == predicted)
+    return {
+        "accuracy": correct / len(corpus),
+        "per_language": per_language,
+        "by_variant": by_variant,
+        "confusion": confusion,
+        "languages": languages,
+    }
+
+
+def print_report(name, report, latencies, first_call, corpus, predictions, show_errors):
+    print(f"\n=== {name} ===")
+    print(f"accuracy: {report['accuracy']:.1%} ({len(corpus)} samples)")
+    for variant, (correct, total) in report["by_variant"].items():
+        print(f"  {variant:<7} {correct}/{total}")
+
+    print(f"\n{'language':<11} {'precision':>9} {'recall':>7} {'n':>4}")
+    for language, scores in report["per_language"].items():
+        print(f"{language:<11} {scores['precision']:>9.2f} {scores['recall']:>7.2f} {scores['support']:>4}")
+
+    languages = report["languages"]
+    short = [language[:3] for language in languages]
+    print("\nconfusion (rows: actual, columns: predicted)")
+    print(" " * 11 + " ".join(f"{label:>4}" for label in short))
+    for actual in languages:
+        row = report["confusion"].get(actual, {})
+        if not sum(row.values()):
+            continue
+        print(f"{actual:<11}" + " ".join(f"{row.get(predicted, 0) or '.':>4}" for predicted in languages))
+
+    print(f"\nlatency per call (µs): p50 {percentile(latencies, 0.5):.1f}  p90 {percentile(latencies, 0.9):.1f}  "
+          f"p99 {percentile(latencies, 0.99):.1f}  max {latencies[-1]:.1f}")
+    print(f"first call incl. import and langdetect profile load: {first_call * 1000:.0f} ms")
+
+    if show_errors:
+        misses = [(sample, predicted) for sample, predicted in zip(corpus, predictions)
+                  if predicted != sample["language"]]
+        if misses:
+            print("\nmisclassified:")
+            for sample, predicted in misses:
+                print(f"  [{sample['language']} -> {predicted}] {sample['text']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detect_language accuracy and latency")
+    parser.add_argument("--detector", choices=["current", "baseline", "both"], default="both")
+    parser.add_argument("--corpus", default=CORPUS_FILE)
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes over the corpus")
+    parser.add_argument("--errors", action="store_true", help="list misclassified samples")
+    parser.add_argument("--check", action="store_true",
+                        help="exit non-zero unless current is at least as accurate and faster at p50 than baseline")
+    parser.add_argument("--first-call", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.first_call:
+        run_first_call(args.first_call)
+        return 0
+
+    corpus = load_corpus(args.corpus)
+    names = ["current", "baseline"] if args.detector == "both" or args.check else [args.detector]
+
+    results = {}
+    for name in names:
+        first_call = measure_first_call(name)
+        predictions, latencies = evaluate(load_detector(name), corpus, args.repeat)
+        report = accuracy_report(corpus, predictions)
+        print_report(name, report, latencies, first_call, corpus, predictions, args.errors)
+        results[name] = (report["accuracy"], percentile(latencies, 0.5))
+
+    if args.check:
+        current_accuracy, current_p50 = results["current"]
+        baseline_accuracy, baseline_p50 = results["baseline"]
+        if current_accuracy < baseline_accuracy or current_p50 >= baseline_p50:
+            print(f"\n❌ current detector regressed: accuracy {current_accuracy:.1%} vs {baseline_accuracy:.1%}, "
+                  f"p50 {current_p50:.1f}µs vs {baseline_p50:.1f}µs")
+            return 1
+        print(f"\n✅ current detector is faster ({current_p50:.1f}µs vs {baseline_p50:.1f}µs p50) "
+              f"and no less accurate ({current_accuracy:.1%} vs {baseline_accuracy:.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
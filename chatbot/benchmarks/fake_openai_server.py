@@ -0,0 +1,181 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI-compatible chat completions endpoint, for load
+# tests. Answers are filler text; what matters is the timing: a configurable
+# time to first token, token rate, answer length and share of 429 responses.
+#
+#   python chatbot/benchmarks/fake_openai_server.py --port 8900 --latency 0.8 --tokens-per-second 40
+#
+# then point the app at it with AIML_BASE_URL = "http://127.0.0.1:8900/v1".
+
+FILLER_WORDS = (
+    "rhinoplasty recovery usually takes one to two weeks swelling improves gradually and the "
+    "clinic team will guide you through every step of the consultation and aftercare"
+).split()
+
+
+class FakeOpenAIConfig:
+    def __init__(self, latency=0.5, tokens_per_second=50.0, completion_tokens=120, error_rate=0.0,
+                 retry_after=1):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+
+
+class FakeOpenAIStats:
+    """Request counters, updated from the handler threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def start(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finish(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def as_dict(self):
+        with self.lock:
+            return {"requests": self.requests, "rate_limited": self.rate_limited,
+                    "peak_in_flight": self.peak_in_flight}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = FakeOpenAIConfig()
+    stats = FakeOpenAIStats()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        request = json.loads(body or b"{}")
+
+        self.stats.start()
+        try:
+            if random.random() < self.config.error_rate:
+                with self.stats.lock:
+                    self.stats.rate_limited += 1
+                self._send_json(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                                {"Retry-After": str(self.config.retry_after)})
+                return
+
+            max_tokens = int(request.get("max_tokens") or self.config.completion_tokens)
+            words = [random.choice(FILLER_WORDS) for _ in range(min(max_tokens, self.config.completion_tokens))]
+            prompt_tokens = sum(len(str(message.get("content", "")).split())
+                                for message in request.get("messages", []))
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                     "total_tokens": prompt_tokens + len(words),
+                     "prompt_tokens_details": {"cached_tokens": 0}}
+
+            time.sleep(self.config.latency)
+            if request.get("stream"):
+                self._stream(request, words, usage)
+            else:
+                time.sleep(len(words) / self.config.tokens_per_second)
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": " ".join(words)}}],
+                    "usage": usage,
+                })
+        finally:
+            self.stats.finish()
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, request, words, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        base = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": request.get("model", "fake")}
+        interval = 1 / self.config.tokens_per_second
+        for i, word in enumerate(words):
+            content = word if i == 0 else " " + word
+            self._event({**base, "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]})
+            time.sleep(interval)
+        self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (request.get("stream_options") or {}).get("include_usage"):
+            self._event({**base, "choices": [], "usage": usage})
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _event(self, payload):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_fake_server(config, host="127.0.0.1", port=0):
+    """Serve in a background thread; returns the server and its /v1 base URL"""
+    handler = type("ConfiguredFakeOpenAIHandler", (FakeOpenAIHandler,),
+                   {"config": config, "stats": FakeOpenAIStats()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--completion-tokens", type=int, default=120, help="answer length in tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429")
+
+
+def config_from_arguments(args):
+    return FakeOpenAIConfig(args.latency, args.tokens_per_second, args.completion_tokens, args.error_rate)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server(config_from_arguments(args), args.host, args.port)
+    print(f"✅ Fake OpenAI server listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from fake_openai_server import add_server_arguments, config_from_arguments, start_fake_server
+
+# Load test for the chatbot: simulated users chat with chatbot/app.py through
+# Streamlit's testing API while a local fake OpenAI server stands in for the
+# LLM, so the numbers measure our own overhead and concurrency.
+#
+#   python chatbot/benchmarks/load_test.py --workers 4 --sessions 10 --turns 5
+#   python chatbot/benchmarks/load_test.py --latency 1.5 --tokens-per-second 30 --error-rate 0.05
+#
+# With --backend the users talk to chat_server.py (started here with
+# --workers processes) over HTTP/SSE instead, all of them concurrently:
+#
+#   python chatbot/benchmarks/load_test.py --backend --workers 4 --sessions 50
+#
+# Questions are drawn from the multilingual benchmark corpus. The response
+# cache, session store and the app's telemetry log are pointed at throwaway
+# files so runs neither read nor pollute the real ones.
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+SERVER_FILE = os.path.join(os.path.dirname(APP_FILE), "chat_server.py")
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "language_corpus.jsonl")
+
+
+def load_questions(path=CORPUS_FILE):
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line)["text"] for line in file if line.strip()]
+
+
+def current_rss_bytes():
+    """Resident memory of this process (falls back to peak RSS off Linux)"""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def process_tree_rss_bytes(pid):
+    """Resident memory of a process and its children (Linux only, else 0)"""
+    children = {}
+    try:
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat", "r") as file:
+                        parent = int(file.read().rsplit(")", 1)[1].split()[1])
+                    children.setdefault(parent, []).append(int(entry))
+                except (OSError, ValueError, IndexError):
+                    continue
+    except OSError:
+        return 0
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/statm", "r") as file:
+                total += int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            pass
+        pending.extend(children.get(current, []))
+    return total
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_worker(worker_id, sessions, turns, questions, secrets, timeout, results):
+    """One app process serving `sessions` users, each sending `turns` messages.
+
+    AppTest swaps process-wide runtime state (st.secrets, the Runtime
+    singleton) for every script run, so within a process the sessions take
+    turns, one script run at a time; concurrency comes from the workers.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(worker_id)
+    latencies = []
+    errors = []
+
+    def new_session():
+        app = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        for key, value in secrets.items():
+            app.secrets[key] = value
+        app.run()
+        return app
+
+    try:
+        # Warm the per-process caches (knowledge base, pool) before measuring
+        new_session().chat_input[0].set_value(rng.choice(questions)).run()
+        rss_before = current_rss_bytes()
+        apps = [new_session() for _ in range(sessions)]
+        for _ in range(turns):
+            for app in apps:
+                start = time.perf_counter()
+                app.chat_input[0].set_value(rng.choice(questions)).run()
+                latencies.append(time.perf_counter() - start)
+                if app.exception:
+                    errors.append(str(app.exception[0].value))
+        # Sessions are still referenced here, so their state is part of the RSS
+        rss_after = current_rss_bytes()
+    except Exception as error:
+        errors.append(f"{type(error).__name__}: {error}")
+        rss_before = rss_after = 0
+    results.put({"latencies": latencies, "errors": errors, "rss_before": rss_before, "rss_after": rss_after})
+
+
+def start_backend(base_url, workers, cache_dir):
+    """Run chat_server.py against the fake LLM; returns the process and its URL"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    env = {
+        **os.environ,
+        "AIML_API_KEY": "load-test",
+        "AIML_BASE_URL": base_url,
+        "RESPONSE_CACHE_PATH": os.path.join(cache_dir, "responses.sqlite3"),
+        "SESSION_STORE_PATH": os.path.join(cache_dir, "sessions.sqlite3"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, SERVER_FILE, "--port", str(port), "--workers", str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("chat backend did not start")
+
+
+async def backend_session(client, user_id, turns, questions, stream, latencies, ttfts, errors):
+    rng = random.Random(user_id)
+    session_id = f"load-test-{user_id}"
+    for _ in range(turns):
+        body = {"message": rng.choice(questions), "session_id": session_id, "stream": stream}
+        start = time.perf_counter()
+        first = None
+        try:
+            async with client.stream("POST", "/v1/chat/stream", json=body) as response:
+                if response.status_code != 200:
+                    errors.append(f"HTTP {response.status_code}")
+                    continue
+                async for line in response.aiter_lines():
+                    if line.startswith("event: token") and first is None:
+                        first = time.perf_counter() - start
+                    elif line.startswith("event: error"):
+                        errors.append("error event")
+        except httpx.HTTPError as error:
+            errors.append(f"{type(error).__name__}: {error}")
+            continue
+        latencies.append(time.perf_counter() - start)
+        if first is not None:
+            ttfts.append(first)
+
+
+async def drive_backend(url, users, turns, questions, stream, timeout):
+    latencies, ttfts, errors = [], [], []
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*(
+            backend_session(client, user_id, turns, questions, stream, latencies, ttfts, errors)
+            for user_id in range(users)
+        ))
+    return latencies, ttfts, errors
+
+
+def run_backend_load_test(args):
+    server, base_url = start_fake_server(config_from_arguments(args))
+    cache_dir = tempfile.mkdtemp(prefix="meko-loadtest-")
+    backend, url = start_backend(base_url, args.workers, cache_dir)
+    questions = load_questions()
+    users = args.workers * args.sessions
+
+    try:
+        rss_before = process_tree_rss_bytes(backend.pid)
+        start = time.perf_counter()
+        latencies, ttfts, errors = asyncio.run(
+            drive_backend(url, users, args.turns, questions, not args.no_stream, args.timeout)
+        )
+        elapsed = time.perf_counter() - start
+        rss_after = process_tree_rss_bytes(backend.pid)
+    finally:
+        backend.terminate()
+        backend.wait()
+    server_stats = server.RequestHandlerClass.stats.as_dict()
+    server.shutdown()
+
+    latencies.sort()
+    ttfts.sort()
+    print(f"\n=== chat backend: {args.workers} workers, {users} concurrent users × {args.turns} turns "
+          f"({'non-streaming' if args.no_stream else 'streaming'}) ===")
+    print(f"fake LLM: {args.latency}s to first token, {args.tokens_per_second} tokens/s, "
+          f"{args.completion_tokens} tokens, {args.error_rate:.0%} 429s")
+    print(f"turns completed: {len(latencies)}  errors: {len(errors)}")
+    print(f"end-to-end latency (s): p50 {percentile(latencies, 0.5):.2f}  p95 {percentile(latencies, 0.95):.2f}  "
+          f"p99 {percentile(latencies, 0.99):.2f}  max {latencies[-1] if latencies else 0:.2f}")
+    print(f"time to first token (s): p50 {percentile(ttfts, 0.5):.2f}  p95 {percentile(ttfts, 0.95):.2f}")
+    print(f"throughput: {len(latencies) / elapsed:.2f} turns/s over {elapsed:.1f}s")
+    if rss_after:
+        print(f"memory: {(rss_after - rss_before) / users / 1024:.0f} KiB per session "
+              f"({rss_after / 1024 / 1024:.0f} MiB across workers)")
+    print(f"upstream: {server_stats['requests']} LLM requests, peak {server_stats['peak_in_flight']} in flight, "
+          f"{server_stats['rate_limited']} rate limited")
+    for error in errors[:5]:
+        print(f"  ❌ {error}")
+    return 1 if errors else 0
+
+
+def run_load_test(args):
+    server, base_url = start_fake_server(config_from_arguments(args))
+    cache_dir = tempfile.mkdtemp(prefix="meko-loadtest-")
+    secrets = {
+        "AIML_API_KEY": "load-test",
+        "AIML_BASE_URL": base_url,
+        "RESPONSE_CACHE_PATH": os.path.join(cache_dir, "responses.sqlite3"),
+        "SESSION_STORE_PATH": os.path.join(cache_dir, "sessions.sqlite3"),
+        "TELEMETRY_PATH": os.path.join(cache_dir, "telemetry.jsonl"),
+        "STREAM_RESPONSES": not args.no_stream,
+    }
+    questions = load_questions()
+
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=run_worker,
+                                args=(i, args.sessions, args.turns, questions, secrets, args.timeout, results))
+        for i in range(args.workers)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    reports = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+
+    latencies = sorted(latency for report in reports for latency in report["latencies"])
+    errors = [error for report in reports for error in report["errors"]]
+    session_memory = [(report["rss_after"] - report["rss_before"]) / max(args.sessions, 1)
+                      for report in reports if report["rss_after"]]
+    server_stats = server.RequestHandlerClass.stats.as_dict()
+    server.shutdown()
+
+    print(f"\n=== {args.workers} app processes × {args.sessions} sessions × {args.turns} turns "
+          f"({'non-streaming' if args.no_stream else 'streaming'}) ===")
+    print(f"fake LLM: {args.latency}s to first token, {args.tokens_per_second} tokens/s, "
+          f"{args.completion_tokens} tokens, {args.error_rate:.0%} 429s")
+    print(f"turns completed: {len(latencies)}  errors: {len(errors)}")
+    print(f"end-to-end latency (s): p50 {percentile(latencies, 0.5):.2f}  p95 {percentile(latencies, 0.95):.2f}  "
+          f"p99 {percentile(latencies, 0.99):.2f}  max {latencies[-1] if latencies else 0:.2f}")
+    print(f"throughput: {len(latencies) / elapsed:.2f} turns/s over {elapsed:.1f}s")
+    if session_memory:
+        print(f"memory: {sum(session_memory) / len(session_memory) / 1024 / 1024:.2f} MiB per session")
+    print(f"upstream: {server_stats['requests']} LLM requests, peak {server_stats['peak_in_flight']} in flight, "
+          f"{server_stats['rate_limited']} rate limited")
+    for error in errors[:5]:
+        print(f"  ❌ {error}")
+    return 1 if errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chatbot against a fake OpenAI server")
+    parser.add_argument("--backend", action="store_true", help="load the HTTP/SSE chat backend instead of the app")
+    parser.add_argument("--workers", type=int, default=2, help="app or backend processes running in parallel")
+    parser.add_argument("--sessions", type=int, default=10, help="simulated users per process")
+    parser.add_argument("--turns", type=int, default=3, help="messages per user")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per script run")
+    parser.add_argument("--no-stream", action="store_true", help="use non-streaming completions")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    return run_backend_load_test(args) if args.backend else run_load_test(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
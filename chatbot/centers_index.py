@@ -0,0 +1,390 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+import json
+import os
+import re
+import sys
+import time
+
+# Read-only query library over one snapshot of the scraped Bumrungrad
+# dataset (bumrungrad_centers_complete_data.json). The snapshot is loaded
+# once and indexed up front, so lookups are dictionary hits instead of
+# loops over centers_data -> scraped_data -> doctors:
+#
+#   index = CentersIndex.load()
+#   index.find_centers("alergy")                  # trigram fuzzy name match
+#   index.find_doctors("anon jatakanon")
+#   index.doctors_with_specialty("pulmonology")
+#   index.centers_of_doctor("175695")
+#   index.centers_with_phone("02 066 8888")
+#   index.centers_at(building="A", floor=15)
+#   index.open_centers()                          # open now; or open_centers(datetime)
+#   index.open_hotlines(datetime(2025, 7, 12, 22, 30))
+#
+# Results are the snapshot's own dicts, not copies; treat them as read-only.
+#
+#   python chatbot/centers_index.py "allergy"     # time lookups against full scans
+
+CENTERS_DATA_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "bumRunGrad_Data", "bumrungrad_centers_complete_data.json"
+)
+
+# Words that appear in most center names or specialties and carry no signal
+GENERIC_WORDS = {
+    'and', 'the', 'center', 'centers', 'centre', 'centres', 'clinic', 'clinics', 'bumrungrad', 'medicine', 'general',
+    'problems', 'services', 'service', 'unit', 'institute', 'department',
+}
+
+BUILDING_PATTERN = re.compile(r'\bbuilding\s*\(?([a-c])\b', re.IGNORECASE)
+FLOOR_PATTERN = re.compile(r'\b(\d{1,2})\s*(?:st|nd|rd|th)?\s*floors?\b|\bfloor\s*(\d{1,2})\b', re.IGNORECASE)
+WORD_PATTERN = re.compile(r'[a-z0-9/]+')
+NAME_TITLE_PATTERN = re.compile(r'^(?:(?:asst|assoc|clin|prof|dr|mr|mrs|ms)\.\s*)+', re.IGNORECASE)
+
+# Opening hours in the dataset are Bangkok time, which has no daylight saving
+BANGKOK = timezone(timedelta(hours=7))
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+
+# Indexes already built, by data file: (mtime, CentersIndex)
+_loaded = {}
+
+# Share of the query's trigrams a name must contain to be a fuzzy match
+NAME_MATCH_THRESHOLD = 0.5
+
+
+def trigrams(word):
+    """Character trigrams of a word padded with spaces"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a, b):
+    """Jaccard similarity of two words' trigram sets"""
+    grams_a = trigrams(a)
+    grams_b = trigrams(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def words(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+def name_trigrams(name):
+    """Trigrams of every word of a name, without titles like "Dr." """
+    grams = set()
+    for word in words(NAME_TITLE_PATTERN.sub('', name)):
+        grams |= trigrams(word)
+    return grams
+
+
+def specialty_words(specialty):
+    """Split a scraped specialty string ("OtolaryngologyOtolaryngology - Ear Surgery") into words"""
+    specialty = re.sub(r'(?<=[a-z)])(?=[A-Z])', ' ', specialty)
+    return {word for word in words(specialty) if len(word) > 2 and word not in GENERIC_WORDS}
+
+
+def phone_key(phone):
+    """Comparable form of a Thai phone number: "+66 2 066 8888" and "02-066-8888" -> "020668888" """
+    digits = re.sub(r'\D', '', phone)
+    if digits.startswith('66') and len(digits) > 8:
+        digits = '0' + digits[2:]
+    return digits
+
+
+def parse_location(location):
+    """Buildings and floors named in a location string ("Building A, 15 th floor")"""
+    buildings = {building.upper() for building in BUILDING_PATTERN.findall(location)}
+    floors = {int(match.group(1) or match.group(2)) for match in FLOOR_PATTERN.finditer(location)}
+    return buildings, floors
+
+
+def week_minute(when=None):
+    """Minutes since Monday 00:00 Bangkok time; naive datetimes are taken as Bangkok time"""
+    when = when or datetime.now(BANGKOK)
+    if when.tzinfo is not None:
+        when = when.astimezone(BANGKOK)
+    return when.weekday() * DAY_MINUTES + when.hour * 60 + when.minute
+
+
+def clock_minutes(clock):
+    hours, minutes = clock.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class WeeklyIntervalIndex:
+    """Items open in weekly intervals; "open at" is a binary search over the week.
+
+    The week is cut at every opening and closing time into segments, each
+    holding the items open throughout it, so a query is one bisect.
+    """
+
+    def __init__(self):
+        self.intervals = []
+        self.boundaries = [0]
+        self.open_items = [()]
+
+    def add_hours(self, item, hours):
+        """Add normalized hours ({'intervals': [{'days', 'open', 'close'}]}, see opening_hours.py)"""
+        for interval in (hours or {}).get('intervals', []):
+            opens = clock_minutes(interval['open'])
+            closes = clock_minutes(interval['close'])
+            # A close at or before the open time is on the next day
+            if closes <= opens:
+                closes += DAY_MINUTES
+            for day in interval['days']:
+                start = WEEKDAYS.index(day) * DAY_MINUTES
+                self.add(item, start + opens, start + closes)
+
+    def add(self, item, start, end):
+        """Open from week minute start to end; Sunday night ranges wrap to Monday"""
+        if end > WEEK_MINUTES:
+            self.intervals.append((0, end - WEEK_MINUTES, item))
+            end = WEEK_MINUTES
+        self.intervals.append((start, end, item))
+
+    def build(self):
+        events = {}
+        for start, end, item in self.intervals:
+            events.setdefault(start, []).append((item, 1))
+            events.setdefault(end, []).append((item, -1))
+        # Overlapping intervals of one item are counted, not just flagged
+        active = {}
+        self.boundaries = [0]
+        self.open_items = [()]
+        for minute in sorted(events):
+            for item, change in events[minute]:
+                active[item] = active.get(item, 0) + change
+                if not active[item]:
+                    del active[item]
+            items = tuple(sorted(active))
+            if self.boundaries[-1] == minute:
+                self.open_items[-1] = items
+            else:
+                self.boundaries.append(minute)
+                self.open_items.append(items)
+
+    def at(self, minute):
+        """Items open at a week minute"""
+        return self.open_items[bisect_right(self.boundaries, minute) - 1]
+
+
+class TrigramNameIndex:
+    """Fuzzy lookup of whole names (several words) by shared trigrams"""
+
+    def __init__(self):
+        self.grams = []
+        self.ids_by_gram = {}
+
+    def add(self, item_id, name):
+        grams = name_trigrams(name)
+        while len(self.grams) <= item_id:
+            self.grams.append(set())
+        self.grams[item_id] = grams
+        for gram in grams:
+            self.ids_by_gram.setdefault(gram, []).append(item_id)
+
+    def search(self, query, limit=10, threshold=NAME_MATCH_THRESHOLD):
+        """(id, score) pairs, best first.
+
+        A name matches when it contains at least `threshold` of the query's
+        trigrams, so partial names and small typos still match; ties are
+        broken by overall (Jaccard) similarity.
+        """
+        query_grams = name_trigrams(query)
+        if not query_grams:
+            return []
+        shared = {}
+        for gram in query_grams:
+            for item_id in self.ids_by_gram.get(gram, ()):
+                shared[item_id] = shared.get(item_id, 0) + 1
+        matches = []
+        for item_id, count in shared.items():
+            coverage = count / len(query_grams)
+            if coverage >= threshold:
+                jaccard = count / (len(query_grams) + len(self.grams[item_id]) - count)
+                matches.append((item_id, round(coverage, 3), jaccard))
+        matches.sort(key=lambda match: (-match[1], -match[2]))
+        return [(item_id, coverage) for item_id, coverage, _ in matches[:limit]]
+
+
+class CentersIndex:
+    """Precomputed indexes over one snapshot of the centers dataset"""
+
+    def __init__(self, data):
+        self.data = data
+        self.centers = data.get('centers_data', [])
+        # doctor_id -> the doctor's dict (from the first center listing them)
+        self.doctors = {}
+        self.doctor_ids = []
+        self.center_ids_by_doctor = {}
+        self.doctor_ids_by_specialty = {}
+        self.center_ids_by_phone = {}
+        self.center_ids_by_building = {}
+        self.center_ids_by_floor = {}
+        self.center_names = TrigramNameIndex()
+        self.doctor_names = TrigramNameIndex()
+        self.center_hours = WeeklyIntervalIndex()
+        # (center_id, position in the center's hotline_hours)
+        self.hotline_hours = WeeklyIntervalIndex()
+        # Doctors without an id in the snapshot are keyed by name
+        doctor_numbers = {}
+
+        for center_id, center in enumerate(self.centers):
+            self.center_names.add(center_id, center.get('name', ''))
+
+            buildings, floors = parse_location(center.get('original_location', ''))
+            for building in buildings:
+                self.center_ids_by_building.setdefault(building, []).append(center_id)
+            for floor in floors:
+                self.center_ids_by_floor.setdefault(floor, []).append(center_id)
+
+            service_hours = (center.get('scraped_data') or {}).get('service_hours') or {}
+            self.center_hours.add_hours(center_id, service_hours.get('weekly_hours'))
+            for number, hotline in enumerate(self.contact_of(center).get('hotline_hours', [])):
+                self.hotline_hours.add_hours((center_id, number), hotline)
+
+            for phone in self.contact_of(center).get('phone_numbers', []):
+                ids = self.center_ids_by_phone.setdefault(phone_key(phone), [])
+                if center_id not in ids:
+                    ids.append(center_id)
+
+            for doctor in self.doctors_of(center):
+                doctor_id = doctor.get('doctor_id') or doctor.get('name', '')
+                if doctor_id not in self.doctors:
+                    self.doctors[doctor_id] = doctor
+                    doctor_numbers[doctor_id] = len(self.doctor_ids)
+                    self.doctor_ids.append(doctor_id)
+                    self.doctor_names.add(doctor_numbers[doctor_id], doctor.get('name', ''))
+                    for specialty in doctor.get('specialties', []):
+                        for word in specialty_words(specialty):
+                            ids = self.doctor_ids_by_specialty.setdefault(word, [])
+                            if doctor_id not in ids:
+                                ids.append(doctor_id)
+                centers = self.center_ids_by_doctor.setdefault(doctor_id, [])
+                if center_id not in centers:
+                    centers.append(center_id)
+
+        self.center_hours.build()
+        self.hotline_hours.build()
+
+    @classmethod
+    def load(cls, data_file=CENTERS_DATA_FILE):
+        """The index of a data file, built once per version of the file"""
+        path = os.path.abspath(data_file)
+        mtime = os.path.getmtime(path)
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r', encoding='utf-8') as file:
+                cached = (mtime, cls(json.load(file)))
+            _loaded[path] = cached
+        return cached[1]
+
+    @staticmethod
+    def doctors_of(center):
+        return (center.get('scraped_data') or {}).get('doctors') or []
+
+    @staticmethod
+    def contact_of(center):
+        return (center.get('scraped_data') or {}).get('contact_information') or {}
+
+    def find_centers(self, name, limit=10, threshold=NAME_MATCH_THRESHOLD):
+        """(center, score) pairs whose names fuzzily match, best first"""
+        return [(self.centers[center_id], score)
+                for center_id, score in self.center_names.search(name, limit, threshold)]
+
+    def find_doctors(self, name, limit=10, threshold=NAME_MATCH_THRESHOLD):
+        """(doctor, score) pairs whose names fuzzily match, best first"""
+        return [(self.doctors[self.doctor_ids[number]], score)
+                for number, score in self.doctor_names.search(name, limit, threshold)]
+
+    def doctors_with_specialty(self, specialty):
+        """Doctors whose specialties contain every significant word of `specialty`"""
+        matches = None
+        for word in specialty_words(specialty) or set(words(specialty)):
+            ids = self.doctor_ids_by_specialty.get(word, [])
+            if matches is None:
+                matches = list(ids)
+            else:
+                ids = set(ids)
+                matches = [doctor_id for doctor_id in matches if doctor_id in ids]
+        return [self.doctors[doctor_id] for doctor_id in matches or []]
+
+    def centers_of_doctor(self, doctor_id):
+        """Every center listing the doctor"""
+        return [self.centers[center_id] for center_id in self.center_ids_by_doctor.get(str(doctor_id), [])]
+
+    def centers_with_phone(self, phone):
+        """Centers listing the number (shared hotlines belong to many centers)"""
+        return [self.centers[center_id] for center_id in self.center_ids_by_phone.get(phone_key(phone), [])]
+
+    def center_ids_at(self, building=None, floor=None):
+        """Ids of the centers in a building and/or on a floor, in dataset order"""
+        ids = None
+        if building is not None:
+            ids = self.center_ids_by_building.get(str(building).upper(), [])
+        if floor is not None:
+            on_floor = self.center_ids_by_floor.get(int(floor), [])
+            ids = on_floor if ids is None else [center_id for center_id in ids if center_id in on_floor]
+        return list(ids) if ids is not None else []
+
+    def centers_at(self, building=None, floor=None):
+        """Centers in a building and/or on a floor"""
+        return [self.centers[center_id] for center_id in self.center_ids_at(building, floor)]
+
+    def open_center_ids(self, when=None):
+        """Ids of the centers open at `when` (a datetime; default now)"""
+        return self.center_hours.at(week_minute(when))
+
+    def open_centers(self, when=None):
+        """Centers whose service hours include `when` (default now)"""
+        return [self.centers[center_id] for center_id in self.open_center_ids(when)]
+
+    def open_hotline_ids(self, when=None):
+        """(center id, position in the center's hotline_hours) of the hotlines answering at `when`"""
+        return self.hotline_hours.at(week_minute(when))
+
+    def open_hotlines(self, when=None):
+        """(center, hotline) pairs answering at `when`; hotline is {'phones', 'intervals', ...}"""
+        hotlines = []
+        for center_id, number in self.open_hotline_ids(when):
+            center = self.centers[center_id]
+            hotlines.append((center, self.contact_of(center)['hotline_hours'][number]))
+        return hotlines
+
+
+def _scan_doctors_with_specialty(data, specialty):
+    """What consumers did before: a full scan of every center's doctors"""
+    found = {}
+    for center in data.get('centers_data', []):
+        for doctor in (center.get('scraped_data') or {}).get('doctors') or []:
+            if any(specialty.lower() in text.lower() for text in doctor.get('specialties', [])):
+                found.setdefault(doctor.get('doctor_id'), doctor)
+    return list(found.values())
+
+
+if __name__ == "__main__":
+    query = sys.argv[1] if len(sys.argv) > 1 else "allergy"
+
+    start = time.perf_counter()
+    index = CentersIndex.load()
+    print(f"✅ Indexed {len(index.centers)} centers and {len(index.doctors)} doctors "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def timed(label, call, repeat=1000):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = call()
+        print(f"  {label}: {(time.perf_counter() - start) / repeat * 1e6:.1f} µs, {len(result)} results")
+        return result
+
+    timed(f"find_centers({query!r})", lambda: index.find_centers(query))
+    timed(f"find_doctors({query!r})", lambda: index.find_doctors(query))
+    timed(f"doctors_with_specialty({query!r})", lambda: index.doctors_with_specialty(query))
+    timed(f"full scan for specialty {query!r}", lambda: _scan_doctors_with_specialty(index.data, query), 100)
+    timed("centers_at('A', 15)", lambda: index.centers_at("A", 15))
+    timed("centers_with_phone('02 066 8888')", lambda: index.centers_with_phone("02 066 8888"))
+    timed("open_centers()", lambda: index.open_centers())
+    timed("open_hotlines()", lambda: index.open_hotlines())
+    for center, score in index.find_centers(query, limit=3):
+        print(f"  🏥 {center['name']} ({score}) · {center.get('original_location', '')}")
@@ -0,0 +1,272 @@
+import re
+
+from centers_index import (CENTERS_DATA_FILE, GENERIC_WORDS, BUILDING_PATTERN, FLOOR_PATTERN, NAME_TITLE_PATTERN,
+                           CentersIndex, trigram_similarity, words)
+
+# Indexed lookup over the scraped Bumrungrad centers/doctors dataset. The
+# chatbot runs it as a pre-retrieval step and only the matching records (a
+# few hundred bytes) go into the prompt instead of the whole 467 KB file.
+# Question parsing lives here; the name, specialty, location and hours
+# indexes it queries are CentersIndex's (centers_index.py).
+
+MAX_RESULTS = 8
+# Trigram (Jaccard) similarity a question word needs with a word of a
+# center or doctor name; symmetric, so "with" doesn't match "Withawin"
+CENTER_WORD_THRESHOLD = 0.6
+DOCTOR_WORD_THRESHOLD = 0.7
+
+# "Is the eye center open now?", "which centers are currently open"
+OPEN_NOW_PATTERN = re.compile(
+    r"\bopen\b.*\b(?:now|currently|at the moment)\b|\b(?:now|currently)\s+open\b", re.IGNORECASE
+)
+
+# Everyday names for specialties, mapped to the words used in the dataset
+SPECIALTY_ALIASES = {
+    'ent': ['otolaryngology', 'ear', 'throat'],
+    'heart': ['cardiology', 'cardiac'],
+    'cardiologist': ['cardiology'],
+    'skin': ['dermatology'],
+    'dermatologist': ['dermatology'],
+    'eye': ['ophthalmology'],
+    'eyes': ['ophthalmology'],
+    'ophthalmologist': ['ophthalmology'],
+    'child': ['pediatrics'],
+    'children': ['pediatrics'],
+    'kids': ['pediatrics'],
+    'pediatrician': ['pediatrics'],
+    'bone': ['orthopaedics'],
+    'bones': ['orthopaedics'],
+    'orthopedic': ['orthopaedics'],
+    'orthopedics': ['orthopaedics'],
+    'teeth': ['dental'],
+    'dentist': ['dental'],
+    'women': ['ob/gyn'],
+    'gynecologist': ['ob/gyn'],
+    'gynaecologist': ['ob/gyn'],
+    'kidney': ['nephrology'],
+    'lung': ['pulmonology'],
+    'lungs': ['pulmonology'],
+    'brain': ['neurology', 'neurosurgery'],
+    'cancer': ['oncology'],
+    'stomach': ['gastroenterology'],
+    'psychiatrist': ['psychiatry'],
+    'nose': ['rhinology', 'otolaryngology'],
+    'plastic': ['cosmetic', 'plastic'],
+    'cosmetic': ['cosmetic', 'plastic'],
+}
+
+# Specialty words that also come up in ordinary Meko rhinoplasty questions;
+# on their own they don't make a question about the hospital directory
+MEKO_SPECIALTY_WORDS = {'surgery', 'surgical', 'nose', 'rhinology', 'plastic', 'cosmetic',
+                        'reconstructive', 'aesthetics', 'consultation'}
+
+class CentersDirectory:
+    """Question parsing and prompt records over a CentersIndex (names, specialties, building/floor, hours)"""
+
+    def __init__(self, data, index=None):
+        self.index = index or CentersIndex(data)
+        self.centers = self.index.centers
+        # Centers whose page failed to scrape have no details worth listing
+        self.listed = {center_id for center_id, center in enumerate(self.centers)
+                       if center.get('scraping_status') == 'success'}
+
+    @classmethod
+    def load(cls, data_file=CENTERS_DATA_FILE):
+        index = CentersIndex.load(data_file)
+        return cls(index.data, index)
+
+    def specialty_group(self, word):
+        """Dataset specialty words a question word stands for (itself or its aliases)"""
+        return {term for term in SPECIALTY_ALIASES.get(word, [word]) if term in self.index.doctor_ids_by_specialty}
+
+    @staticmethod
+    def names_word(name, word, threshold):
+        """Whether a word of the name (titles like "Dr." left out) is at least `threshold` similar to `word`"""
+        return any(trigram_similarity(word, name_word) >= threshold
+                   for name_word in words(NAME_TITLE_PATTERN.sub('', name)))
+
+    def centers_named(self, word, threshold=CENTER_WORD_THRESHOLD):
+        """Listed centers with a word in their name close to `word`"""
+        # The index finds names sharing enough of the word's trigrams (a
+        # superset: Jaccard >= t implies coverage >= t); each is then
+        # checked word by word
+        candidates = self.index.center_names.search(word, len(self.centers), threshold)
+        return [center_id for center_id, _ in candidates
+                if center_id in self.listed and self.names_word(self.centers[center_id]['name'], word, threshold)]
+
+    def doctors_named(self, word, threshold=DOCTOR_WORD_THRESHOLD):
+        """Ids of the doctors with a word in their name close to `word`"""
+        doctor_ids = (self.index.doctor_ids[number] for number, _ in
+                      self.index.doctor_names.search(word, len(self.index.doctor_ids), threshold))
+        return [doctor_id for doctor_id in doctor_ids
+                if self.names_word(self.index.doctors[doctor_id].get('name', ''), word, threshold)]
+
+    def parse_query(self, question):
+        """Pull building, floor, specialty, center and doctor filters out of a question"""
+        question_words = words(question)
+
+        buildings = {building.upper() for building in BUILDING_PATTERN.findall(question)}
+        floors = {int(match.group(1) or match.group(2)) for match in FLOOR_PATTERN.finditer(question)}
+
+        # One group per question word; a doctor must match every group
+        specialty_groups = []
+        for word in question_words:
+            group = self.specialty_group(word)
+            if group and group not in specialty_groups:
+                specialty_groups.append(group)
+
+        centers = {}
+        doctors = {}
+        for word in question_words:
+            if len(word) < 4 or word in GENERIC_WORDS:
+                continue
+            for center_id in self.centers_named(word):
+                centers[center_id] = centers.get(center_id, 0) + 1
+            for doctor_id in self.doctors_named(word):
+                doctors[doctor_id] = doctors.get(doctor_id, 0) + 1
+        # Specialty words name centers too ("eye" -> Eye Center), however short
+        for word in question_words:
+            for alias in ([word] + SPECIALTY_ALIASES[word] if word in SPECIALTY_ALIASES else []):
+                for center_id in self.centers_named(alias):
+                    centers[center_id] = centers.get(center_id, 0) + 1
+
+        return {
+            'buildings': buildings,
+            'floors': floors,
+            'specialties': specialty_groups,
+            'centers': sorted(centers, key=lambda center_id: -centers[center_id]),
+            # Keep only the doctors matching the most name words
+            'doctors': [doctor_id for doctor_id in doctors if doctors[doctor_id] == max(doctors.values())],
+            'open_now': bool(OPEN_NOW_PATTERN.search(question)),
+        }
+
+    def _location_filter(self, buildings, floors):
+        allowed = None
+        if buildings:
+            allowed = set().union(*(self.index.center_ids_at(building=building) for building in buildings))
+        if floors:
+            on_floors = set().union(*(self.index.center_ids_at(floor=floor) for floor in floors))
+            allowed = on_floors if allowed is None else allowed & on_floors
+        if allowed is not None:
+            allowed &= self.listed
+        return allowed
+
+    def search(self, question, limit=MAX_RESULTS, when=None):
+        """Return compact center and doctor records matching the question
+
+        "Open now" questions are answered for `when` (default: now): named
+        centers, or else the centers of the matching doctors, get their
+        open/closed status; without either only open centers are listed.
+        """
+        query = self.parse_query(question)
+        allowed = self._location_filter(query['buildings'], query['floors'])
+        has_people_filter = bool(query['doctors'] or query['specialties'])
+
+        open_ids = None
+        phones_now = {}
+        if query['open_now']:
+            open_ids = set(self.index.open_center_ids(when))
+            for center_id, hotline in self.index.open_hotline_ids(when):
+                phones_now.setdefault(center_id, []).extend(
+                    self.index.contact_of(self.centers[center_id])['hotline_hours'][hotline]['phones'])
+            if not query['centers'] and not has_people_filter:
+                allowed = open_ids if allowed is None else allowed & open_ids
+
+        doctor_ids = []
+        if query['doctors']:
+            doctor_ids = query['doctors']
+        elif query['specialties']:
+            matches = None
+            for group in query['specialties']:
+                ids = set().union(*(self.index.doctor_ids_by_specialty[term] for term in group))
+                matches = ids if matches is None else matches & ids
+            doctor_ids = sorted(matches, key=lambda doctor_id: (self.index.center_ids_by_doctor[doctor_id], doctor_id))
+
+        # The same doctor is listed under every center they work in
+        doctors = {}
+        for doctor_id in doctor_ids:
+            center_ids = [center_id for center_id in self.index.center_ids_by_doctor.get(doctor_id, [])
+                          if center_id in self.listed and (allowed is None or center_id in allowed)]
+            if center_ids:
+                doctors[doctor_id] = center_ids
+
+        # Doctors who work in the centers the question names come first
+        named_centers = set(query['centers'])
+        doctor_ids = sorted(doctors, key=lambda doctor_id: named_centers.isdisjoint(doctors[doctor_id]))
+
+        center_ids = [center_id for center_id in query['centers']
+                      if allowed is None or center_id in allowed]
+        if not center_ids and allowed is not None and not has_people_filter:
+            center_ids = sorted(allowed)
+        elif not center_ids and query['open_now']:
+            center_ids = list(dict.fromkeys(center_id for doctor_id in doctor_ids for center_id in doctors[doctor_id]))
+
+        return {
+            'centers': [self.center_record(center_id, open_ids, phones_now) for center_id in center_ids[:limit]],
+            'doctors': [self.doctor_record(doctor_id, doctors[doctor_id]) for doctor_id in doctor_ids[:limit]],
+            'total_doctors': len(doctors),
+        }
+
+    def center_record(self, center_id, open_ids=None, phones_now=None):
+        center = self.centers[center_id]
+        scraped = center.get('scraped_data') or {}
+        contact = scraped.get('contact_information') or {}
+        hours = (scraped.get('service_hours') or {}).get('hours_info') or []
+        return {
+            'name': center['name'],
+            'location': center.get('original_location', ''),
+            'phones': contact.get('phone_numbers', []),
+            'hours': [line for line in hours if line != 'Service Hours'][:2],
+            'doctors_count': center.get('doctors_count', 0),
+            'url': center.get('detail_url', ''),
+            # Only filled in for "open now" questions
+            'open_now': center_id in open_ids if open_ids is not None else None,
+            'phones_now': (phones_now or {}).get(center_id, []),
+        }
+
+    def doctor_record(self, doctor_id, center_ids):
+        doctor = self.index.doctors[doctor_id]
+        return {
+            'name': doctor.get('name', ''),
+            'specialties': doctor.get('specialties', []),
+            'centers': [self.centers[center_id]['name'] for center_id in center_ids],
+            'location': self.centers[center_ids[0]].get('original_location', ''),
+            'profile_url': doctor.get('profile_url', ''),
+        }
+
+
+def is_directory_question(question, directory):
+    """Whether a question should be looked up in the hospital directory"""
+    if 'bumrungrad' in question.lower():
+        return True
+    query = directory.parse_query(question)
+    if query['buildings'] or query['floors'] or query['doctors'] or query['open_now']:
+        return True
+    # Judged on the question's own words: "nose" also stands for otolaryngology,
+    # but a nose question is still a Meko question
+    return any(word not in MEKO_SPECIALTY_WORDS and directory.specialty_group(word) for word in words(question))
+
+
+def format_directory_context(results):
+    """Render lookup results as compact prompt lines"""
+    if not results['centers'] and not results['doctors']:
+        return "- No Bumrungrad centers or doctors match this question."
+    lines = []
+    for center in results['centers']:
+        details = [center['location']]
+        if center['hours']:
+            details.append("hours: " + "; ".join(center['hours']))
+        if center['open_now'] is not None:
+            details.append("open now" if center['open_now'] else "closed now")
+        if center['phones_now']:
+            details.append("answering now: " + ", ".join(center['phones_now']))
+        if center['phones']:
+            details.append("tel: " + ", ".join(center['phones']))
+        lines.append(f"- Center: {center['name']} | " + " | ".join(details))
+    for doctor in results['doctors']:
+        specialties = "; ".join(doctor['specialties'])
+        centers = ", ".join(doctor['centers'])
+        lines.append(f"- Doctor: {doctor['name']} | {specialties} | {centers} ({doctor['location']})")
+    if results['total_doctors'] > len(results['doctors']):
+        lines.append(f"- ...and {results['total_doctors'] - len(results['doctors'])} more doctors")
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import queue
+
+import httpx
+
+from llm import error_response
+
+# How the Streamlit app (or any other Python frontend) talks to the chatbot:
+# over HTTP to chat_server.py, or to a ChatService in the same process when
+# no backend URL is configured. Both clients have the same blocking API and
+# yield the event dicts described in chat_service.py.
+
+DEFAULT_BACKEND_TIMEOUT = 120
+
+_DONE = object()
+
+
+class BackendError(Exception):
+    pass
+
+
+class BackendClient:
+    """Client for the chat server's HTTP/SSE API"""
+
+    def __init__(self, base_url, token="", timeout=DEFAULT_BACKEND_TIMEOUT):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        # One keep-alive connection pool shared by all sessions of the app
+        self.http = httpx.Client(base_url=base_url.rstrip("/"), headers=headers,
+                                 timeout=httpx.Timeout(timeout, connect=5))
+
+    def chat(self, message, session_id=None, language=None, stream=True):
+        """Yield the events of one turn as the server sends them"""
+        body = {"message": message, "session_id": session_id, "language": language, "stream": stream}
+        with self.http.stream("POST", "/v1/chat/stream", json=body) as response:
+            if response.status_code != 200:
+                response.read()
+                raise BackendError(f"chat backend returned {response.status_code}: {response.text}")
+            data = []
+            meta = None
+            answered = False
+            for line in response.iter_lines():
+                if line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    event = json.loads("\n".join(data))
+                    data = []
+                    if event["event"] == "error":
+                        if meta is None:
+                            raise BackendError(event["error"])
+                        # Mid-stream failures end the answer the way ChatService's
+                        # own errors do: in the user's language, after what was sent
+                        text = ("\n\n" if answered else "") + error_response(meta["language"], event["error"])
+                        yield {"event": "token", "text": text}
+                        return
+                    if event["event"] == "meta":
+                        meta = event
+                    elif event["event"] == "token":
+                        answered = True
+                    yield event
+
+    def clear(self, session_id):
+        self.http.delete(f"/v1/sessions/{session_id}").raise_for_status()
+
+
+class LocalClient:
+    """Runs a ChatService in this process, on its LLM pool's event loop"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def chat(self, message, session_id=None, language=None, stream=True):
+        events = queue.Queue()
+
+        async def pump():
+            try:
+                async for event in self.service.chat(message, session_id, language, stream):
+                    events.put(event)
+                events.put(_DONE)
+            except Exception as error:
+                events.put(error)
+
+        asyncio.run_coroutine_threadsafe(pump(), self.service.pool.loop)
+        while True:
+            event = events.get()
+            if event is _DONE:
+                return
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def clear(self, session_id):
+        self.service.run(self.service.clear_session(session_id))
@@ -0,0 +1,72 @@
+# Displayed chat history of one Streamlit session, bounded in memory. Only
+# the newest messages stay in session state; older ones are spilled to the
+# session store and read back only when the user asks for earlier pages.
+# Messages carry their display strings (e.g. the detected-language caption),
+# computed once when they are added, so a rerun renders one page of
+# ready-made markdown however long the conversation is.
+
+DEFAULT_MAX_MESSAGES = 40
+DEFAULT_PAGE_SIZE = 20
+
+
+class ChatHistory:
+    """Newest messages in memory, older ones in a SessionStore, shown a page at a time"""
+
+    def __init__(self, session_id, store, max_messages=DEFAULT_MAX_MESSAGES, page_size=DEFAULT_PAGE_SIZE):
+        self.session_id = session_id
+        self.store = store
+        self.max_messages = max(max_messages, page_size)
+        self.page_size = page_size
+        self.messages = []
+        # Messages at positions 0 .. spilled - 1 are in the store
+        self.spilled = 0
+        self.pages = 1
+
+    def __len__(self):
+        return self.spilled + len(self.messages)
+
+    def append(self, message):
+        """Add a message dict ({"role", "content", ...}); spill the oldest beyond the cap"""
+        self.messages.append(message)
+        # A new message brings the view back to the latest page
+        self.pages = 1
+        overflow = len(self.messages) - self.max_messages
+        if overflow > 0:
+            self.store.append_messages(self.session_id, self.spilled, self.messages[:overflow])
+            self.spilled += overflow
+            del self.messages[:overflow]
+        elif self.spilled:
+            # Spilled messages expire with the store's TTL; a message in this
+            # session counts as activity for them too
+            self.store.touch_messages(self.session_id)
+
+    def last(self):
+        return self.messages[-1] if self.messages else None
+
+    def last_with(self, key):
+        """Newest in-memory message that has key (e.g. "detected_language")"""
+        for message in reversed(self.messages):
+            if key in message:
+                return message
+        return None
+
+    def visible(self):
+        """Messages of the pages being shown, oldest first"""
+        count = min(len(self), self.pages * self.page_size)
+        if count <= len(self.messages):
+            return self.messages[len(self.messages) - count:]
+        # Earlier pages are read from the store for this render only
+        return self.store.load_messages(self.session_id, len(self) - count, self.spilled) + self.messages
+
+    def has_earlier(self):
+        return len(self) > self.pages * self.page_size
+
+    def load_earlier(self):
+        self.pages += 1
+
+    def clear(self):
+        if self.spilled:
+            self.store.delete_messages(self.session_id)
+        self.messages = []
+        self.spilled = 0
+        self.pages = 1
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import contextlib
+import hmac
+import json
+import logging
+import os
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from chat_service import MAX_MESSAGE_CHARS, ChatService, load_settings
+from languages import LANGUAGES
+
+# HTTP/SSE API over ChatService, for the Streamlit app and any other
+# frontend (WhatsApp, LINE, ...). Sessions live in the shared SQLite session
+# store, so the server can run as several worker processes behind one port.
+#
+#   python chatbot/chat_server.py --port 8000 --workers 4
+#
+#   POST   /v1/chat              {"message", "session_id"?, "language"?} -> JSON answer
+#   POST   /v1/chat/stream       same body (+ "stream"?) -> text/event-stream of meta/token/done events
+#   DELETE /v1/sessions/{id}     forget a conversation
+#   GET    /health
+#
+# Settings are read like the app's: environment variables first, then
+# .streamlit/secrets.toml. With CHAT_BACKEND_TOKEN set, requests must send
+# "Authorization: Bearer <token>".
+
+DEFAULT_PORT = 8000
+
+
+def authorized(request):
+    token = request.app.state.settings["CHAT_BACKEND_TOKEN"]
+    if not token:
+        return True
+    return hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {token}")
+
+
+async def read_chat_request(request):
+    """Validated (message, session_id, language, stream) or an error response"""
+    if not authorized(request):
+        return None, JSONResponse({"error": "unauthorized"}, status_code=401)
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        return None, JSONResponse({"error": "body must be a JSON object"}, status_code=400)
+    message = str(body.get("message") or "").strip()
+    if not message:
+        return None, JSONResponse({"error": "message is required"}, status_code=400)
+    if len(message) > MAX_MESSAGE_CHARS:
+        return None, JSONResponse({"error": f"message is longer than {MAX_MESSAGE_CHARS} characters"},
+                                  status_code=413)
+    language = body.get("language") or None
+    if language and language not in LANGUAGES:
+        return None, JSONResponse({"error": f"unsupported language: {language}"}, status_code=400)
+    # "stream": false still answers over SSE, but asks the LLM for the whole
+    # answer at once
+    return (message, body.get("session_id") or None, language, body.get("stream") is not False), None
+
+
+async def chat(request):
+    parsed, error = await read_chat_request(request)
+    if error:
+        return error
+    message, session_id, language, _ = parsed
+    result = {"answer": ""}
+    async for event in request.app.state.service.chat(message, session_id, language, stream=False):
+        if event["event"] == "meta":
+            result.update({key: value for key, value in event.items() if key != "event"})
+        elif event["event"] == "done":
+            result.update({key: value for key, value in event.items() if key != "event"})
+    return JSONResponse(result)
+
+
+def sse(event):
+    return f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def chat_stream(request):
+    parsed, error = await read_chat_request(request)
+    if error:
+        return error
+    message, session_id, language, stream = parsed
+
+    async def events():
+        try:
+            async for event in request.app.state.service.chat(message, session_id, language, stream):
+                yield sse(event)
+        except Exception as e:
+            logging.getLogger(__name__).exception("chat stream failed")
+            yield sse({"event": "error", "error": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def delete_session(request):
+    if not authorized(request):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    await request.app.state.service.clear_session(request.path_params["session_id"])
+    return JSONResponse({"deleted": request.path_params["session_id"]})
+
+
+async def health(request):
+    return JSONResponse({"status": "ok", "pid": os.getpid(), "llm": request.app.state.service.pool.stats})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Each worker process builds its own service on its own event loop; the
+    # LLM pool then runs on that loop instead of a thread of its own
+    app.state.settings = load_settings()
+    app.state.service = ChatService(app.state.settings, loop=asyncio.get_running_loop())
+    yield
+    await app.state.service.pool.client.close()
+
+
+app = Starlette(
+    routes=[
+        Route("/v1/chat", chat, methods=["POST"]),
+        Route("/v1/chat/stream", chat_stream, methods=["POST"]),
+        Route("/v1/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        Route("/health", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the chatbot backend (HTTP/SSE API)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    print(f"✅ Chat backend on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    uvicorn.run("chat_server:app", app_dir=os.path.dirname(os.path.abspath(__file__)),
+                host=args.host, port=args.port, workers=args.workers)
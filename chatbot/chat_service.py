@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+
+from language_detection import detect_language
+from llm import AIML_BASE_URL, build_messages, request_params, error_response, load_secrets
+from routing import ModelRouter, DEFAULT_TIERS
+from llm_pool import LLMPool, DEFAULT_MAX_CONNECTIONS, DEFAULT_TIMEOUT_SECONDS, DEFAULT_MAX_RETRIES
+from facts import FACTS_FILE, FactIndex, extract_facts, answer_from_facts
+from conversation import ConversationContext, DEFAULT_HISTORY_TOKEN_BUDGET, DEFAULT_SUMMARY_TOKEN_BUDGET
+from tokens import estimate_tokens
+from knowledge import (CLINIC_HTML_FILE, KnowledgeBase, load_knowledge_artifact, load_translated_artifact,
+                       load_centers_directory, content_version)
+from languages import LANGUAGES
+from response_cache import RESPONSE_CACHE_FILE, DEFAULT_TTL_SECONDS, DEFAULT_MAX_ENTRIES, ResponseCache
+from session_store import SESSION_STORE_FILE, DEFAULT_SESSION_TTL_SECONDS, SessionStore
+from telemetry import Spans
+
+# The chatbot itself, without any UI: language detection, the facts fast
+# path, the shared response cache, retrieval, model routing and the pooled
+# LLM calls. It is asyncio-native so that one process serves many sessions
+# concurrently; chat_server.py exposes it over HTTP/SSE and the Streamlit
+# app either calls that server or runs a ChatService in-process.
+#
+# A turn is a stream of event dicts:
+#   {"event": "meta", ...}   session, language, source (facts/cache/llm) and,
+#                            for LLM answers, the route, retrieval hits and
+#                            prompt token counts
+#   {"event": "token", "text": ...}   answer pieces
+#   {"event": "done", ...}   the whole answer, token usage, time to first token
+#                            and the turn's timing spans in ms (telemetry.py)
+
+logger = logging.getLogger(__name__)
+
+# Setting -> default; values come from the environment, the Streamlit secrets
+# file or whatever mapping the caller passes in
+DEFAULT_SETTINGS = {
+    "AIML_API_KEY": "",
+    "AIML_BASE_URL": AIML_BASE_URL,
+    "RETRIEVAL_TOP_K": 6,
+    "RETRIEVAL_TOKEN_BUDGET": 1500,
+    "RESPONSE_CACHE_TTL": DEFAULT_TTL_SECONDS,
+    "RESPONSE_CACHE_MAX_ENTRIES": DEFAULT_MAX_ENTRIES,
+    "RESPONSE_CACHE_PATH": RESPONSE_CACHE_FILE,
+    "HISTORY_TOKEN_BUDGET": DEFAULT_HISTORY_TOKEN_BUDGET,
+    "SUMMARY_TOKEN_BUDGET": DEFAULT_SUMMARY_TOKEN_BUDGET,
+    "LLM_MAX_CONNECTIONS": DEFAULT_MAX_CONNECTIONS,
+    "LLM_TIMEOUT": DEFAULT_TIMEOUT_SECONDS,
+    "LLM_MAX_RETRIES": DEFAULT_MAX_RETRIES,
+    "ROUTER_TIERS": {},
+    "SESSION_STORE_PATH": SESSION_STORE_FILE,
+    "SESSION_TTL": DEFAULT_SESSION_TTL_SECONDS,
+    # Shared secret the chat server requires as a bearer token, if set
+    "CHAT_BACKEND_TOKEN": "",
+}
+
+MAX_MESSAGE_CHARS = 4000
+
+# Retrieval hits are sent to clients for debugging; long chunk texts are cut
+HIT_PREVIEW_CHARS = 300
+
+
+def load_settings(overrides=None):
+    """Defaults, then the Streamlit secrets file, then environment variables"""
+    secrets = load_secrets()
+    settings = {}
+    for key, default in DEFAULT_SETTINGS.items():
+        value = os.environ.get(key, secrets.get(key, default))
+        # ROUTER_TIERS arrives as JSON from the environment
+        if key == "ROUTER_TIERS" and isinstance(value, str):
+            value = json.loads(value or "{}")
+        settings[key] = value
+    settings.update(overrides or {})
+    return settings
+
+
+def hit_preview(hit):
+    return {"id": hit["id"], "heading": hit["heading"], "score": hit["score"], "tokens": hit["tokens"],
+            "text": hit["text"][:HIT_PREVIEW_CHARS]}
+
+
+def router_tiers(overrides):
+    """DEFAULT_TIERS with per-tier field overrides, e.g. {"faq": {"max_tokens": 400}}"""
+    return {name: {**tier, **dict(overrides.get(name, {}))} for name, tier in DEFAULT_TIERS.items()}
+
+
+def load_fact_index():
+    """Structured facts written by scraping.py, or extracted from the saved HTML"""
+    facts_path = os.path.join(os.path.dirname(__file__), FACTS_FILE)
+    try:
+        return FactIndex.load(facts_path)
+    except (FileNotFoundError, ValueError):
+        # Older scrapes only saved the HTML; extract the facts from it instead
+        try:
+            from bs4 import BeautifulSoup
+            with open(CLINIC_HTML_FILE, "r", encoding="utf-8") as file:
+                soup = BeautifulSoup(file.read(), 'html.parser')
+            return FactIndex(extract_facts(soup))
+        except FileNotFoundError:
+            return FactIndex({})
+
+
+class ChatService:
+    """Answers chat messages for any number of sessions"""
+
+    def __init__(self, settings=None, loop=None):
+        settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        if not settings["AIML_API_KEY"]:
+            raise ValueError("AIML API Key not found. Set AIML_API_KEY or add it to .streamlit/secrets.toml")
+
+        self.top_k = int(settings["RETRIEVAL_TOP_K"])
+        self.token_budget = int(settings["RETRIEVAL_TOKEN_BUDGET"])
+        self.history_token_budget = int(settings["HISTORY_TOKEN_BUDGET"])
+        self.summary_token_budget = int(settings["SUMMARY_TOKEN_BUDGET"])
+
+        self.knowledge = load_knowledge_artifact()
+        directory = load_centers_directory()
+        self.knowledge_base = KnowledgeBase(self.knowledge["chunks"], directory)
+        # Pre-translated chunks (translate_knowledge.py) for the languages
+        # that have them; the others retrieve from the source page
+        self.translated_knowledge_bases = {}
+        for language in LANGUAGES:
+            artifact = load_translated_artifact(language, self.knowledge)
+            if artifact:
+                self.translated_knowledge_bases[language] = KnowledgeBase(artifact["chunks"], directory)
+        self.fact_index = load_fact_index()
+        self.response_cache = ResponseCache(
+            settings["RESPONSE_CACHE_PATH"],
+            content_version(),
+            ttl_seconds=int(settings["RESPONSE_CACHE_TTL"]),
+            max_entries=int(settings["RESPONSE_CACHE_MAX_ENTRIES"])
+        )
+        self.sessions = SessionStore(settings["SESSION_STORE_PATH"], ttl_seconds=int(settings["SESSION_TTL"]))
+        self.router = ModelRouter(router_tiers(settings["ROUTER_TIERS"]))
+        # Without a loop the pool starts its own thread; run() executes
+        # coroutines there for blocking callers
+        self.pool = LLMPool(
+            settings["AIML_API_KEY"],
+            base_url=settings["AIML_BASE_URL"],
+            max_connections=int(settings["LLM_MAX_CONNECTIONS"]),
+            timeout=float(settings["LLM_TIMEOUT"]),
+            max_retries=int(settings["LLM_MAX_RETRIES"]),
+            loop=loop
+        )
+
+    def run(self, coroutine):
+        return self.pool.run(coroutine)
+
+    async def load_conversation(self, session_id):
+        state = await asyncio.to_thread(self.sessions.get, session_id)
+        if state is None:
+            return ConversationContext(self.history_token_budget, self.summary_token_budget)
+        return ConversationContext.from_dict(state, self.history_token_budget, self.summary_token_budget)
+
+    async def clear_session(self, session_id):
+        await asyncio.to_thread(self.sessions.delete, session_id)
+
+    def retrieve(self, message, language):
+        """Retrieve from the language's translated chunks, else from the source page"""
+        knowledge_base = self.translated_knowledge_bases.get(language)
+        if knowledge_base:
+            retrieval = knowledge_base.retrieve(message, top_k=self.top_k, token_budget=self.token_budget)
+            # A Roman-script or English question may match nothing in the
+            # native-script translation; the source page still has the terms
+            if any(hit["score"] > 0 for hit in retrieval["hits"]):
+                return {**retrieval, "knowledge": language}
+        retrieval = self.knowledge_base.retrieve(message, top_k=self.top_k, token_budget=self.token_budget)
+        return {**retrieval, "knowledge": "source"}
+
+    def prompt_token_stats(self, message, language, clinic_content, conversation):
+        """Tokens of the prompt about to be sent, split by part"""
+        messages = build_messages(message, language, clinic_content)
+        stats = conversation.stats()
+        stats["system_tokens"] = estimate_tokens(messages[0]["content"])
+        stats["user_tokens"] = estimate_tokens(message)
+        stats["prompt_tokens"] = stats["system_tokens"] + stats["history_tokens"] + stats["user_tokens"]
+        return stats
+
+    async def chat(self, message, session_id=None, language=None, stream=True):
+        """Answer a message, yielding meta, token and done events"""
+        spans = Spans()
+        session_id = session_id or uuid.uuid4().hex
+        if not language:
+            with spans.span("detect"):
+                language = detect_language(message)
+        with spans.span("session"):
+            conversation = await self.load_conversation(session_id)
+        history = conversation.history()
+        meta = {"event": "meta", "session_id": session_id, "language": language}
+
+        # Fast path: price/recovery/hours/contact questions from the facts
+        # index, then answers already in the shared cache. Both answer a
+        # message on its own, so follow-ups ("and the recovery time?") that
+        # depend on earlier turns always go to the LLM.
+        response = None
+        source = None
+        if not history:
+            with spans.span("facts"):
+                response = answer_from_facts(message, language, self.fact_index)
+            source = "facts"
+            if not response:
+                with spans.span("cache"):
+                    response = await asyncio.to_thread(self.response_cache.get, message, language)
+                source = "cache"
+
+        usage = []
+        ttft = None
+        failed = False
+        if response:
+            yield {**meta, "source": source}
+            yield {"event": "token", "text": response}
+        else:
+            with spans.span("retrieval"):
+                retrieval = self.retrieve(message, language)
+            clinic_content = retrieval["context"]
+            # Greetings and simple questions go to a smaller, faster tier
+            with spans.span("route"):
+                route = self.router.route(message, language, retrieval["hits"])
+            with spans.span("prompt"):
+                prompt_tokens = self.prompt_token_stats(message, language, clinic_content, conversation)
+            yield {
+                **meta,
+                "source": "llm",
+                "route": route,
+                "retrieval": {"query": message, "knowledge": retrieval["knowledge"],
+                              "hits": [hit_preview(hit) for hit in retrieval["hits"]],
+                              "directory": retrieval["directory"]},
+                "prompt_tokens": prompt_tokens,
+            }
+
+            pieces = []
+            start = time.perf_counter()
+            try:
+                if stream:
+                    def request(model, max_tokens, timeout):
+                        params = request_params(message, language, clinic_content, history, model, max_tokens)
+                        return self.pool.astream(params, timeout=timeout, on_usage=usage.append)
+
+                    async for piece in self.router.astream(route, request):
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        pieces.append(piece)
+                        yield {"event": "token", "text": piece}
+                else:
+                    def request(model, max_tokens, timeout):
+                        params = request_params(message, language, clinic_content, history, model, max_tokens)
+                        return self.pool.acomplete(params, timeout=timeout, on_usage=usage.append)
+
+                    piece = await self.router.acall(route, request)
+                    pieces.append(piece)
+                    yield {"event": "token", "text": piece}
+            except Exception as e:
+                # Mid-stream failures keep what was already sent and append
+                # the error message in the user's language
+                failed = True
+                logger.warning("LLM request failed for session %s: %s", session_id, e)
+                piece = ("\n\n" if pieces else "") + error_response(language, e)
+                pieces.append(piece)
+                yield {"event": "token", "text": piece}
+            spans.add("llm", time.perf_counter() - start)
+            if ttft is not None:
+                spans.add("ttft", ttft)
+            response = "".join(pieces)
+
+            # Only successful answers are cached; errors are retried next time.
+            # Answers that depend on earlier turns aren't shared with other users,
+            # and "open now" answers go stale.
+            if not failed and not history and not retrieval["time_sensitive"]:
+                await asyncio.to_thread(self.response_cache.put, message, language, response)
+
+        conversation.add("user", message)
+        conversation.add("assistant", response)
+        with spans.span("session"):
+            await asyncio.to_thread(self.sessions.put, session_id, conversation.to_dict())
+        spans.add("service", spans.elapsed())
+
+        yield {
+            "event": "done",
+            "session_id": session_id,
+            "answer": response,
+            "failed": failed,
+            "usage": usage[0] if usage else None,
+            "ttft": ttft,
+            "spans": spans.as_dict(),
+        }
@@ -0,0 +1,116 @@
+import re
+
+from tokens import estimate_tokens
+
+# Token-budgeted multi-turn context for the LLM. Recent turns are sent
+# verbatim; once they no longer fit the budget the oldest ones are folded
+# into a rolling summary, one turn at a time and exactly once, so the prompt
+# size stays bounded however long the chat gets.
+
+DEFAULT_HISTORY_TOKEN_BUDGET = 1200
+DEFAULT_SUMMARY_TOKEN_BUDGET = 300
+
+# How much of a turn survives in the summary
+SUMMARY_LINE_TOKENS = 40
+
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?。！？؟।])\s')
+
+
+def summarize_turn(turn, max_tokens=SUMMARY_LINE_TOKENS):
+    """One short summary line for a turn: its first sentence, trimmed to max_tokens"""
+    text = re.sub(r'\s+', ' ', turn["content"]).strip()
+    text = SENTENCE_END_PATTERN.split(text, maxsplit=1)[0]
+    if estimate_tokens(text) > max_tokens:
+        words = text.split()
+        while len(words) > 1 and estimate_tokens(" ".join(words)) > max_tokens:
+            words.pop()
+        text = " ".join(words)
+        # Unspaced scripts (Thai, CJK) are one long "word"; cut by characters
+        if estimate_tokens(text) > max_tokens:
+            text = text[:max_tokens * 2]
+        text += " …"
+    speaker = "User" if turn["role"] == "user" else "Assistant"
+    return f"{speaker}: {text}"
+
+
+class ConversationContext:
+    """Recent turns verbatim plus a rolling summary of everything older"""
+
+    def __init__(self, history_token_budget=DEFAULT_HISTORY_TOKEN_BUDGET,
+                 summary_token_budget=DEFAULT_SUMMARY_TOKEN_BUDGET):
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+        # Only turns not yet in the summary are kept; folded ones are dropped
+        self.turns = []
+        self.summarized = 0
+        self.summary_lines = []
+        self.summary_tokens = 0
+
+    def add(self, role, content):
+        """Record a finished turn; its token count is computed once here"""
+        self.turns.append({"role": role, "content": content, "tokens": estimate_tokens(content)})
+        self._fold()
+
+    def _recent_tokens(self):
+        return sum(turn["tokens"] for turn in self.turns)
+
+    def _fold(self):
+        # Summarize the oldest unsummarized turns until the rest fit. The
+        # budget covers the summary and the verbatim turns together, and the
+        # newest turn is always kept verbatim.
+        recent_tokens = self._recent_tokens()
+        while len(self.turns) > 1 and self.summary_tokens + recent_tokens > self.history_token_budget:
+            turn = self.turns.pop(0)
+            line = summarize_turn(turn)
+            self.summary_lines.append(line)
+            self.summary_tokens += estimate_tokens(line)
+            self.summarized += 1
+            recent_tokens -= turn["tokens"]
+
+            # The summary has its own cap; the oldest lines go first
+            while len(self.summary_lines) > 1 and self.summary_tokens > self.summary_token_budget:
+                self.summary_tokens -= estimate_tokens(self.summary_lines.pop(0))
+
+    @property
+    def summary(self):
+        return "\n".join(self.summary_lines)
+
+    def history(self):
+        """Chat messages to send before the new user message"""
+        messages = []
+        if self.summary_lines:
+            messages.append({"role": "system", "content": "Summary of the earlier conversation:\n" + self.summary})
+        messages.extend({"role": turn["role"], "content": turn["content"]} for turn in self.turns)
+        return messages
+
+    def stats(self):
+        """Token accounting for the history part of the next prompt"""
+        recent_tokens = self._recent_tokens()
+        return {
+            "turns": self.summarized + len(self.turns),
+            "recent_turns": len(self.turns),
+            "summarized_turns": self.summarized,
+            "recent_tokens": recent_tokens,
+            "summary_tokens": self.summary_tokens,
+            "history_tokens": recent_tokens + self.summary_tokens,
+            "budget": self.history_token_budget,
+        }
+
+    def to_dict(self):
+        """JSON-ready state, for keeping a session outside the process"""
+        return {
+            "turns": self.turns,
+            "summarized": self.summarized,
+            "summary_lines": self.summary_lines,
+            "summary_tokens": self.summary_tokens,
+        }
+
+    @classmethod
+    def from_dict(cls, data, history_token_budget=DEFAULT_HISTORY_TOKEN_BUDGET,
+                  summary_token_budget=DEFAULT_SUMMARY_TOKEN_BUDGET):
+        context = cls(history_token_budget, summary_token_budget)
+        context.turns = list(data.get("turns", []))
+        context.summarized = data.get("summarized", 0)
+        context.summary_lines = list(data.get("summary_lines", []))
+        context.summary_tokens = data.get("summary_tokens", 0)
+        return context
@@ -0,0 +1,469 @@
+from functools import lru_cache
+import json
+import re
+
+# Structured facts pulled out of the clinic page at scrape time so that the
+# chatbot can answer price / recovery / hours / contact questions without an
+# LLM round-trip.
+
+FACTS_FILE = "meko_clinic_facts.json"
+
+FACT_TYPES = ("price", "recovery", "hours", "contact")
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+# Section headings added by scraping.py when it flattens the page; they group
+# content by tag type and never name a procedure.
+SCRAPER_SECTIONS = {'Headings', 'Paragraphs', 'List Items', 'Image Descriptions', 'Prices'}
+
+# Prices such as "99,000 บาท", "฿ 45,000", "THB 120,000" or "30,000 baht"
+PRICE_PATTERN = re.compile(
+    r'(?:฿|THB)\s*(\d{1,3}(?:,\d{3})+|\d{4,})'
+    r'|(\d{1,3}(?:,\d{3})+|\d{4,})(?:\.\d{2})?\s*(?:฿|baht|THB|บาท)',
+    re.IGNORECASE
+)
+
+# Durations such as "7 days", "1-2 สัปดาห์" or "3 months"
+DURATION_PATTERN = re.compile(
+    r'(\d{1,3})(?:\s*[-–]\s*(\d{1,3}))?\s*'
+    r'(days?|weeks?|months?|วัน|สัปดาห์|อาทิตย์|เดือน)',
+    re.IGNORECASE
+)
+
+# Opening hours such as "10:00-20:00", "10.00 - 20.00 น."
+HOURS_PATTERN = re.compile(r'(\d{1,2})[:.](\d{2})\s*(?:น\.)?\s*[-–]\s*(\d{1,2})[:.](\d{2})')
+
+# Phone numbers such as "+66 2 272 0022", "+662-272-0022" or "02-272-0022"
+PHONE_PATTERN = re.compile(r'(?<![\d])(\+?\d[\d\s-]{7,14}\d)(?![\d])')
+
+DURATION_UNITS = {
+    'day': 'day', 'days': 'day', 'วัน': 'day',
+    'week': 'week', 'weeks': 'week', 'สัปดาห์': 'week', 'อาทิตย์': 'week',
+    'month': 'month', 'months': 'month', 'เดือน': 'month',
+}
+
+RECOVERY_CONTEXT = ('recovery', 'recover', 'heal', 'swelling', 'downtime', 'stitches',
+                    'พักฟื้น', 'ฟื้นตัว', 'ฟื้นฟู', 'ยุบบวม', 'หายบวม', 'ถอดไหม', 'ตัดไหม')
+HOURS_CONTEXT = ('hour', 'open', 'daily', 'time', 'เวลา', 'เปิด', 'ทุกวัน')
+CONTACT_CONTEXT = ('tel', 'phone', 'call', 'whatsapp', 'contact', 'โทร', 'ติดต่อ')
+
+# Keywords that mark a question as asking for a particular fact type. The
+# order matters: "recovery time kitna hota hai" is a recovery question even
+# though "kitna" could also be about money.
+#
+# Latin-script keywords match whole words or their plurals ("call" is not
+# in "called"); a trailing * matches any word starting with it ("heal*"
+# also finds "healing"). Keywords in other scripts match anywhere, since
+# Thai and Chinese don't separate words with spaces.
+INTENT_KEYWORDS = {
+    "recovery": (
+        'recovery', 'recover*', 'heal*', 'downtime', 'swelling',
+        'recuperación', 'récupération', 'genesung', 'erholung', 'recupero', 'recuperação',
+        'восстановлен', '恢复', '回復', '회복', 'iyileşme*',
+        'ฟื้นฟู', 'พักฟื้น', 'ฟื้นตัว', 'ยุบบวม',
+        'صحتیابی', 'صحت یابی', 'تعافی', 'التعافي', 'الشفاء', 'रिकवरी', 'ठीक होने',
+    ),
+    "hours": (
+        'opening hours', 'open hours', 'business hours', 'what time', 'when are you open',
+        'timing', 'timings', 'horario', 'horaires', 'öffnungszeiten', 'orari', 'horário',
+        'часы работы', '营业时间', '営業時間', '영업시간', 'çalışma saat*',
+        'เวลาทำการ', 'เปิดกี่โมง', 'ปิดกี่โมง', 'เวลาเปิด',
+        'اوقات', 'أوقات', 'ساعات العمل', 'समय', 'khulta', 'khulti', 'pert kee mong',
+    ),
+    "contact": (
+        'phone', 'contact', 'call', 'number', 'whatsapp', 'teléfono', 'téléphone', 'telefon',
+        'telefono', 'телефон', '电话', '電話', '전화', 'numara*',
+        'เบอร์', 'โทร', 'ติดต่อ', 'فون', 'رابطہ', 'نمبر', 'هاتف', 'اتصال', 'फ़ोन', 'फोन', 'संपर्क',
+    ),
+    "price": (
+        'price', 'cost', 'how much', 'fee', 'fees', 'charges', 'precio', 'cuesta', 'prix', 'coût',
+        'preis', 'kosten', 'prezzo', 'costo', 'preço', 'custa', 'цена', 'стоимость', 'сколько стоит',
+        '价格', '费用', '多少钱', '価格', '費用', 'いくら', '가격', '비용', 'fiyat*', 'ücret*',
+        'ราคา', 'ค่าใช้จ่าย', 'กี่บาท', 'เท่าไร', 'เท่าไหร่', 'thao rai', 'tao rai',
+        'قیمت', 'لاگت', 'خرچ', 'سعر', 'تكلفة', 'بكم', 'कीमत', 'लागत', 'खर्च',
+        'paisa', 'paise', 'qeemat', 'kimat', 'kharcha', 'kitni hoti', 'kitna lagta',
+    ),
+}
+
+# Procedure aliases used to decide whether a question is about the procedure
+# a fact belongs to.
+PROCEDURE_ALIASES = {
+    'rhinoplasty': ('rhinoplasty', 'rhino*', 'nose', 'nose job', 'จมูก', 'ไรโนพลาสตี้',
+                    'رائنو', 'ناک', 'الأنف', 'تجميل الأنف', 'राइनोप्लास्टी', 'नाक',
+                    'rinoplastia', 'rhinoplastie', 'nasenkorrektur', 'ринопластик',
+                    '隆鼻', '鼻整形', '코성형', 'burun estetiği'),
+}
+
+# Localized procedure names for the non-English fact templates (the scraped
+# page title is English). Russian takes the name in quotes, so it stays in
+# the nominative.
+PROCEDURE_NAMES = {
+    'rhinoplasty': {
+        "Spanish": "la rinoplastia", "French": "la rhinoplastie", "German": "die Nasenkorrektur",
+        "Italian": "la rinoplastica", "Portuguese": "a rinoplastia", "Russian": "ринопластика",
+        "Chinese": "隆鼻手术", "Japanese": "鼻整形", "Korean": "코 성형", "Arabic": "عملية تجميل الأنف",
+        "Hindi": "राइनोप्लास्टी", "Urdu": "رائنوپلاسٹی", "Turkish": "burun estetiği", "Thai": "ศัลยกรรมจมูก",
+    },
+}
+
+# A consultation has its own fee; a price question about one must not be
+# answered with the procedure price.
+CONSULTATION_KEYWORDS = ('consultation', 'consult*', 'consulta', 'beratung', 'consulenza',
+                         'консультац', '咨询', '面诊', 'カウンセリング', '診察', '상담', 'muayene*',
+                         'ปรึกษา', 'استشارة', 'مشاورت', 'परामर्श')
+
+# Procedures the clinic page holds no facts for; a question naming one of
+# these must not be answered with the rhinoplasty price.
+OTHER_PROCEDURES = ('facelift', 'face lift', 'botox', 'filler', 'lipo*', 'eyelid', 'blepharoplasty',
+                    'breast', 'chin', 'jaw', 'tummy', 'abdominoplasty', 'laser', 'hair', 'dental',
+                    'teeth', 'morpheus*', 'sculptra', 'ทำตา', 'ตาสองชั้น', 'หนังตา', 'เปลือกตา',
+                    'ใต้ตา', 'คาง', 'หน้าอก', 'ฟิลเลอร์', 'โบท็อก',
+                    'ดูดไขมัน', 'ร้อยไหม', 'آنکھ', 'چہرہ', 'آنکھوں', 'आंख', 'चेहरा', 'बाल')
+
+# Fact questions are short; anything longer goes to the LLM.
+MAX_FACT_QUESTION_WORDS = 12
+
+UNIT_NAMES = {
+    "English": {"day": "days", "week": "weeks", "month": "months"},
+    "Spanish": {"day": "días", "week": "semanas", "month": "meses"},
+    "French": {"day": "jours", "week": "semaines", "month": "mois"},
+    "German": {"day": "Tage", "week": "Wochen", "month": "Monate"},
+    "Italian": {"day": "giorni", "week": "settimane", "month": "mesi"},
+    "Portuguese": {"day": "dias", "week": "semanas", "month": "meses"},
+    "Russian": {"day": "дней", "week": "недель", "month": "месяцев"},
+    "Chinese": {"day": "天", "week": "周", "month": "个月"},
+    "Japanese": {"day": "日", "week": "週間", "month": "か月"},
+    "Korean": {"day": "일", "week": "주", "month": "개월"},
+    "Arabic": {"day": "أيام", "week": "أسابيع", "month": "أشهر"},
+    "Hindi": {"day": "दिन", "week": "सप्ताह", "month": "महीने"},
+    "Urdu": {"day": "دن", "week": "ہفتے", "month": "مہینے"},
+    "Turkish": {"day": "gün", "week": "hafta", "month": "ay"},
+    "Thai": {"day": "วัน", "week": "สัปดาห์", "month": "เดือน"},
+}
+
+FACT_TEMPLATES = {
+    "English": {
+        "price": "💰 The listed price for {procedure} is {values}. The final cost depends on your consultation with the clinic.",
+        "recovery": "🩹 Typical recovery time for {procedure}: {values}. Your surgeon will give you a personal recovery plan.",
+        "hours": "🕒 Clinic hours: {values}.",
+        "contact": "📞 You can contact the clinic at {values}.",
+    },
+    "Spanish": {
+        "price": "💰 El precio indicado para {procedure} es {values}. El costo final depende de su consulta con la clínica.",
+        "recovery": "🩹 Tiempo de recuperación habitual para {procedure}: {values}. Su cirujano le dará un plan personalizado.",
+        "hours": "🕒 Horario de la clínica: {values}.",
+        "contact": "📞 Puede contactar a la clínica en {values}.",
+    },
+    "French": {
+        "price": "💰 Le prix indiqué pour {procedure} est de {values}. Le coût final dépend de votre consultation à la clinique.",
+        "recovery": "🩹 Durée de récupération habituelle pour {procedure} : {values}. Votre chirurgien vous donnera un plan personnalisé.",
+        "hours": "🕒 Horaires de la clinique : {values}.",
+        "contact": "📞 Vous pouvez contacter la clinique au {values}.",
+    },
+    "German": {
+        "price": "💰 Der angegebene Preis für {procedure} beträgt {values}. Die endgültigen Kosten hängen von Ihrer Beratung in der Klinik ab.",
+        "recovery": "🩹 Übliche Erholungszeit für {procedure}: {values}. Ihr Chirurg erstellt einen persönlichen Plan.",
+        "hours": "🕒 Öffnungszeiten der Klinik: {values}.",
+        "contact": "📞 Sie erreichen die Klinik unter {values}.",
+    },
+    "Italian": {
+        "price": "💰 Il prezzo indicato per {procedure} è {values}. Il costo finale dipende dalla consulenza in clinica.",
+        "recovery": "🩹 Tempo di recupero tipico per {procedure}: {values}. Il chirurgo le darà un piano personalizzato.",
+        "hours": "🕒 Orari della clinica: {values}.",
+        "contact": "📞 Può contattare la clinica al {values}.",
+    },
+    "Portuguese": {
+        "price": "💰 O preço indicado para {procedure} é {values}. O custo final depende da sua consulta na clínica.",
+        "recovery": "🩹 Tempo de recuperação típico para {procedure}: {values}. O seu cirurgião dará um plano personalizado.",
+        "hours": "🕒 Horário da clínica: {values}.",
+        "contact": "📞 Pode contactar a clínica pelo {values}.",
+    },
+    "Russian": {
+        "price": "💰 Указанная цена на процедуру «{procedure}»: {values}. Окончательная стоимость зависит от консультации в клинике.",
+        "recovery": "🩹 Обычный срок восстановления после процедуры «{procedure}»: {values}. Хирург составит для вас индивидуальный план.",
+        "hours": "🕒 Часы работы клиники: {values}.",
+        "contact": "📞 Связаться с клиникой можно по номеру {values}.",
+    },
+    "Chinese": {
+        "price": "💰 {procedure}的标价为 {values}。最终费用取决于您在诊所的咨询。",
+        "recovery": "🩹 {procedure}的一般恢复时间：{values}。医生会为您制定个人恢复计划。",
+        "hours": "🕒 诊所营业时间：{values}。",
+        "contact": "📞 您可以拨打 {values} 联系诊所。",
+    },
+    "Japanese": {
+        "price": "💰 {procedure}の表示価格は {values} です。最終的な費用はクリニックでのカウンセリングによって異なります。",
+        "recovery": "🩹 {procedure}の一般的な回復期間：{values}。担当医が個別の回復計画をご案内します。",
+        "hours": "🕒 クリニックの営業時間：{values}。",
+        "contact": "📞 クリニックへのお問い合わせは {values} までどうぞ。",
+    },
+    "Korean": {
+        "price": "💰 {procedure}의 안내 가격은 {values}입니다. 최종 비용은 클리닉 상담에 따라 달라집니다.",
+        "recovery": "🩹 {procedure}의 일반적인 회복 기간: {values}. 담당 의사가 개인별 회복 계획을 안내해 드립니다.",
+        "hours": "🕒 클리닉 영업시간: {values}.",
+        "contact": "📞 클리닉 연락처: {values}.",
+    },
+    "Arabic": {
+        "price": "💰 السعر المعلن لـ {procedure} هو {values}. تعتمد التكلفة النهائية على استشارتكم في العيادة.",
+        "recovery": "🩹 مدة التعافي المعتادة لـ {procedure}: {values}. سيقدم لكم الجراح خطة تعافٍ شخصية.",
+        "hours": "🕒 ساعات عمل العيادة: {values}.",
+        "contact": "📞 يمكنكم التواصل مع العيادة على {values}.",
+    },
+    "Hindi": {
+        "price": "💰 {procedure} की सूचीबद्ध कीमत {values} है। अंतिम लागत क्लिनिक में परामर्श पर निर्भर करती है।",
+        "recovery": "🩹 {procedure} के बाद सामान्य रिकवरी समय: {values}। आपके सर्जन आपको व्यक्तिगत योजना देंगे।",
+        "hours": "🕒 क्लिनिक का समय: {values}।",
+        "contact": "📞 आप क्लिनिक से {values} पर संपर्क कर सकते हैं।",
+    },
+    "Urdu": {
+        "price": "💰 {procedure} کی درج شدہ قیمت {values} ہے۔ حتمی لاگت کلینک میں مشاورت پر منحصر ہے۔",
+        "recovery": "🩹 {procedure} کے بعد صحتیابی کا عام وقت: {values}۔ آپ کے سرجن آپ کو ذاتی منصوبہ دیں گے۔",
+        "hours": "🕒 کلینک کے اوقات: {values}۔",
+        "contact": "📞 آپ کلینک سے {values} پر رابطہ کر سکتے ہیں۔",
+    },
+    "Turkish": {
+        "price": "💰 {procedure} için belirtilen fiyat {values}. Nihai ücret klinikteki muayenenize bağlıdır.",
+        "recovery": "🩹 {procedure} için olağan iyileşme süresi: {values}. Cerrahınız size kişisel bir plan verecektir.",
+        "hours": "🕒 Klinik çalışma saatleri: {values}.",
+        "contact": "📞 Kliniğe {values} numarasından ulaşabilirsiniz.",
+    },
+    "Thai": {
+        "price": "💰 ราคาของ {procedure} คือ {values} ค่าใช้จ่ายสุดท้ายขึ้นอยู่กับการปรึกษากับทางคลินิก",
+        "recovery": "🩹 ระยะเวลาพักฟื้นโดยทั่วไปของ {procedure}: {values} แพทย์จะวางแผนการพักฟื้นเฉพาะบุคคลให้คุณ",
+        "hours": "🕒 เวลาทำการของคลินิก: {values}",
+        "contact": "📞 ติดต่อคลินิกได้ที่ {values}",
+    },
+}
+
+
+def normalize_phone(phone):
+    """Reduce a phone number to '+' and digits so duplicates collapse"""
+    digits = re.sub(r'\D', '', phone)
+    return ('+' + digits) if phone.strip().startswith('+') else digits
+
+
+def _fact_context(text, limit=200):
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def extract_facts_from_text(text, procedure):
+    """Extract price, recovery, hours and contact facts from one block of text"""
+    facts = []
+    text_lower = text.lower()
+
+    for match in PRICE_PATTERN.finditer(text):
+        amount = int((match.group(1) or match.group(2)).replace(',', ''))
+        facts.append({
+            'type': 'price',
+            'procedure': procedure,
+            'amount': amount,
+            'currency': 'THB',
+            'value': match.group(0).strip(),
+            'context': _fact_context(text)
+        })
+
+    if any(word in text_lower for word in RECOVERY_CONTEXT):
+        for match in DURATION_PATTERN.finditer(text):
+            low = int(match.group(1))
+            high = int(match.group(2)) if match.group(2) else low
+            facts.append({
+                'type': 'recovery',
+                'procedure': procedure,
+                'min': low,
+                'max': high,
+                'unit': DURATION_UNITS[match.group(3).lower()],
+                'value': match.group(0).strip(),
+                'context': _fact_context(text)
+            })
+
+    if any(word in text_lower for word in HOURS_CONTEXT):
+        for match in HOURS_PATTERN.finditer(text):
+            opens = f"{int(match.group(1)):02d}:{match.group(2)}"
+            closes = f"{int(match.group(3)):02d}:{match.group(4)}"
+            facts.append({
+                'type': 'hours',
+                'procedure': procedure,
+                'opens': opens,
+                'closes': closes,
+                'value': f"{opens}–{closes}",
+                'context': _fact_context(text)
+            })
+
+    if any(word in text_lower for word in CONTACT_CONTEXT):
+        for match in PHONE_PATTERN.finditer(text):
+            phone = match.group(1).strip()
+            if len(re.sub(r'\D', '', phone)) < 9:
+                continue
+            facts.append({
+                'type': 'contact',
+                'procedure': procedure,
+                'value': phone,
+                'normalized': normalize_phone(phone),
+                'context': _fact_context(text)
+            })
+
+    return facts
+
+
+def extract_facts(soup, source_url=""):
+    """Walk a parsed page in document order and collect structured facts.
+
+    Each fact is attributed to the closest preceding heading, falling back to
+    the page title (first h1) for text that appears before any heading.
+    """
+    title_tag = soup.find('h1')
+    page_procedure = title_tag.get_text(" ", strip=True) if title_tag else ""
+    procedure = page_procedure
+
+    facts = []
+    seen = set()
+    for tag in soup.find_all(HEADING_TAGS + ['p', 'li', 'td']):
+        text = tag.get_text(" ", strip=True)
+        if not text:
+            continue
+        if tag.name in ('h1', 'h2', 'h3') and text not in SCRAPER_SECTIONS:
+            procedure = text
+        for fact in extract_facts_from_text(text, procedure):
+            key = (fact['type'], fact.get('amount') or fact.get('normalized') or fact['value'])
+            if key in seen:
+                continue
+            seen.add(key)
+            facts.append(fact)
+
+    return {
+        'source_url': source_url,
+        'procedure': page_procedure,
+        'facts': facts
+    }
+
+
+def save_facts(facts_data, output_file=FACTS_FILE):
+    """Save extracted facts to a JSON file"""
+    with open(output_file, 'w', encoding='utf-8') as file:
+        json.dump(facts_data, file, ensure_ascii=False, indent=2)
+
+
+@lru_cache(maxsize=None)
+def keywords_pattern(keywords):
+    """One regex for a tuple of keywords (see INTENT_KEYWORDS for the matching rules)"""
+    parts = []
+    for keyword in keywords:
+        stem = keyword.rstrip('*')
+        if all(ord(char) < 0x250 for char in stem):
+            tail = r'\w*' if keyword.endswith('*') else r'(?:e?s)?\b'
+            parts.append(r'\b' + re.escape(stem) + tail)
+        else:
+            parts.append(re.escape(stem))
+    return re.compile('|'.join(parts))
+
+
+def mentions(text, keywords):
+    """Whether the text contains any of the keywords"""
+    return keywords_pattern(tuple(keywords)).search(text.lower()) is not None
+
+
+class FactIndex:
+    """In-memory index of extracted facts keyed by fact type and procedure"""
+
+    def __init__(self, facts_data):
+        self.procedure = facts_data.get('procedure', '')
+        self.facts = facts_data.get('facts', [])
+        self.by_type = {fact_type: [] for fact_type in FACT_TYPES}
+        self.by_procedure = {}
+        for fact in self.facts:
+            self.by_type.setdefault(fact['type'], []).append(fact)
+            for alias in self._procedure_keys(fact.get('procedure', '')):
+                self.by_procedure.setdefault((fact['type'], alias), []).append(fact)
+
+    @classmethod
+    def load(cls, facts_file):
+        with open(facts_file, 'r', encoding='utf-8') as file:
+            return cls(json.load(file))
+
+    @staticmethod
+    def _procedure_keys(text):
+        return [key for key, aliases in PROCEDURE_ALIASES.items() if mentions(text, aliases)]
+
+    def lookup(self, fact_type, question):
+        """Return the facts of a type that belong to the procedure asked about.
+
+        Questions that don't name a known procedure get every fact of that
+        type, except prices: a consultation or a procedure we hold no facts
+        for costs something else. Questions naming a procedure we hold no
+        facts for get nothing.
+        """
+        if fact_type == "price" and mentions(question, CONSULTATION_KEYWORDS):
+            return []
+        keys = self._procedure_keys(question)
+        if not keys:
+            if fact_type == "price" or mentions(question, OTHER_PROCEDURES):
+                return []
+            return self.by_type.get(fact_type, [])
+        matches = []
+        for key in keys:
+            matches.extend(self.by_procedure.get((fact_type, key), []))
+        return matches
+
+
+def detect_fact_intent(question):
+    """Return the fact type a short question asks for, or None"""
+    question_lower = question.lower()
+    if len(question_lower.split()) > MAX_FACT_QUESTION_WORDS:
+        return None
+    for fact_type in ("recovery", "hours", "contact", "price"):
+        if mentions(question_lower, INTENT_KEYWORDS[fact_type]):
+            return fact_type
+    return None
+
+
+def format_fact_values(fact_type, facts, language):
+    """Render fact values for a template in the given language"""
+    values = []
+    if fact_type == "price":
+        for amount in sorted({fact['amount'] for fact in facts}):
+            values.append(f"฿{amount:,}")
+    elif fact_type == "recovery":
+        units = UNIT_NAMES.get(language, UNIT_NAMES["English"])
+        for fact in facts:
+            span = str(fact['min']) if fact['min'] == fact['max'] else f"{fact['min']}–{fact['max']}"
+            value = f"{span} {units[fact['unit']]}"
+            if value not in values:
+                values.append(value)
+    else:
+        for fact in facts:
+            if fact['value'] not in values:
+                values.append(fact['value'])
+    return ", ".join(values)
+
+
+def procedure_name(title, language):
+    """The procedure title in the given language, or None if it has no translation"""
+    if language == "English":
+        return title
+    for key in FactIndex._procedure_keys(title):
+        name = PROCEDURE_NAMES.get(key, {}).get(language)
+        if name:
+            return name
+    return None
+
+
+def answer_from_facts(question, language, fact_index):
+    """Answer a fact question from a template, or return None to use the LLM"""
+    fact_type = detect_fact_intent(question)
+    if not fact_type:
+        return None
+
+    templates = FACT_TEMPLATES.get(language)
+    if not templates:
+        return None
+
+    facts = fact_index.lookup(fact_type, question)
+    if not facts:
+        return None
+
+    procedure = procedure_name(facts[0].get('procedure') or fact_index.procedure, language)
+    if not procedure:
+        return None
+    return templates[fact_type].format(
+        procedure=procedure,
+        values=format_fact_values(fact_type, facts, language)
+    )
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import time
+
+from retrieval import BM25Index, MAX_CHUNK_TOKENS, chunk_markdown, clean_chunk_text, format_context
+from languages import LANGUAGES
+from centers_lookup import CENTERS_DATA_FILE, CentersDirectory, is_directory_question, format_directory_context
+
+# Clinic knowledge shared by the Streamlit app and the offline tools: the
+# Meko page as prebuilt chunks, its BM25 index and the Bumrungrad directory.
+#
+# The scraper (or `python chatbot/knowledge.py`) turns the HTML page into a
+# precleaned JSON artifact once; serving processes load that with a single
+# file read and never import BeautifulSoup or html2text.
+
+CLINIC_HTML_FILE = os.path.join(os.path.dirname(__file__), "meko_clinic_rhinoplasty.html")
+KNOWLEDGE_ARTIFACT_FILE = os.path.join(os.path.dirname(__file__), "meko_clinic_knowledge.json")
+
+# Bump when the artifact layout or the chunking changes
+ARTIFACT_FORMAT_VERSION = 1
+
+# Pre-translated copies of the artifact's chunks, one file per language,
+# written by translate_knowledge.py
+TRANSLATIONS_DIR = os.path.join(os.path.dirname(__file__), "knowledge_translations")
+TRANSLATION_FORMAT_VERSION = 1
+
+
+def html_to_markdown(html_content):
+    """Strip scripts/styles and convert the page to markdown, keeping headings"""
+    # Only needed when (re)building the artifact
+    from bs4 import BeautifulSoup
+    import html2text
+
+    # Parse HTML with BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    # Convert to text
+    h = html2text.HTML2Text()
+    h.ignore_links = True
+    h.ignore_images = True
+    return h.handle(str(soup))
+
+
+def build_knowledge_artifact(html_file=CLINIC_HTML_FILE, source_url="", max_tokens=MAX_CHUNK_TOKENS):
+    """Convert the scraped page into the artifact dict: cleaned text, chunks and metadata"""
+    with open(html_file, "rb") as file:
+        raw_html = file.read()
+    markdown = html_to_markdown(raw_html.decode("utf-8"))
+    text = clean_chunk_text(markdown)
+    chunks = chunk_markdown(markdown, max_tokens=max_tokens)
+    content_hash = hashlib.sha256(
+        json.dumps([text, chunks], ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "content_hash": content_hash,
+        "source_file": os.path.basename(html_file),
+        "source_url": source_url,
+        "source_sha256": hashlib.sha256(raw_html).hexdigest(),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "max_chunk_tokens": max_tokens,
+        "text": text,
+        "chunks": chunks,
+    }
+
+
+def save_knowledge_artifact(artifact, output_file=KNOWLEDGE_ARTIFACT_FILE):
+    # Write to a temporary file first so running workers never read half an artifact
+    temp_file = output_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump(artifact, file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp_file, output_file)
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, or None if it doesn't exist"""
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def load_knowledge_artifact(artifact_file=KNOWLEDGE_ARTIFACT_FILE, html_file=CLINIC_HTML_FILE):
+    """Load the prebuilt artifact, rebuilding it from the HTML if it is missing or outdated
+
+    Outdated means an older format, or built from a different HTML page
+    than the one on disk (deployments shipping only the artifact keep it).
+    """
+    try:
+        with open(artifact_file, "r", encoding="utf-8") as file:
+            artifact = json.load(file)
+        source_sha256 = file_sha256(html_file)
+        if (artifact.get("format_version") == ARTIFACT_FORMAT_VERSION
+                and source_sha256 in (None, artifact.get("source_sha256"))):
+            return artifact
+    except (FileNotFoundError, ValueError):
+        pass
+    artifact = build_knowledge_artifact(html_file)
+    save_knowledge_artifact(artifact, artifact_file)
+    return artifact
+
+
+def translated_artifact_file(language, translations_dir=TRANSLATIONS_DIR):
+    return os.path.join(translations_dir, f"meko_clinic_knowledge.{LANGUAGES[language]['code']}.json")
+
+
+def load_translated_artifact(language, source_artifact, translations_dir=TRANSLATIONS_DIR):
+    """The language's translated artifact, or None if missing or built from other content"""
+    try:
+        with open(translated_artifact_file(language, translations_dir), "r", encoding="utf-8") as file:
+            artifact = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+    if (artifact.get("format_version") != TRANSLATION_FORMAT_VERSION
+            or artifact.get("source_content_hash") != source_artifact["content_hash"]):
+        return None
+    return artifact
+
+
+def content_version(paths=(CLINIC_HTML_FILE, KNOWLEDGE_ARTIFACT_FILE, CENTERS_DATA_FILE)):
+    """Short hash of the knowledge source files and the artifact built from them; changes whenever they do"""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, "rb") as file:
+                digest.update(file.read())
+        except FileNotFoundError:
+            digest.update(b"missing:" + os.path.basename(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_centers_directory():
+    try:
+        return CentersDirectory.load()
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class KnowledgeBase:
+    """Retrieval over the clinic page chunks plus the hospital directory"""
+
+    def __init__(self, chunks, directory=None):
+        self.index = BM25Index(chunks)
+        self.directory = directory
+
+    def retrieve(self, question, top_k=6, token_budget=1500):
+        """Build the prompt context for a question.
+
+        Returns a dict with the context string, the BM25 hits, the
+        directory lines (empty when the question isn't about the hospital)
+        and whether they depend on the current time.
+        """
+        hits = self.index.search(question, top_k=top_k, token_budget=token_budget)
+        if not hits:
+            # Nothing matched (e.g. a Roman-script question against Thai content);
+            # give the model the page overview rather than nothing at all
+            hits = self.index.leading_chunks(token_budget=token_budget)
+        context = format_context(hits)
+
+        # Pre-retrieval over the Bumrungrad directory: only matching records
+        directory_context = ""
+        time_sensitive = False
+        if self.directory and is_directory_question(question, self.directory):
+            results = self.directory.search(question)
+            directory_context = format_directory_context(results)
+            context += "\n\nBumrungrad Hospital directory (centers and doctors matching the question):\n" + directory_context
+            # "Open now" answers are only true for the moment they were given
+            time_sensitive = self.directory.parse_query(question)['open_now']
+
+        return {"context": context, "hits": hits, "directory": directory_context, "time_sensitive": time_sensitive}
+
+
+if __name__ == "__main__":
+    artifact = build_knowledge_artifact()
+    save_knowledge_artifact(artifact)
+    print(f"✅ {len(artifact['chunks'])} chunks saved to '{os.path.basename(KNOWLEDGE_ARTIFACT_FILE)}' "
+          f"(content {artifact['content_hash'][:12]})")
@@ -0,0 +1,237 @@
+from functools import lru_cache
+import re
+
+from languages import LANG_DETECT_MAP
+
+# Compiled language detector for chat messages. One pass over the text builds
+# a histogram of Unicode blocks, one regex tokenizes it, and Roman-script
+# Thai/Urdu/Hindi/Arabic are scored with hashed keyword sets. langdetect is
+# only imported (and its profiles loaded) when nothing else decides, and its
+# results are seeded and cached so the same message always gets the same
+# answer.
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Script blocks counted in the histogram, as (first, last, script)
+SCRIPT_RANGES = (
+    (0x00C0, 0x024F, 'latin_ext'),
+    (0x0400, 0x04FF, 'cyrillic'),
+    (0x0600, 0x06FF, 'arabic'),
+    (0x0750, 0x077F, 'arabic'),
+    (0x08A0, 0x08FF, 'arabic'),
+    (0x0900, 0x097F, 'devanagari'),
+    (0x0E00, 0x0E7F, 'thai'),
+    (0x3040, 0x30FF, 'kana'),
+    (0x4E00, 0x9FFF, 'han'),
+    (0xAC00, 0xD7AF, 'hangul'),
+    (0xFB50, 0xFDFF, 'arabic'),
+    (0xFE70, 0xFEFF, 'arabic'),
+)
+
+NATIVE_SCRIPT_LANGUAGES = {
+    'thai': "Thai",
+    'devanagari': "Hindi",
+    'kana': "Japanese",
+    'han': "Chinese",
+    'hangul': "Korean",
+    'cyrillic': "Russian",
+}
+
+# Letters only Urdu (or only Arabic) uses within the shared Arabic script
+URDU_LETTERS = frozenset('ٹڈڑںےہھکگپچژی')
+ARABIC_LETTERS = frozenset('ةكيى')
+
+URDU_WORDS = (
+    'یہ', 'کیا', 'ہے', 'کے', 'میں', 'کو', 'سے', 'کہ', 'اور',
+    'یار', 'ہا', 'کا', 'کی', 'نہیں', 'ہوں', 'ہیں', 'تھا', 'تھی',
+    'کریں', 'کرتے', 'کرنا', 'ہوا', 'ہوئی', 'گیا', 'گئی', 'دیا',
+    'لیا', 'آپ', 'میرا', 'تیرا', 'اس', 'اب', 'پہلے', 'بعد',
+)
+ARABIC_WORDS = (
+    'هذا', 'هذه', 'ذلك', 'التي', 'الذي', 'في', 'من', 'إلى',
+    'على', 'عن', 'مع', 'كان', 'كانت', 'يكون', 'تكون', 'لكن',
+    'أو', 'أم', 'ما', 'لا', 'نعم', 'كيف', 'متى', 'أين', 'لماذا',
+)
+
+# Common words of Thai, Urdu, Hindi and Arabic written in Latin letters
+ROMAN_WORDS = {
+    "Thai": (
+        'chai', 'mai', 'krub', 'krab', 'ka', 'kha', 'khun', 'nai', 'thi', 'ni', 'nan', 'kap', 'gap',
+        'arai', 'yang', 'ngai', 'thao', 'rai', 'dai', 'pen', 'mak', 'noi', 'yak', 'sabai', 'sanuk',
+        'gin', 'khao', 'nam', 'phom', 'chan', 'rao', 'pai', 'ma', 'yu', 'nang', 'yen',
+        'rong', 'phaya', 'ban', 'baht', 'satang', 'saphan', 'thanon', 'mueang', 'krung', 'thep',
+        'mor', 'dang', 'jak', 'sawatdi', 'khob', 'aroi', 'suai', 'ngam', 'maak', 'chob', 'laew',
+    ),
+    "Urdu": (
+        'kya', 'hai', 'hain', 'ka', 'ki', 'ke', 'ko', 'se', 'me', 'main', 'mein', 'aur', 'ya', 'yaar', 'yar',
+        'ap', 'aap', 'tum', 'wo', 'woh', 'ye', 'yeh', 'is', 'us', 'iska', 'uska', 'mera', 'tera', 'humara',
+        'kaise', 'kahan', 'kab', 'kyun', 'kyunke', 'lekin', 'magar', 'phir', 'abhi', 'ab',
+        'kar', 'karna', 'karte', 'karta', 'karti', 'kiya', 'kiye', 'tha', 'thi', 'the',
+        'hona', 'hota', 'hoti', 'hote', 'hua', 'hui', 'huye', 'gaya', 'gayi', 'gaye',
+        'dena', 'deta', 'deti', 'dete', 'diya', 'diye', 'lena', 'leta', 'leti', 'lete', 'liya', 'liye',
+        'jana', 'jata', 'jati', 'jate', 'ghar', 'paisa', 'paise', 'kitna', 'kitne', 'kitni',
+        'accha', 'acha', 'bura', 'bhi', 'nahi', 'nahin', 'haan', 'han', 'ji', 'sahab', 'sahib',
+        'bhala', 'bhali', 'bhale', 'wala', 'wali', 'wale', 'pani', 'khana', 'kaam', 'kam',
+        'dost', 'doston', 'beta', 'beti', 'bhai', 'behan', 'ma', 'maa', 'papa', 'ammi', 'abbu',
+        'lagta', 'lagti', 'lagte', 'dawai',
+    ),
+    "Hindi": (
+        'kya', 'hai', 'hain', 'ka', 'ki', 'ke', 'ko', 'se', 'me', 'main', 'mein', 'aur', 'ya',
+        'ap', 'aap', 'tum', 'wo', 'woh', 'ye', 'yeh', 'is', 'us', 'iska', 'uska', 'mera', 'tera', 'hamara',
+        'kaise', 'kahan', 'kab', 'kyun', 'kyunki', 'lekin', 'phir', 'abhi', 'ab', 'tab',
+        'kar', 'karna', 'karte', 'karta', 'karti', 'kiya', 'kiye', 'tha', 'thi', 'the',
+        'hona', 'hota', 'hoti', 'hote', 'hua', 'hui', 'huye', 'gaya', 'gayi', 'gaye',
+        'dena', 'deta', 'deti', 'dete', 'diya', 'diye', 'lena', 'leta', 'leti', 'lete', 'liya', 'liye',
+        'jana', 'jata', 'jati', 'jate', 'ghar', 'paisa', 'paise', 'kitna', 'kitne', 'kitni',
+        'accha', 'acha', 'bura', 'bhi', 'nahi', 'nahin', 'haan', 'han', 'ji', 'sahab', 'sahib',
+        'bhala', 'bhali', 'bhale', 'wala', 'wali', 'wale', 'pani', 'khana', 'kaam', 'kam',
+        'dost', 'doston', 'beta', 'beti', 'bhai', 'behan', 'ma', 'maa', 'papa', 'mata', 'pita',
+    ),
+    "Arabic": (
+        'ma', 'maa', 'hal', 'haal', 'fee', 'fi', 'min', 'ila', 'ala', 'an', 'anna', 'la', 'laa',
+        'wa', 'waa', 'aw', 'am', 'kam', 'kayf', 'mata', 'ayna', 'limatha', 'limaza',
+        'hatha', 'haza', 'tilka', 'allati', 'allathi', 'kana', 'kanat', 'yakun', 'takun',
+        'lakin', 'naam', 'shukran', 'ahlan', 'marhaba', 'allah',
+    ),
+}
+
+# Ties between Roman-script languages go to the earlier one (Urdu before
+# Hindi: they share most of their vocabulary)
+ROMAN_PRIORITY = ("Thai", "Urdu", "Hindi", "Arabic")
+
+# English words that would otherwise count as Roman Urdu/Hindi/Arabic
+# ("is", "the", "me"...) plus the function words of ordinary English
+# questions; these count as English evidence instead.
+ENGLISH_WORDS = frozenset((
+    'a', 'about', 'after', 'all', 'am', 'an', 'and', 'any', 'are', 'at', 'be', 'before', 'can',
+    'could', 'do', 'does', 'during', 'for', 'from', 'get', 'have', 'how', 'i', 'if', 'in', 'is',
+    'it', 'me', 'much', 'my', 'of', 'on', 'or', 'should', 'the', 'there', 'this', 'to', 'us',
+    'want', 'was', 'we', 'what', 'when', 'where', 'which', 'who', 'why', 'will', 'with', 'would',
+    'you', 'your', 'main', 'ban', 'pen', 'may', 'long', 'take', 'expect', 'offer', 'need',
+))
+
+# Medical loanwords used in every language; they say nothing about which one
+NEUTRAL_WORDS = frozenset((
+    'rhinoplasty', 'rhino', 'plasty', 'surgery', 'nose', 'job', 'operation', 'clinic', 'doctor',
+    'hospital', 'treatment', 'medicine', 'recovery', 'consultation', 'cost', 'time', 'price',
+))
+
+# Roman-script keywords this short also occur in European languages ("la",
+# "ma", "me"); alone they are not enough to decide
+WEAK_WORD_LENGTH = 2
+
+
+@lru_cache(maxsize=1)
+def _profiles():
+    """Build the keyword hash tables on first use"""
+    roman = {}
+    for language, words in ROMAN_WORDS.items():
+        for word in words:
+            if word in ENGLISH_WORDS or word in NEUTRAL_WORDS:
+                continue
+            roman.setdefault(word, set()).add(language)
+    roman = {word: frozenset(languages) for word, languages in roman.items()}
+    return roman, frozenset(URDU_WORDS), frozenset(ARABIC_WORDS)
+
+
+def _script_histogram(text):
+    """Count characters per script block in a single pass"""
+    counts = {}
+    for char in text:
+        code = ord(char)
+        if code < 0x00C0:
+            continue
+        for first, last, script in SCRIPT_RANGES:
+            if code < first:
+                break
+            if code <= last:
+                counts[script] = counts.get(script, 0) + 1
+                break
+    return counts
+
+
+def _detect_arabic_script(text, tokens):
+    """Tell Urdu from Arabic by script-specific letters and common words"""
+    _, urdu_words, arabic_words = _profiles()
+    urdu_score = 0
+    arabic_score = 0
+    for token in tokens:
+        if token in urdu_words:
+            urdu_score += 2
+        if token in arabic_words:
+            arabic_score += 2
+    for char in text:
+        if char in URDU_LETTERS:
+            urdu_score += 1
+        elif char in ARABIC_LETTERS:
+            arabic_score += 1
+    return "Urdu" if urdu_score > arabic_score else "Arabic"
+
+
+def _detect_roman(tokens):
+    """Score Roman-script Thai/Urdu/Hindi/Arabic; return a language or None"""
+    roman_words, _, _ = _profiles()
+    scores = dict.fromkeys(ROMAN_PRIORITY, 0)
+    strong = dict.fromkeys(ROMAN_PRIORITY, 0)
+    english = 0
+    for token in set(tokens):
+        if token in ENGLISH_WORDS:
+            english += 1
+            continue
+        languages = roman_words.get(token)
+        if not languages:
+            continue
+        for language in languages:
+            scores[language] += 1
+            if len(token) > WEAK_WORD_LENGTH:
+                strong[language] += 1
+
+    best = max(ROMAN_PRIORITY, key=lambda language: (scores[language], -ROMAN_PRIORITY.index(language)))
+    if scores[best] == 0 or scores[best] <= english:
+        return None, english
+    if scores[best] < 2 and strong[best] == 0:
+        return None, english
+    return best, english
+
+
+@lru_cache(maxsize=4096)
+def _langdetect(text):
+    """Seeded, cached langdetect call; profiles load on the first call"""
+    from langdetect import DetectorFactory, detect
+    from langdetect.lang_detect_exception import LangDetectException
+
+    DetectorFactory.seed = 0
+    try:
+        return LANG_DETECT_MAP.get(detect(text))
+    except LangDetectException:
+        return None
+
+
+def detect_language(text):
+    """Return the LANGUAGES key for the language a message is written in"""
+    scripts = _script_histogram(text)
+    tokens = WORD_PATTERN.findall(text.lower())
+
+    # Native scripts decide on their own
+    if scripts.get('arabic'):
+        return _detect_arabic_script(text, tokens)
+    if scripts.get('kana'):
+        return "Japanese"
+    native = [(count, script) for script, count in scripts.items() if script in NATIVE_SCRIPT_LANGUAGES]
+    if native:
+        return NATIVE_SCRIPT_LANGUAGES[max(native)[1]]
+
+    # Latin letters: Roman Thai/Urdu/Hindi/Arabic unless accented letters
+    # point to a European language
+    english = 0
+    if not scripts.get('latin_ext'):
+        roman, english = _detect_roman(tokens)
+        if roman:
+            return roman
+
+    # Plain English questions and very short messages (greetings) don't need
+    # a statistical detector
+    if not scripts.get('latin_ext') and (english >= 2 or len(tokens) < 3):
+        return "English"
+
+    return _langdetect(" ".join(tokens)) or "English"
@@ -0,0 +1,39 @@
+# Enhanced language mapping with native names and ISO codes (Thai added)
+LANGUAGES = {
+    "English": {"code": "en", "name": "English", "native": "English"},
+    "Spanish": {"code": "es", "name": "Español", "native": "Español"},
+    "French": {"code": "fr", "name": "Français", "native": "Français"},
+    "German": {"code": "de", "name": "Deutsch", "native": "Deutsch"},
+    "Italian": {"code": "it", "name": "Italiano", "native": "Italiano"},
+    "Portuguese": {"code": "pt", "name": "Português", "native": "Português"},
+    "Russian": {"code": "ru", "name": "Русский", "native": "Русский"},
+    "Chinese": {"code": "zh", "name": "中文", "native": "中文"},
+    "Japanese": {"code": "ja", "name": "日本語", "native": "日本語"},
+    "Korean": {"code": "ko", "name": "한국어", "native": "한국어"},
+    "Arabic": {"code": "ar", "name": "العربية", "native": "العربية"},
+    "Hindi": {"code": "hi", "name": "हिंदी", "native": "हिंदी"},
+    "Urdu": {"code": "ur", "name": "اردو", "native": "اردو"},
+    "Turkish": {"code": "tr", "name": "Türkçe", "native": "Türkçe"},
+    "Thai": {"code": "th", "name": "ไทย", "native": "ไทย"}
+}
+
+# Enhanced language detection mapping (Thai added)
+LANG_DETECT_MAP = {
+    "en": "English",
+    "es": "Spanish", 
+    "fr": "French",
+    "de": "German",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "ru": "Russian",
+    "zh": "Chinese",
+    "zh-cn": "Chinese",
+    "zh-tw": "Chinese",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "ar": "Arabic",
+    "hi": "Hindi",
+    "ur": "Urdu",
+    "tr": "Turkish",
+    "th": "Thai"
+}
@@ -0,0 +1,144 @@
+import os
+import tomllib
+
+from openai import OpenAI
+from languages import LANGUAGES
+
+# LLM access shared by the chat service and the offline tools (knowledge
+# translation): prompts, request parameters, client setup and secrets.
+
+AIML_BASE_URL = "https://api.aimlapi.com/v1"
+MODEL = "x-ai/grok-3-mini-beta"
+TEMPERATURE = 0.7
+MAX_TOKENS = 1000
+
+# Where tools running outside Streamlit find the app's secrets
+SECRETS_FILES = [
+    os.path.join(os.path.dirname(__file__), ".streamlit", "secrets.toml"),
+    os.path.join(os.getcwd(), ".streamlit", "secrets.toml"),
+    os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"),
+]
+
+
+def load_secrets():
+    """Read the Streamlit secrets file the app uses, if there is one"""
+    for path in SECRETS_FILES:
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                return tomllib.load(file)
+    return {}
+
+
+def create_client(api_key, base_url=AIML_BASE_URL):
+    """Create the OpenAI-compatible client for the AIML API"""
+    return OpenAI(
+        base_url=base_url,
+        api_key=api_key
+    )
+
+
+# Instructions that never change. They lead the prompt, followed by the
+# retrieved clinic information, so that every request shares the same prefix
+# and the provider can serve it from its prompt cache.
+PROMPT_PREFIX = """You are a helpful medical assistant for Meko Clinic specializing in rhinoplasty procedures.
+
+LANGUAGE RULES:
+- Respond ONLY in the language named in the LANGUAGE REQUIREMENT at the end of this prompt, even if the user wrote it in English/Latin letters
+- Use the native script/writing system of that language
+- DO NOT use English or any other language in your response unless English is the required language
+- DO NOT translate or explain in English
+- If user wrote in Roman script (like "kya hai" or "chai mai"), respond in native script
+
+SCRIPT REQUIREMENTS:
+- Thai: Write ONLY in Thai script (เขียนเป็นภาษาไทยเท่านั้น)
+- Urdu: Write ONLY in Urdu script (اردو میں لکھیں)
+- Arabic: Write ONLY in Arabic script (اكتب بالعربية فقط)
+- Hindi: Write ONLY in Hindi script (हिंदी में लिखें)
+- Chinese: Write ONLY in Chinese characters (用中文写)
+- Japanese: Write ONLY in Japanese script (日本語で書く)
+- Korean: Write ONLY in Korean script (한국어로 쓰기)
+- Russian: Write ONLY in Cyrillic script (пишите на русском)
+- Any other language: Use its native script exclusively
+
+IMPORTANT EXAMPLES:
+- User input: "rhinoplasty arai krub" → Detected: Thai → Response: "ไรโนพลาสตี้เป็นการผ่าตัดเสริมจมูก..."
+- User input: "rhinoplasty kya hai" → Detected: Urdu → Response: "رائنوپلاسٹی ایک جراحی کا طریقہ ہے..."
+- User input: "nose job kitna paisa lagta hai" → Detected: Urdu → Response: "ناک کی جراحی کی لاگت..."
+- User input: "surgery thao rai krub" → Detected: Thai → Response: "การผ่าตัดมีราคา..."
+
+Guidelines:
+- Be professional and informative
+- Focus on rhinoplasty services offered by Meko Clinic
+- If asked about something not in the clinic information, politely redirect to available services
+- Provide helpful and accurate information about rhinoplasty procedures
+- Always recommend consulting with the clinic directly for personalized advice
+- Maintain cultural sensitivity and appropriate medical terminology for the user's language
+- Use respectful forms of address appropriate for the user's culture
+
+Use the following clinic information to answer questions:
+"""
+
+LANGUAGE_SUFFIX_TEMPLATE = """
+
+LANGUAGE REQUIREMENT:
+- The user has written in {language} language (even if they used English/Latin letters)
+- You MUST respond ONLY in {language} language
+- Your entire response must be in {language} language using {native} script"""
+
+# Rendered once at import for every supported language
+LANGUAGE_SUFFIXES = {
+    language: LANGUAGE_SUFFIX_TEMPLATE.format(language=language, native=info["native"])
+    for language, info in LANGUAGES.items()
+}
+
+
+def build_system_prompt(detected_language, clinic_content):
+    """Stable instructions, then the clinic information, then the language suffix"""
+    suffix = LANGUAGE_SUFFIXES.get(detected_language, LANGUAGE_SUFFIXES["English"])
+    return PROMPT_PREFIX + clinic_content + suffix
+
+
+def usage_dict(usage):
+    """Prompt, cached-prompt and completion token counts from a response's usage"""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+        "completion_tokens": usage.completion_tokens or 0,
+    }
+
+
+def build_messages(user_message, detected_language, clinic_content, history=None):
+    """System prompt, then earlier turns (see conversation.py), then the new message"""
+    return [
+        {"role": "system", "content": build_system_prompt(detected_language, clinic_content)},
+        *(history or []),
+        {"role": "user", "content": user_message}
+    ]
+
+
+def request_params(user_message, detected_language, clinic_content, history=None, model=MODEL,
+                   max_tokens=MAX_TOKENS):
+    """Chat completion arguments for a question (also the single-flight key in llm_pool.py)"""
+    return {
+        "model": model,
+        "messages": build_messages(user_message, detected_language, clinic_content, history),
+        "temperature": TEMPERATURE,
+        "max_tokens": max_tokens
+    }
+
+
+def error_response(detected_language, error):
+    """Return error message in detected language"""
+    if detected_language == "Thai":
+        return f"❌ เกิดข้อผิดพลาดในการสร้างการตอบกลับ: {str(error)}"
+    elif detected_language == "Urdu":
+        return f"❌ جواب بنانے میں خرابی: {str(error)}"
+    elif detected_language == "Arabic":
+        return f"❌ خطأ في إنشاء الاستجابة: {str(error)}"
+    elif detected_language == "Hindi":
+        return f"❌ प्रतिक्रिया उत्पन्न करने में त्रुटि: {str(error)}"
+    else:
+        return f"❌ Error generating response: {str(error)}"
@@ -0,0 +1,223 @@
+import asyncio
+import email.utils
+import hashlib
+import json
+import random
+import threading
+import time
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+from llm import AIML_BASE_URL, usage_dict
+
+# Process-wide async LLM client. One event loop (a background thread's, or
+# the chat server's own) owns a single AsyncOpenAI client with a bounded
+# connection pool; blocking callers submit requests to it and wait only on
+# their own result. Retries on 429/5xx honour Retry-After, and identical
+# requests already in flight (same prompt hash) share one upstream call.
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_TIMEOUT_SECONDS = 60
+DEFAULT_MAX_RETRIES = 3
+
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 20
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def request_key(params):
+    """Hash of everything that determines the answer; equal keys share a flight"""
+    raw = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def retry_after_seconds(error):
+    """Delay asked for by the server's Retry-After header, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    # An HTTP date; a malformed one falls back to the pool's own backoff
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def is_retryable(error):
+    # A timed-out request already used its whole latency allowance; the model
+    # router falls back to a faster model instead of repeating it
+    if isinstance(error, APITimeoutError):
+        return False
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code in RETRY_STATUS_CODES
+
+
+class _Flight:
+    """One upstream request and everyone waiting on it.
+
+    Stream pieces are kept so callers that join late replay what they missed.
+    """
+
+    def __init__(self):
+        self.pieces = []
+        self.usage = None
+        self.error = None
+        self.done = False
+        self.changed = asyncio.Condition()
+
+    async def publish(self, piece=None, error=None, done=False):
+        async with self.changed:
+            if piece is not None:
+                self.pieces.append(piece)
+            if error is not None:
+                self.error = error
+            self.done = self.done or done
+            self.changed.notify_all()
+
+    async def follow(self):
+        """Yield every piece of the flight from the start until it ends"""
+        position = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: len(self.pieces) > position or self.done)
+                pieces = self.pieces[position:]
+                done, error = self.done, self.error
+            for piece in pieces:
+                yield piece
+            position += len(pieces)
+            if done and position == len(self.pieces):
+                if error is not None:
+                    raise error
+                return
+
+
+class LLMPool:
+    """Pooled, retrying, single-flight async client; run() lets blocking callers use it"""
+
+    def __init__(self, api_key, base_url=AIML_BASE_URL, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 timeout=DEFAULT_TIMEOUT_SECONDS, max_retries=DEFAULT_MAX_RETRIES, loop=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.flights = {}
+        self.stats = {"requests": 0, "upstream_calls": 0, "coalesced": 0, "retries": 0}
+
+        # An asyncio server passes its own running loop and uses the async
+        # methods; otherwise the pool runs a loop in a background thread
+        self.loop = loop or asyncio.new_event_loop()
+        self.thread = None
+        if loop is None:
+            self.thread = threading.Thread(target=self.loop.run_forever, name="llm-pool", daemon=True)
+            self.thread.start()
+
+        self.client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            # Retries are ours (they honour Retry-After and single-flight)
+            max_retries=0,
+            timeout=timeout,
+            http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ))
+        )
+
+    def run(self, coroutine):
+        """Run a coroutine on the pool's loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _with_retries(self, call):
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except Exception as error:
+                if attempt >= self.max_retries or not is_retryable(error):
+                    raise
+                delay = retry_after_seconds(error)
+                if delay is None:
+                    delay = RETRY_BASE_DELAY * 2 ** attempt * (0.5 + random.random())
+                attempt += 1
+                self.stats["retries"] += 1
+                await asyncio.sleep(min(delay, RETRY_MAX_DELAY))
+
+    async def _run_flight(self, key, flight, params, timeout):
+        try:
+            if params.get("stream"):
+                async def open_stream():
+                    return await self.client.chat.completions.create(
+                        **params, stream_options={"include_usage": True}, timeout=timeout
+                    )
+                # Only opening the stream is retried; once text has been
+                # shown a failure is reported instead of starting over
+                stream = await self._with_retries(open_stream)
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        flight.usage = usage_dict(chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        await flight.publish(chunk.choices[0].delta.content)
+            else:
+                async def request():
+                    return await self.client.chat.completions.create(**params, timeout=timeout)
+                response = await self._with_retries(request)
+                flight.usage = usage_dict(response.usage)
+                await flight.publish(response.choices[0].message.content or "")
+            await flight.publish(done=True)
+        except Exception as error:
+            await flight.publish(error=error, done=True)
+        finally:
+            self.flights.pop(key, None)
+
+    def _join(self, params, timeout):
+        """Start a flight for params, or join the identical one in flight.
+
+        Runs on the loop thread. Returns the flight and whether this caller
+        started it (only the leader is charged the token usage).
+        """
+        self.stats["requests"] += 1
+        key = request_key(params)
+        flight = self.flights.get(key)
+        if flight is not None:
+            self.stats["coalesced"] += 1
+            return flight, False
+        flight = _Flight()
+        self.flights[key] = flight
+        self.stats["upstream_calls"] += 1
+        self.loop.create_task(self._run_flight(key, flight, params, timeout or self.timeout))
+        return flight, True
+
+    async def _collect(self, params, timeout):
+        flight, leader = self._join(params, timeout)
+        pieces = [piece async for piece in flight.follow()]
+        return "".join(pieces), flight.usage if leader else None
+
+    async def acomplete(self, params, timeout=None, on_usage=None):
+        """Chat completion on the pool's loop; raises on API errors after retries"""
+        text, usage = await self._collect({**params, "stream": False}, timeout)
+        if on_usage and usage:
+            on_usage(usage)
+        return text
+
+    async def astream(self, params, timeout=None, on_usage=None):
+        """Answer pieces as they arrive, on the pool's loop"""
+        flight, leader = self._join({**params, "stream": True}, timeout)
+        async for piece in flight.follow():
+            yield piece
+        if on_usage and leader and flight.usage:
+            on_usage(flight.usage)
@@ -0,0 +1,81 @@
+import argparse
+import time
+
+from chat_service import ChatService, load_settings
+from facts import answer_from_facts
+from sample_questions import SAMPLE_QUESTIONS
+
+# Fill the shared response cache with answers to every sample question so
+# the buttons in the chatbot answer instantly and without spending tokens.
+#
+#   python chatbot/prewarm.py            # answer questions not cached yet
+#   python chatbot/prewarm.py --force    # re-ask everything
+#
+# Questions are asked through ChatService with the app's settings, so the
+# cached answers come from the same cache file, API endpoint, model route
+# and (translated) knowledge as a live chat turn would.
+
+
+async def ask(service, question, language):
+    """Answer one question as a fresh session; returns the turn's done event"""
+    done = None
+    async for event in service.chat(question, language=language, stream=False):
+        if event["event"] == "done":
+            done = event
+    # Prewarming shouldn't leave conversations behind
+    await service.clear_session(done["session_id"])
+    return done
+
+
+def prewarm(force=False):
+    try:
+        service = ChatService(load_settings())
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return False
+
+    answered = skipped = failed = 0
+    usage_totals = {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    for sample in SAMPLE_QUESTIONS:
+        language = sample["language"]
+        for question in sample["questions"]:
+            # The app answers these from the facts index without the LLM
+            if answer_from_facts(question, language, service.fact_index):
+                skipped += 1
+                continue
+            if service.response_cache.get(question, language):
+                if not force:
+                    skipped += 1
+                    continue
+                service.response_cache.delete(question, language)
+            start = time.time()
+            try:
+                done = service.run(ask(service, question, language))
+            except Exception as e:
+                done = {"failed": True, "answer": str(e), "usage": None}
+            for key, value in (done["usage"] or {}).items():
+                if key in usage_totals:
+                    usage_totals[key] += value
+            if done["failed"]:
+                failed += 1
+                print(f"❌ [{language}] {question}: {done['answer']}")
+            elif not service.response_cache.get(question, language):
+                # e.g. "open now" questions, which go stale
+                skipped += 1
+                print(f"⏭️ [{language}] {question}: answer not cacheable")
+            else:
+                answered += 1
+                print(f"✅ [{language}] {question} ({time.time() - start:.1f}s)")
+
+    print(f"\n🔥 Prewarm done: {answered} answered, {skipped} already cached, answered from facts "
+          f"or not cacheable, {failed} failed")
+    print(f"🧾 Tokens: {usage_totals['prompt_tokens']} prompt ({usage_totals['cached_tokens']} cached), "
+          f"{usage_totals['completion_tokens']} completion")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prewarm the chatbot response cache with the sample questions")
+    parser.add_argument("--force", action="store_true", help="re-ask questions that are already cached")
+    args = parser.parse_args()
+    prewarm(force=args.force)
@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+# Disk-backed LLM response cache shared by every Streamlit session and worker
+# process, and kept across restarts. Entries are keyed by the normalized
+# question, the detected language and the knowledge content version, expire
+# after a TTL and are evicted least-recently-used beyond a size limit.
+
+RESPONSE_CACHE_FILE = os.path.join(os.path.dirname(__file__), ".cache", "responses.sqlite3")
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def normalize_question(question):
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    question = re.sub(r'\s+', ' ', question.strip().lower())
+    return question.rstrip('?!.。？！؟।')
+
+
+def cache_key(question, language, version):
+    raw = f"{normalize_question(question)}\x1f{language}\x1f{version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LRU + TTL cache of final chatbot answers"""
+
+    def __init__(self, db_path=RESPONSE_CACHE_FILE, version="", ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.version = version
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    question TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            # Answers built from older clinic content are stale
+            conn.execute("DELETE FROM responses WHERE version != ?", (version,))
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps this safe across Streamlit's
+        # script threads and multiple server processes; WAL lets readers and
+        # the single writer proceed concurrently.
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, question, language):
+        """Return the cached answer, or None on a miss or expired entry"""
+        key = cache_key(question, language, self.version)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return response
+
+    def put(self, question, language, response):
+        """Store an answer and evict the least recently used entries"""
+        key = cache_key(question, language, self.version)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_question(question), language, self.version, response, now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def delete(self, question, language):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE key = ?", (cache_key(question, language, self.version),))
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
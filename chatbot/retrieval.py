@@ -0,0 +1,226 @@
+import math
+import re
+
+import numpy as np
+
+from tokens import estimate_tokens
+
+# Heading-aware chunking of the clinic knowledge base plus an in-memory BM25
+# index, so that only the chunks relevant to a question go into the prompt.
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*)$')
+MAX_CHUNK_TOKENS = 220
+
+# Thai and CJK text has no spaces between words, so those script runs are
+# indexed as overlapping character bigrams; everything else by word.
+SEGMENT_PATTERN = re.compile(
+    r'[\u0E00-\u0E7F]+|[\u3040-\u30ff\u4e00-\u9fff\uac00-\ud7af]+|\w+'
+)
+BIGRAM_SCRIPT_PATTERN = re.compile(r'[\u0E00-\u0E7F\u3040-\u30ff\u4e00-\u9fff\uac00-\ud7af]')
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text):
+    """Split text into index terms (words, or bigrams for unspaced scripts)"""
+    terms = []
+    for segment in SEGMENT_PATTERN.findall(text.lower()):
+        if BIGRAM_SCRIPT_PATTERN.match(segment):
+            if len(segment) == 1:
+                terms.append(segment)
+            else:
+                terms.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+        else:
+            terms.append(segment)
+    return terms
+
+
+def clean_chunk_text(text):
+    """Collapse whitespace the same way load_html_content does"""
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def chunk_markdown(markdown, max_tokens=MAX_CHUNK_TOKENS):
+    """Split html2text output into chunks that never cross a heading.
+
+    Sections longer than max_tokens are packed paragraph by paragraph (or line
+    by line for long lists). Each chunk keeps the heading path it sits under.
+    """
+    sections = []
+    heading_path = []
+    body = []
+
+    def flush():
+        if any(line.strip() for line in body):
+            sections.append((" > ".join(heading_path), "\n".join(body)))
+
+    for line in markdown.splitlines():
+        match = HEADING_PATTERN.match(line.strip())
+        if match:
+            flush()
+            body = []
+            level = len(match.group(1))
+            heading_path = heading_path[:level - 1] + [match.group(2).strip()]
+        else:
+            body.append(line)
+    flush()
+
+    chunks = []
+    for heading, text in sections:
+        blocks = [block for block in re.split(r'\n\s*\n', text) if block.strip()]
+        # Lists come out of html2text as one block; split those per item, and
+        # cut any single line that is still too long into word windows
+        pieces = []
+        for block in blocks:
+            if estimate_tokens(block) <= max_tokens:
+                pieces.append(block)
+                continue
+            for line in block.splitlines():
+                if not line.strip():
+                    continue
+                if estimate_tokens(line) <= max_tokens:
+                    pieces.append(line)
+                else:
+                    pieces.extend(_split_long_line(line, max_tokens))
+
+        current = []
+        current_tokens = 0
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(_make_chunk(len(chunks), heading, current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += piece_tokens
+        if current:
+            chunks.append(_make_chunk(len(chunks), heading, current))
+
+    # Pages repeat blocks (menus, review carousels); keep the first copy only
+    unique_chunks = []
+    seen_bodies = set()
+    for chunk in chunks:
+        if chunk['body'] in seen_bodies:
+            continue
+        seen_bodies.add(chunk['body'])
+        chunk['id'] = len(unique_chunks)
+        unique_chunks.append(chunk)
+    return unique_chunks
+
+
+def _split_long_line(line, max_tokens):
+    windows = []
+    current = []
+    for word in line.split():
+        if current and estimate_tokens(" ".join(current + [word])) > max_tokens:
+            windows.append(" ".join(current))
+            current = []
+        current.append(word)
+    if current:
+        windows.append(" ".join(current))
+    return windows
+
+
+def _make_chunk(chunk_id, heading, pieces):
+    body = clean_chunk_text("\n\n".join(pieces))
+    text = f"{heading}: {body}" if heading else body
+    return {
+        'id': chunk_id,
+        'heading': heading,
+        'body': body,
+        'text': text,
+        'tokens': estimate_tokens(text)
+    }
+
+
+class BM25Index:
+    """Inverted index over knowledge chunks scored with Okapi BM25"""
+
+    def __init__(self, chunks, k1=BM25_K1, b=BM25_B):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        # Only the body is indexed: every chunk shares the page title in its
+        # heading path, which would otherwise match every query
+        doc_terms = [tokenize(chunk['body']) for chunk in chunks]
+        self.doc_lengths = np.array([len(terms) for terms in doc_terms], dtype=np.float32)
+        self.avg_doc_length = float(self.doc_lengths.mean()) if chunks else 0.0
+
+        # term -> (doc ids, term frequencies) as NumPy arrays
+        postings = {}
+        for doc_id, terms in enumerate(doc_terms):
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc_id)
+                postings[term][1].append(count)
+
+        n_docs = len(chunks)
+        self.postings = {}
+        self.idf = {}
+        for term, (doc_ids, freqs) in postings.items():
+            self.postings[term] = (np.array(doc_ids, dtype=np.int32), np.array(freqs, dtype=np.float32))
+            df = len(doc_ids)
+            self.idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        # Per-document length normalisation is query independent
+        if chunks:
+            self.length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / self.avg_doc_length)
+        else:
+            self.length_norm = np.zeros(0, dtype=np.float32)
+
+    def scores(self, query):
+        """BM25 score of every chunk for the query"""
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            doc_ids, freqs = posting
+            scores[doc_ids] += self.idf[term] * freqs * (self.k1 + 1) / (freqs + self.length_norm[doc_ids])
+        return scores
+
+    def search(self, query, top_k=6, token_budget=1500):
+        """Return the best chunks for a query that fit within the token budget.
+
+        Each hit is a dict with the chunk id, heading, BM25 score, token count
+        and text, in descending score order.
+        """
+        if not self.chunks:
+            return []
+        scores = self.scores(query)
+        ranked = np.argsort(-scores, kind='stable')
+
+        hits = []
+        used_tokens = 0
+        for doc_id in ranked:
+            score = float(scores[doc_id])
+            if score <= 0 or len(hits) >= top_k:
+                break
+            chunk = self.chunks[doc_id]
+            if used_tokens + chunk['tokens'] > token_budget:
+                continue
+            used_tokens += chunk['tokens']
+            hits.append({**chunk, 'score': round(score, 3)})
+        return hits
+
+    def leading_chunks(self, token_budget=1500):
+        """Chunks from the top of the page, used when nothing matches"""
+        hits = []
+        used_tokens = 0
+        for chunk in self.chunks:
+            if used_tokens + chunk['tokens'] > token_budget:
+                break
+            used_tokens += chunk['tokens']
+            hits.append({**chunk, 'score': 0.0})
+        return hits
+
+
+def format_context(hits):
+    """Join retrieval hits into the clinic information block of the prompt"""
+    return "\n\n".join(hit['text'] for hit in hits)
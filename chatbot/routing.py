@@ -0,0 +1,205 @@
+import logging
+import re
+import threading
+import time
+
+from llm import MODEL, MAX_TOKENS
+from tokens import estimate_tokens
+
+# Latency-aware model routing. Each message is classified as a greeting, a
+# simple FAQ or a complex question from cheap local features (length,
+# language, greeting words, how well it matches the clinic content) and sent
+# to that class's model tier with its own max_tokens and timeout. When a
+# tier's primary model keeps exceeding its latency budget, or times out, the
+# tier's faster fallback model answers instead. Latency is tracked per tier
+# and model: one model can serve short FAQ answers and long complex ones,
+# and only the FAQ latencies say anything about the FAQ budget.
+
+logger = logging.getLogger(__name__)
+
+FAST_MODEL = "gpt-4o-mini"
+
+# tier -> model, fallback model, answer length and latency limits (seconds)
+DEFAULT_TIERS = {
+    "greeting": {"model": FAST_MODEL, "fallback_model": None, "max_tokens": 150,
+                 "timeout": 15, "latency_budget": 3},
+    "faq": {"model": MODEL, "fallback_model": FAST_MODEL, "max_tokens": 500,
+            "timeout": 30, "latency_budget": 8},
+    "complex": {"model": MODEL, "fallback_model": FAST_MODEL, "max_tokens": MAX_TOKENS,
+                "timeout": 60, "latency_budget": 20},
+}
+
+# Native scripts spend more tokens on the same answer
+SCRIPT_HEAVY_LANGUAGES = {"Thai", "Hindi", "Urdu", "Arabic", "Russian", "Chinese", "Japanese", "Korean"}
+SCRIPT_HEAVY_TOKEN_FACTOR = 1.5
+
+GREETING_WORDS = {
+    'hi', 'hello', 'hey', 'thanks', 'thank', 'thx', 'ok', 'okay', 'bye', 'morning',
+    'evening', 'hola', 'gracias', 'bonjour', 'merci', 'hallo', 'danke', 'ciao', 'grazie', 'ola',
+    'obrigado', 'obrigada', 'merhaba', 'selam', 'tesekkurler', 'sawatdee', 'sawasdee', 'sawatdi',
+    'khob', 'salam', 'assalam', 'alaikum', 'shukriya', 'namaste',
+    'dhanyavad', 'marhaba', 'ahlan', 'shukran',
+    'สวัสดี', 'ขอบคุณ', 'السلام', 'عليكم', 'مرحبا', 'شكرا', 'شکریہ', 'नमस्ते', 'धन्यवाद',
+    'привет', 'здравствуйте', 'спасибо', 'こんにちは', 'ありがとう', '你好', '谢谢', '안녕하세요', '감사합니다',
+}
+
+# Words that can accompany a greeting ("hello there", "thank you so much krub")
+GREETING_FILLER_WORDS = {
+    'there', 'everyone', 'all', 'sir', 'madam', 'dear', 'team', 'doctor', 'you', 'so', 'much',
+    'very', 'a', 'lot', 'good', 'ji', 'krub', 'krab', 'ka', 'kha', 'khun', 'wa', 'sahlan',
+    'ครับ', 'ค่ะ', 'คะ', 'จ้า', 'นะ', 'जी', 'جی',
+}
+
+# Scripts written without spaces (and with combining vowel marks that split
+# \w+ runs) are matched by substring instead of by word
+UNSPACED_GREETINGS = sorted(
+    (word for word in GREETING_WORDS | GREETING_FILLER_WORDS if not word.isascii()), key=len, reverse=True
+)
+
+# Questions about the patient's own situation or comparisons need the big model
+COMPLEX_WORDS = {
+    'compare', 'comparison', 'difference', 'versus', 'vs', 'risk', 'risks', 'complication',
+    'complications', 'revision', 'medication', 'medications', 'diabetes', 'pregnant', 'allergy',
+    'allergic', 'anesthesia', 'asymmetry', 'breathing', 'deviated', 'septum', 'explain', 'why',
+    'should', 'pros', 'cons', 'history', 'condition',
+}
+
+WORD_PATTERN = re.compile(r'\w+')
+QUESTION_PATTERN = re.compile(r'[?？؟]')
+
+GREETING_MAX_TOKENS = 12
+FAQ_MAX_TOKENS = 30
+
+# Weight of the newest observation in a (tier, model)'s smoothed latency
+LATENCY_SMOOTHING = 0.3
+# While a primary is over budget, still send it every Nth request so that it
+# can recover
+PROBE_EVERY = 10
+
+
+def is_greeting(message):
+    """Whether a message is nothing but greetings/thanks and their usual companions"""
+    text = message.lower()
+    found = False
+    for greeting in UNSPACED_GREETINGS:
+        if greeting in text:
+            found = found or greeting in GREETING_WORDS
+            text = text.replace(greeting, " ")
+    for word in WORD_PATTERN.findall(text):
+        # Prefixes catch "helloo" and "thanks"
+        if word in GREETING_WORDS or any(word.startswith(greeting) for greeting in GREETING_WORDS
+                                         if len(greeting) > 3 and greeting.isascii()):
+            found = True
+        elif word not in GREETING_FILLER_WORDS:
+            return False
+    return found
+
+
+def classify(message, hits=()):
+    """Greeting, faq or complex, from length, greeting/complex words and retrieval hits"""
+    words = WORD_PATTERN.findall(message.lower())
+    tokens = estimate_tokens(message)
+
+    if tokens <= GREETING_MAX_TOKENS and is_greeting(message):
+        return "greeting"
+
+    # One short question the clinic content has something on
+    matched = any(hit.get("score", 0) > 0 for hit in hits)
+    if (matched and tokens <= FAQ_MAX_TOKENS and len(QUESTION_PATTERN.findall(message)) <= 1
+            and not COMPLEX_WORDS.intersection(words)):
+        return "faq"
+    return "complex"
+
+
+class ModelRouter:
+    """Picks a model tier per message and tracks each tier's models' latency"""
+
+    def __init__(self, tiers=None):
+        self.tiers = {name: dict(tier) for name, tier in (tiers or DEFAULT_TIERS).items()}
+        # (tier, model) -> smoothed seconds per call, and calls skipped while over budget
+        self.latency = {}
+        self.skipped = {}
+        self.lock = threading.Lock()
+
+    def route(self, message, language, hits=()):
+        """Return the routing decision for a message"""
+        tier_name = classify(message, hits)
+        tier = self.tiers[tier_name]
+        max_tokens = tier["max_tokens"]
+        if language in SCRIPT_HEAVY_LANGUAGES:
+            max_tokens = int(max_tokens * SCRIPT_HEAVY_TOKEN_FACTOR)
+
+        model = tier["model"]
+        fallback_model = tier["fallback_model"]
+        reason = "primary"
+        if fallback_model and self._over_budget((tier_name, model), tier["latency_budget"]):
+            model, fallback_model = fallback_model, None
+            reason = "primary over latency budget"
+
+        decision = {
+            "tier": tier_name,
+            "model": model,
+            "fallback_model": fallback_model,
+            "max_tokens": max_tokens,
+            "timeout": tier["timeout"],
+            "latency_budget": tier["latency_budget"],
+            "reason": reason,
+        }
+        logger.info("route tier=%s model=%s max_tokens=%s reason=%s",
+                    tier_name, model, max_tokens, reason)
+        return decision
+
+    def _over_budget(self, key, budget):
+        with self.lock:
+            latency = self.latency.get(key)
+            if latency is None or latency <= budget:
+                return False
+            self.skipped[key] = self.skipped.get(key, 0) + 1
+            if self.skipped[key] % PROBE_EVERY == 0:
+                return False
+            return True
+
+    def record(self, decision, model, seconds, ok=True):
+        """Fold a finished call's latency into the running average of its tier and model"""
+        key = (decision["tier"], model)
+        with self.lock:
+            previous = self.latency.get(key)
+            self.latency[key] = seconds if previous is None else (
+                LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * previous
+            )
+        logger.info("latency tier=%s model=%s seconds=%.2f ok=%s avg=%.2f",
+                    decision["tier"], model, seconds, ok, self.latency[key])
+
+    async def acall(self, decision, request):
+        """Run request(model, max_tokens, timeout), a coroutine, retrying on the fallback model on failure"""
+        models = [decision["model"]] + ([decision["fallback_model"]] if decision["fallback_model"] else [])
+        for attempt, model in enumerate(models):
+            start = time.perf_counter()
+            try:
+                result = await request(model, decision["max_tokens"], decision["timeout"])
+                self.record(decision, model, time.perf_counter() - start)
+                return result
+            except Exception:
+                self.record(decision, model, time.perf_counter() - start, ok=False)
+                if attempt == len(models) - 1:
+                    raise
+                logger.warning("fallback tier=%s from=%s to=%s", decision["tier"], model, models[attempt + 1])
+
+    async def astream(self, decision, request):
+        """Streaming variant of acall() for requests returning async iterators; falls back only
+        before the first piece arrives"""
+        models = [decision["model"]] + ([decision["fallback_model"]] if decision["fallback_model"] else [])
+        for attempt, model in enumerate(models):
+            start = time.perf_counter()
+            received = False
+            try:
+                async for piece in request(model, decision["max_tokens"], decision["timeout"]):
+                    received = True
+                    yield piece
+                self.record(decision, model, time.perf_counter() - start)
+                return
+            except Exception:
+                self.record(decision, model, time.perf_counter() - start, ok=False)
+                if received or attempt == len(models) - 1:
+                    raise
+                logger.warning("fallback tier=%s from=%s to=%s", decision["tier"], model, models[attempt + 1])
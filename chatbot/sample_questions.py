@@ -0,0 +1,70 @@
+# Sample questions shown as buttons under the chat, one tab per language.
+# The cache prewarm script answers all of them ahead of time.
+SAMPLE_QUESTIONS = [
+    {
+        "tab": "English",
+        "language": "English",
+        "key": "en",
+        "questions": [
+            "What rhinoplasty procedures do you offer?",
+            "What is the recovery time for rhinoplasty?",
+            "How much does rhinoplasty cost?",
+            "What should I expect during consultation?"
+        ]
+    },
+    {
+        "tab": "ไทย (Thai)",
+        "language": "Thai",
+        "key": "th",
+        "questions": [
+            "คุณมีการผ่าตัดไรโนพลาสตี้แบบใดบ้าง?",
+            "ระยะเวลาฟื้นฟูสำหรับไรโนพลาสตี้เป็นเวลาเท่าไร?",
+            "ไรโนพลาสตี้มีค่าใช้จ่ายเท่าไร?",
+            "ฉันควรคาดหวังอะไรระหว่างการปรึกษา?"
+        ]
+    },
+    {
+        "tab": "Roman Thai",
+        "language": "Thai",
+        "key": "roman_th",
+        "questions": [
+            "rhinoplasty arai krub",
+            "surgery thao rai krub",
+            "rhinoplasty sabai mai",
+            "consultation pai nai"
+        ]
+    },
+    {
+        "tab": "اردو (Urdu)",
+        "language": "Urdu",
+        "key": "ur",
+        "questions": [
+            "آپ کے کلینک میں رائنو پلاسٹی کے کون سے طریقے ہیں؟",
+            "رائنو پلاسٹی کے بعد صحتیابی کا وقت کیا ہے؟",
+            "رائنو پلاسٹی کی قیمت کتنی ہے؟",
+            "مشاورت کے دوران مجھے کیا توقع رکھنی چاہیے؟"
+        ]
+    },
+    {
+        "tab": "Roman Urdu",
+        "language": "Urdu",
+        "key": "roman_ur",
+        "questions": [
+            "rhinoplasty kya hai?",
+            "recovery time kitna hota hai?",
+            "cost kitni hoti hai?",
+            "consultation me kya hota hai?"
+        ]
+    },
+    {
+        "tab": "हिंदी (Hindi)",
+        "language": "Hindi",
+        "key": "hi",
+        "questions": [
+            "आप कौन-कौन सी राइनोप्लास्टी प्रक्रियाएँ करते हैं?",
+            "राइनोप्लास्टी के लिए रिकवरी टाइम क्या होता है?",
+            "राइनोप्लास्टी की कीमत कितनी है?",
+            "परामर्श के दौरान क्या उम्मीद की जा सकती है?"
+        ]
+    }
+]
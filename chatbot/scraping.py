@@ -1,48 +1,76 @@
+import argparse
+import os
+import sys
 from bs4 import BeautifulSoup
 import requests
-import re
+from facts import PRICE_PATTERN, extract_facts, save_facts, FACTS_FILE
+from knowledge import build_knowledge_artifact, save_knowledge_artifact
 
-# Define the target URL
-url = "https://mekoclinic.com/surgery/nose-open-rhinoplasty/"
-headers = {
-    "User-Agent": "Mozilla/5.0"
-}
+# Profiling is shared with the data scrapers (bumRunGrad_Data/profiling.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bumRunGrad_Data"))
+from profiling import add_profile_argument, profiled
 
-# Request the webpage
-response = requests.get(url, headers=headers)
+# Scrape the clinic page and rebuild the facts and knowledge files
+#
+#   python scraping.py
+#   python scraping.py --profile          # reports in profiles/
+parser = argparse.ArgumentParser(description="Scrape the Meko Clinic rhinoplasty page")
+add_profile_argument(parser)
+args = parser.parse_args()
+with profiled(args.profile, "scraping", mode=args.profile_mode):
+    # Define the target URL
+    url = "https://mekoclinic.com/surgery/nose-open-rhinoplasty/"
+    headers = {
+        "User-Agent": "Mozilla/5.0"
+    }
 
-# Parse with BeautifulSoup
-soup = BeautifulSoup(response.content, "html.parser")
+    # Request the webpage
+    response = requests.get(url, headers=headers)
 
-# Remove unwanted scripts, styles, and metadata
-for tag in soup(["script", "style", "noscript", "iframe", "meta", "link"]):
-    tag.decompose()
+    # Parse with BeautifulSoup
+    soup = BeautifulSoup(response.content, "html.parser")
 
-# Extract useful parts: headings, paragraphs, image alt text
-headings = [tag.get_text(strip=True) for tag in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])]
-paragraphs = [tag.get_text(strip=True) for tag in soup.find_all('p')]
-list_items = [tag.get_text(strip=True) for tag in soup.find_all('li')]
-image_alts = [tag.get('alt', '') for tag in soup.find_all('img') if tag.get('alt')]
+    # Remove unwanted scripts, styles, and metadata
+    for tag in soup(["script", "style", "noscript", "iframe", "meta", "link"]):
+        tag.decompose()
 
-# Optional: Extract prices (if mentioned)
-text = soup.get_text()
-prices = re.findall(r'\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*(?:฿|baht|THB)', text, re.IGNORECASE)
+    # Extract structured facts (prices, recovery times, hours, contacts) while the
+    # page structure is still intact, before it is flattened below
+    facts = extract_facts(soup, url)
+    save_facts(facts, FACTS_FILE)
 
-# Combine everything into a single HTML content block
-html_content = "<html><body>"
-html_content += "<h1>Meko Clinic - Nose Open Rhinoplasty</h1>"
+    # Extract useful parts: headings, paragraphs, image alt text
+    headings = [tag.get_text(strip=True) for tag in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])]
+    paragraphs = [tag.get_text(strip=True) for tag in soup.find_all('p')]
+    list_items = [tag.get_text(strip=True) for tag in soup.find_all('li')]
+    image_alts = [tag.get('alt', '') for tag in soup.find_all('img') if tag.get('alt')]
 
-html_content += "<h2>Headings</h2><ul>" + "".join([f"<li>{h}</li>" for h in headings]) + "</ul>"
-html_content += "<h2>Paragraphs</h2><p>" + "</p><p>".join(paragraphs) + "</p>"
-html_content += "<h2>List Items</h2><ul>" + "".join([f"<li>{li}</li>" for li in list_items]) + "</ul>"
-html_content += "<h2>Image Descriptions</h2><ul>" + "".join([f"<li>{alt}</li>" for alt in image_alts]) + "</ul>"
-if prices:
-    html_content += "<h2>Prices</h2><ul>" + "".join([f"<li>{price}</li>" for price in prices]) + "</ul>"
+    # Optional: Extract prices (if mentioned)
+    text = soup.get_text()
+    prices = [match.group(0).strip() for match in PRICE_PATTERN.finditer(text)]
 
-html_content += "</body></html>"
+    # Combine everything into a single HTML content block
+    html_content = "<html><body>"
+    html_content += "<h1>Meko Clinic - Nose Open Rhinoplasty</h1>"
 
-# Save to file
-with open("meko_clinic_rhinoplasty.html", "w", encoding="utf-8") as f:
-    f.write(html_content)
+    html_content += "<h2>Headings</h2><ul>" + "".join([f"<li>{h}</li>" for h in headings]) + "</ul>"
+    html_content += "<h2>Paragraphs</h2><p>" + "</p><p>".join(paragraphs) + "</p>"
+    html_content += "<h2>List Items</h2><ul>" + "".join([f"<li>{li}</li>" for li in list_items]) + "</ul>"
+    html_content += "<h2>Image Descriptions</h2><ul>" + "".join([f"<li>{alt}</li>" for alt in image_alts]) + "</ul>"
+    if prices:
+        html_content += "<h2>Prices</h2><ul>" + "".join([f"<li>{price}</li>" for price in prices]) + "</ul>"
 
-print("✅ Data successfully scraped and saved to 'meko_clinic_rhinoplasty.html'")
+    html_content += "</body></html>"
+
+    # Save to file
+    with open("meko_clinic_rhinoplasty.html", "w", encoding="utf-8") as f:
+        f.write(html_content)
+
+    # Prebuild the cleaned text and chunks the chatbot loads at startup, so the
+    # app never has to parse the HTML itself
+    knowledge = build_knowledge_artifact("meko_clinic_rhinoplasty.html", source_url=url)
+    save_knowledge_artifact(knowledge, "meko_clinic_knowledge.json")
+
+    print("✅ Data successfully scraped and saved to 'meko_clinic_rhinoplasty.html'")
+    print(f"✅ {len(facts['facts'])} structured facts saved to '{FACTS_FILE}'")
+    print(f"✅ {len(knowledge['chunks'])} knowledge chunks saved to 'meko_clinic_knowledge.json'")
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import time
+
+# Conversation state of chat sessions, kept in SQLite so that any worker
+# process of the chat server can answer the next message of any session,
+# plus the older displayed messages the app spills out of session memory
+# (see chat_history.py). Sessions idle for longer than the TTL are dropped.
+
+SESSION_STORE_FILE = os.path.join(os.path.dirname(__file__), ".cache", "sessions.sqlite3")
+
+DEFAULT_SESSION_TTL_SECONDS = 24 * 3600
+
+
+class SessionStore:
+    """SQLite-backed map of session id -> JSON conversation state"""
+
+    def __init__(self, db_path=SESSION_STORE_FILE, ttl_seconds=DEFAULT_SESSION_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    session_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    message TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, position)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS messages_updated_at ON messages (updated_at)")
+
+    @contextmanager
+    def _connect(self):
+        # Same pattern as the response cache: a short-lived connection per
+        # call, WAL so that worker processes don't block each other's reads
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, session_id):
+        """Return the stored state, or None for unknown or expired sessions"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, session_id, state):
+        """Store a session's state and drop expired sessions"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                (session_id, json.dumps(state, ensure_ascii=False), now)
+            )
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    def append_messages(self, session_id, start, messages):
+        """Store messages at positions start, start + 1, ...; drop expired ones"""
+        now = time.time()
+        with self._connect() as conn:
+            # The session is active, so its earlier messages must not expire
+            # before the new ones
+            conn.execute("UPDATE messages SET updated_at = ? WHERE session_id = ?", (now, session_id))
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?)",
+                [(session_id, start + i, json.dumps(message, ensure_ascii=False), now)
+                 for i, message in enumerate(messages)]
+            )
+            conn.execute("DELETE FROM messages WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    def touch_messages(self, session_id):
+        """Keep a session's stored messages from expiring while it is in use"""
+        with self._connect() as conn:
+            conn.execute("UPDATE messages SET updated_at = ? WHERE session_id = ?", (time.time(), session_id))
+
+    def load_messages(self, session_id, start, end):
+        """Stored messages with start <= position < end, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT message FROM messages WHERE session_id = ? AND position >= ? AND position < ? "
+                "ORDER BY position", (session_id, start, end)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def delete_messages(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
@@ -0,0 +1,135 @@
+from collections import deque
+from contextlib import contextmanager
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+
+# Per-turn latency telemetry. Each chat turn is timed in named spans
+# (language detection, facts/cache lookups, retrieval, prompt assembly, LLM
+# time to first token and total, rendering), and one JSON line per turn is
+# appended to a size-rotated log together with token usage and whether a
+# cache answered. The most recent turns are also kept in memory for the
+# rolling percentiles in the app's developer panel.
+
+TELEMETRY_FILE = os.path.join(os.path.dirname(__file__), ".cache", "telemetry.jsonl")
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+DEFAULT_WINDOW = 500
+
+# Order of the spans in reports; others follow alphabetically
+SPAN_ORDER = ["detect", "session", "facts", "cache", "retrieval", "route", "prompt", "ttft", "llm",
+              "service", "render", "total"]
+
+
+class Spans:
+    """Named durations of one turn, in milliseconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+
+    def elapsed(self):
+        """Seconds since the turn started"""
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds * 1000
+
+    def update(self, durations):
+        """Merge spans measured elsewhere (e.g. by the chat backend), already in ms"""
+        for name, milliseconds in (durations or {}).items():
+            self.durations[name] = self.durations.get(name, 0.0) + milliseconds
+
+    def as_dict(self):
+        return {name: round(milliseconds, 2) for name, milliseconds in self.durations.items()}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class TelemetryLog:
+    """Rotating JSONL log of turn records plus a rolling in-memory window"""
+
+    def __init__(self, path=TELEMETRY_FILE, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 window=DEFAULT_WINDOW):
+        self.path = path
+        self.recent = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Start the window from the log so that a restart doesn't empty the panel
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                for line in deque(file, maxlen=window):
+                    try:
+                        self.recent.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+
+        # A private logger per file: RotatingFileHandler does the size-based
+        # rotation and serializes writes from concurrent sessions
+        self.logger = logging.getLogger(f"{__name__}.{os.path.abspath(path)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+    def record(self, turn):
+        """Append one turn record (a JSON-ready dict with a "spans" dict)"""
+        turn = {"ts": round(time.time(), 3), **turn}
+        with self.lock:
+            self.recent.append(turn)
+        self.logger.info(json.dumps(turn, ensure_ascii=False))
+
+    def summary(self):
+        """p50/p95/p99 per span over the window, cache hit rate and mean token usage"""
+        with self.lock:
+            turns = list(self.recent)
+        values = {}
+        for turn in turns:
+            for name, milliseconds in turn.get("spans", {}).items():
+                values.setdefault(name, []).append(milliseconds)
+
+        order = {name: i for i, name in enumerate(SPAN_ORDER)}
+        spans = []
+        for name in sorted(values, key=lambda name: (order.get(name, len(order)), name)):
+            ordered = sorted(values[name])
+            spans.append({
+                "span": name,
+                "count": len(ordered),
+                "p50_ms": round(percentile(ordered, 0.5), 1),
+                "p95_ms": round(percentile(ordered, 0.95), 1),
+                "p99_ms": round(percentile(ordered, 0.99), 1),
+            })
+
+        usages = [turn["usage"] for turn in turns if turn.get("usage")]
+        return {
+            "turns": len(turns),
+            "cache_hit_rate": sum(1 for turn in turns if turn.get("cache_hit")) / len(turns) if turns else 0.0,
+            "mean_prompt_tokens": sum(usage["prompt_tokens"] for usage in usages) / len(usages) if usages else 0,
+            "mean_completion_tokens": (sum(usage["completion_tokens"] for usage in usages) / len(usages)
+                                       if usages else 0),
+            "spans": spans,
+        }
@@ -0,0 +1,20 @@
+import re
+
+# Cheap token estimate used for prompt budgeting. We don't ship a tokenizer,
+# so this approximates BPE behaviour: Latin words cost ~1.3 tokens and
+# characters of other scripts (Thai, CJK, Arabic, Devanagari...) roughly half
+# a token each since they rarely merge into long pieces.
+
+LATIN_WORD_PATTERN = re.compile(r'[A-Za-z0-9]+')
+OTHER_CHAR_PATTERN = re.compile(r'[^\x00-\x7F\s]')
+PUNCTUATION_PATTERN = re.compile(r'[!-/:-@\[-`{-~]')
+
+
+def estimate_tokens(text):
+    """Approximate the number of LLM tokens in a piece of text"""
+    if not text:
+        return 0
+    latin_words = len(LATIN_WORD_PATTERN.findall(text))
+    other_chars = len(OTHER_CHAR_PATTERN.findall(text))
+    punctuation = len(PUNCTUATION_PATTERN.findall(text))
+    return int(latin_words * 1.3 + other_chars * 0.5 + punctuation * 0.5) + 1
@@ -0,0 +1,147 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from languages import LANGUAGES
+from llm import AIML_BASE_URL, MODEL, create_client, load_secrets
+from knowledge import (TRANSLATIONS_DIR, TRANSLATION_FORMAT_VERSION, load_knowledge_artifact,
+                       save_knowledge_artifact, translated_artifact_file)
+from tokens import estimate_tokens
+
+# Offline build step: translate the clinic knowledge chunks into every
+# supported language, so that the chatbot retrieves context already written
+# in the user's language instead of having the model translate the whole
+# context on every answer.
+#
+#   python chatbot/translate_knowledge.py                    # all languages, only what changed
+#   python chatbot/translate_knowledge.py --language Thai --language Urdu
+#   python chatbot/translate_knowledge.py --force            # retranslate everything
+#
+# Each language's file records the content hash of the source artifact it
+# was built from; the app ignores files built from older content. Chunks
+# whose source text did not change are carried over instead of retranslated.
+
+TRANSLATION_MODEL = MODEL
+TRANSLATION_WORKERS = 4
+
+TRANSLATION_PROMPT = """Translate the following excerpt of a cosmetic surgery clinic's web page into {language} ({native}).
+- Write the whole translation in {language} using {native} script, including parts that are in Thai or English
+- Keep prices, numbers, phone numbers, URLs, doctor and brand names unchanged
+- Keep list markers (*) and the order of the items
+- Output only the translation, without notes or explanations"""
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def translate_text(client, text, language, model=TRANSLATION_MODEL):
+    """One LLM translation call; raises on API errors"""
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": TRANSLATION_PROMPT.format(language=language,
+                                                                    native=LANGUAGES[language]["native"])},
+            {"role": "user", "content": text}
+        ],
+        temperature=0,
+        max_tokens=max(200, estimate_tokens(text) * 3)
+    )
+    return (response.choices[0].message.content or "").strip()
+
+
+def build_translated_artifact(source, language, client, previous=None, model=TRANSLATION_MODEL,
+                              workers=TRANSLATION_WORKERS):
+    """Translate the source artifact's chunks, reusing previous translations of unchanged text"""
+    # source text hash -> translation, from the last build with the same model
+    known = {}
+    if previous and previous.get("model") == model:
+        known = dict(previous.get("translations", {}))
+
+    # Heading paths repeat across chunks; each distinct text is translated once
+    texts = {chunk["body"] for chunk in source["chunks"]} | {chunk["heading"] for chunk in source["chunks"]}
+    missing = [text for text in texts if text and text_hash(text) not in known]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for text, translation in zip(missing, executor.map(
+                lambda text: translate_text(client, text, language, model), missing)):
+            known[text_hash(text)] = translation
+
+    chunks = []
+    for chunk in source["chunks"]:
+        heading = known[text_hash(chunk["heading"])] if chunk["heading"] else ""
+        body = known[text_hash(chunk["body"])]
+        text = f"{heading}: {body}" if heading else body
+        chunks.append({
+            "id": chunk["id"],
+            "heading": heading,
+            "body": body,
+            "text": text,
+            "tokens": estimate_tokens(text),
+        })
+
+    used = {text_hash(text) for text in texts if text}
+    return {
+        "format_version": TRANSLATION_FORMAT_VERSION,
+        "language": language,
+        "source_content_hash": source["content_hash"],
+        "model": model,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "chunks": chunks,
+        "translations": {key: value for key, value in known.items() if key in used},
+    }, len(missing)
+
+
+def load_previous(language, translations_dir=TRANSLATIONS_DIR):
+    """The existing file for a language, current or not"""
+    try:
+        with open(translated_artifact_file(language, translations_dir), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def translate_knowledge(languages=None, force=False, model=TRANSLATION_MODEL, workers=TRANSLATION_WORKERS):
+    secrets = load_secrets()
+    api_key = os.environ.get("AIML_API_KEY") or secrets.get("AIML_API_KEY", "")
+    if not api_key:
+        print("❌ AIML API Key not found. Set AIML_API_KEY or add it to .streamlit/secrets.toml")
+        return False
+
+    client = create_client(api_key, os.environ.get("AIML_BASE_URL") or secrets.get("AIML_BASE_URL", AIML_BASE_URL))
+    source = load_knowledge_artifact()
+    os.makedirs(TRANSLATIONS_DIR, exist_ok=True)
+
+    failed = 0
+    for language in languages or LANGUAGES:
+        previous = None if force else load_previous(language)
+        if (previous and previous.get("format_version") == TRANSLATION_FORMAT_VERSION
+                and previous.get("source_content_hash") == source["content_hash"]
+                and previous.get("model") == model):
+            print(f"✅ [{language}] up to date")
+            continue
+        try:
+            start = time.time()
+            artifact, translated = build_translated_artifact(source, language, client, previous, model, workers)
+            save_knowledge_artifact(artifact, translated_artifact_file(language))
+            print(f"✅ [{language}] {len(artifact['chunks'])} chunks, {translated} texts translated "
+                  f"({time.time() - start:.1f}s)")
+        except Exception as e:
+            failed += 1
+            print(f"❌ [{language}] {str(e)}")
+
+    print(f"\n🌐 Knowledge translations for content {source['content_hash'][:12]}: {failed} failed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-translate the clinic knowledge chunks per language")
+    parser.add_argument("--language", action="append", choices=list(LANGUAGES),
+                        help="language to build (repeatable; default: all)")
+    parser.add_argument("--force", action="store_true", help="retranslate even unchanged content")
+    parser.add_argument("--model", default=TRANSLATION_MODEL)
+    parser.add_argument("--workers", type=int, default=TRANSLATION_WORKERS, help="parallel translation calls")
+    args = parser.parse_args()
+    translate_knowledge(args.language, force=args.force, model=args.model, workers=args.workers)